@@ -1,6 +1,9 @@
 """API v1 routers"""
 from fastapi import APIRouter
-from app.api.v1 import auth, geofences, zones, assets, notifications, ai, geofence_access, api_keys
+from app.api.v1 import auth, geofences, zones, assets, notifications, geofence_access
+from app.core.config import get_settings
+
+settings = get_settings()
 
 api_router = APIRouter()
 
@@ -11,5 +14,12 @@ api_router.include_router(geofence_access.user_access_router)
 api_router.include_router(zones.router)
 api_router.include_router(assets.router)
 api_router.include_router(notifications.router)
-api_router.include_router(ai.router)
-api_router.include_router(api_keys.router)
+
+# Optional subsystems are only imported when enabled
+if settings.AI_SERVICE_ENABLED:
+    from app.api.v1 import ai
+    api_router.include_router(ai.router)
+
+if settings.API_KEYS_ENABLED:
+    from app.api.v1 import api_keys
+    api_router.include_router(api_keys.router)
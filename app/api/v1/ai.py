@@ -3,14 +3,26 @@ AI/LLM Service Router
 REST-compliant endpoints for AI interactions
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import AsyncIterator, Dict, List, Optional
 from uuid import UUID
-from app.core.database import get_db
+import json
+import logging
+from app.core.config import get_settings
+from app.core.database import get_db, SessionLocal
 from app.core.dependencies import AuthDependency, require_read, require_write
 from app.models.user import User
-from app.schemas.ai_service import AIMessageCreate, AIMessageResponse, AIConversationResponse, AIRecommendationResponse
+from app.schemas.ai_service import (
+    AIMessageCreate, AIMessageResponse, AIConversationResponse, AIRecommendationResponse,
+    AIRecommendationJobCreate, AIRecommendationJobResponse
+)
 from app.services.ai_service import AIService
+from app.services.recommendation_jobs import RecommendationJobService, dispatch_job
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/ai", tags=["AI Service"])
 
@@ -22,13 +34,13 @@ def _message_to_response(message) -> AIMessageResponse:
         conversation_id=str(message.conversation_id),
         role=message.role,
         content=message.content,
-        message_metadata=message.message_metadata,
+        metadata=message.message_metadata,
         created_at=message.created_at
     )
 
 
 @router.post("/chat", response_model=dict)
-async def send_ai_message(
+def send_ai_message(
     message_data: AIMessageCreate,
     current_user: User = Depends(require_write),
     db: Session = Depends(get_db)
@@ -42,8 +54,78 @@ async def send_ai_message(
     }
 
 
+def _sse(event: str, data: dict) -> str:
+    """Format a Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _save_streamed_reply(conversation_id: UUID, sequence: int, content: str) -> AIMessageResponse:
+    """Persist the finished reply on a short-lived session"""
+    db = SessionLocal()
+    try:
+        ai_message = AIService.save_assistant_message(
+            db, conversation_id, sequence, content, {"model": settings.AI_MODEL, "streamed": True}
+        )
+        return _message_to_response(ai_message)
+    finally:
+        db.close()
+
+
+async def _stream_events(
+    user_message: AIMessageResponse,
+    reply_sequence: int,
+    message_history: List[Dict[str, str]]
+) -> AsyncIterator[str]:
+    """Relay model tokens as SSE and store the assistant message once the stream completes"""
+    yield _sse("start", {
+        "conversation_id": user_message.conversation_id,
+        "user_message": user_message.model_dump(mode="json")
+    })
+    
+    chunks = []
+    try:
+        async for token in AIService.stream_ai_response(message_history):
+            chunks.append(token)
+            yield _sse("token", {"content": token})
+    except Exception as e:
+        logger.warning(f"AI stream failed: {e}")
+        yield _sse("error", {"message": f"Error generating AI response: {str(e)}"})
+        return
+    
+    ai_message = await run_in_threadpool(
+        _save_streamed_reply, UUID(user_message.conversation_id), reply_sequence, "".join(chunks)
+    )
+    yield _sse("done", {"ai_message": ai_message.model_dump(mode="json")})
+
+
+@router.post("/chat/stream")
+def stream_ai_message(
+    message_data: AIMessageCreate,
+    current_user: User = Depends(require_write),
+    db: Session = Depends(get_db)
+):
+    """
+    Send a message to AI and stream the response as Server-Sent Events.
+    Events: start (user message), token (content delta), done (stored assistant message), error.
+    """
+    try:
+        user_msg, reply_sequence, message_history = AIService.prepare_stream(db, message_data, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    user_message = _message_to_response(user_msg)
+    
+    # Return the connection to the pool before generation starts; the reply is saved on a new session
+    db.close()
+    
+    return StreamingResponse(
+        _stream_events(user_message, reply_sequence, message_history),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/conversations", response_model=list[AIConversationResponse])
-async def list_conversations(
+def list_conversations(
     page: int = Query(1, ge=1),
     per_page: int = Query(50, ge=1, le=100),
     current_user: User = Depends(require_read),
@@ -71,7 +153,7 @@ async def list_conversations(
 
 
 @router.get("/conversations/{conversation_id}", response_model=AIConversationResponse)
-async def get_conversation(
+def get_conversation(
     conversation_id: str,
     current_user: User = Depends(require_read),
     db: Session = Depends(get_db)
@@ -98,18 +180,20 @@ async def get_conversation(
 
 
 @router.post("/recommendations", response_model=AIRecommendationResponse)
-async def generate_recommendation(
+def generate_recommendation(
     entity_type: str = Query(...),
     entity_id: str = Query(...),
     recommendation_type: str = Query(...),
     current_user: User = Depends(require_write),
     db: Session = Depends(get_db)
 ):
-    """Generate AI recommendation for an entity"""
-    recommendation = AIService.generate_recommendation(
-        db, entity_type, entity_id, recommendation_type, {}
-    )
-    
+    """Generate AI recommendation for an entity (blocks until the model responds)"""
+    recommendation = AIService.generate_recommendation(db, entity_type, entity_id, recommendation_type, {})
+    return _recommendation_to_response(recommendation)
+
+
+def _recommendation_to_response(recommendation) -> AIRecommendationResponse:
+    """Convert recommendation model to response schema"""
     return AIRecommendationResponse(
         id=str(recommendation.id),
         recommendation_type=recommendation.recommendation_type,
@@ -124,3 +208,54 @@ async def generate_recommendation(
         updated_at=recommendation.updated_at
     )
 
+
+def _job_to_response(db: Session, job) -> AIRecommendationJobResponse:
+    """Convert job model to response schema, including results once completed"""
+    return AIRecommendationJobResponse(
+        id=str(job.id),
+        status=job.status,
+        entity_type=job.entity_type,
+        entity_ids=job.entity_ids,
+        recommendation_type=job.recommendation_type,
+        recommendations=[
+            _recommendation_to_response(r) for r in RecommendationJobService.get_job_recommendations(db, job)
+        ],
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        completed_at=job.completed_at
+    )
+
+
+@router.post("/recommendations/jobs", response_model=AIRecommendationJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_recommendation_job(
+    job_data: AIRecommendationJobCreate,
+    current_user: User = Depends(require_write),
+    db: Session = Depends(get_db)
+):
+    """
+    Queue recommendation generation for one or more entities and return immediately.
+    Poll GET /ai/recommendations/jobs/{job_id} for the result.
+    """
+    job = RecommendationJobService.create_job(
+        db, job_data.entity_type, job_data.entity_ids, job_data.recommendation_type, current_user.id
+    )
+    dispatch_job(job.id)
+    return _job_to_response(db, job)
+
+
+@router.get("/recommendations/jobs/{job_id}", response_model=AIRecommendationJobResponse)
+def get_recommendation_job(
+    job_id: str,
+    current_user: User = Depends(require_read),
+    db: Session = Depends(get_db)
+):
+    """Get recommendation job status and results"""
+    job = RecommendationJobService.get_job(db, UUID(job_id))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    if str(job.user_id) != str(current_user.id):
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    return _job_to_response(db, job)
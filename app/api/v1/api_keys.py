@@ -46,7 +46,7 @@ def _key_to_response(api_key) -> APIKeyResponse:
 
 
 @router.post("", response_model=APIKeyCreatedResponse, status_code=status.HTTP_201_CREATED)
-async def create_api_key(
+def create_api_key(
     data: APIKeyCreate,
     organization_id: str = Query(..., description="Organization ID to create key for"),
     current_user: User = Depends(require_write),
@@ -79,7 +79,7 @@ async def create_api_key(
 
 
 @router.get("", response_model=APIKeyListResponse)
-async def list_api_keys(
+def list_api_keys(
     organization_id: str = Query(..., description="Organization ID"),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
@@ -106,7 +106,7 @@ async def list_api_keys(
 
 
 @router.get("/scopes", response_model=dict)
-async def list_available_scopes():
+def list_available_scopes():
     """List all available API key scopes and presets"""
     return {
         "scopes": {
@@ -144,7 +144,7 @@ async def list_available_scopes():
 
 
 @router.get("/{key_id}", response_model=APIKeyResponse)
-async def get_api_key(
+def get_api_key(
     key_id: str,
     current_user: User = Depends(require_write),
     db: Session = Depends(get_db)
@@ -157,7 +157,7 @@ async def get_api_key(
 
 
 @router.patch("/{key_id}", response_model=APIKeyResponse)
-async def update_api_key(
+def update_api_key(
     key_id: str,
     data: APIKeyUpdate,
     organization_id: str = Query(..., description="Organization ID"),
@@ -177,7 +177,7 @@ async def update_api_key(
 
 
 @router.post("/{key_id}/revoke", status_code=status.HTTP_200_OK)
-async def revoke_api_key(
+def revoke_api_key(
     key_id: str,
     organization_id: str = Query(..., description="Organization ID"),
     current_user: User = Depends(require_write),
@@ -191,7 +191,7 @@ async def revoke_api_key(
 
 
 @router.delete("/{key_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_api_key(
+def delete_api_key(
     key_id: str,
     organization_id: str = Query(..., description="Organization ID"),
     current_user: User = Depends(require_delete),
@@ -204,7 +204,7 @@ async def delete_api_key(
 
 
 @router.post("/validate", response_model=APIKeyValidation)
-async def validate_api_key(
+def validate_api_key(
     api_key: str = Query(..., description="The API key to validate"),
     db: Session = Depends(get_db)
 ):
@@ -7,8 +7,9 @@ from sqlalchemy.orm import Session
 from typing import Optional
 from uuid import UUID
 from datetime import datetime
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.dependencies import AuthDependency, require_read, require_write
+from app.core.shutdown import location_writes
 from app.models.user import User
 from app.schemas.asset import AssetCreate, AssetUpdate, AssetResponse, AssetTrajectoryCreate, AssetTrajectoryResponse
 from app.services.asset_service import AssetService
@@ -46,13 +47,13 @@ def _asset_to_response(asset) -> AssetResponse:
 
 
 @router.get("", response_model=list[AssetResponse])
-async def list_assets(
+def list_assets(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     status: Optional[str] = Query(None),
     asset_type: Optional[str] = Query(None),
     current_user: User = Depends(require_read),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """List assets"""
     skip = (page - 1) * per_page
@@ -61,7 +62,7 @@ async def list_assets(
 
 
 @router.post("", response_model=AssetResponse, status_code=status.HTTP_201_CREATED)
-async def create_asset(
+def create_asset(
     asset_data: AssetCreate,
     current_user: User = Depends(require_write),
     db: Session = Depends(get_db)
@@ -72,7 +73,7 @@ async def create_asset(
 
 
 @router.get("/{asset_id}", response_model=AssetResponse)
-async def get_asset(
+def get_asset(
     asset_id: str,
     current_user: User = Depends(require_read),
     db: Session = Depends(get_db)
@@ -84,28 +85,34 @@ async def get_asset(
     return _asset_to_response(asset)
 
 
+def _tracked_location_update(db: Session, asset_id: UUID, location_data: AssetTrajectoryCreate):
+    """Run the write under the shutdown tracker so a stopping worker waits for it to commit"""
+    with location_writes.track():
+        return AssetService.update_asset_location(db, asset_id, location_data)
+
+
 @router.put("/{asset_id}/location", response_model=AssetResponse)
-async def update_asset_location(
+def update_asset_location(
     asset_id: str,
     location_data: AssetTrajectoryCreate,
     current_user: User = Depends(require_write),
     db: Session = Depends(get_db)
 ):
     """Update asset location and create trajectory point"""
-    asset = AssetService.update_asset_location(db, UUID(asset_id), location_data)
+    asset = _tracked_location_update(db, UUID(asset_id), location_data)
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
     return _asset_to_response(asset)
 
 
 @router.get("/{asset_id}/trajectory", response_model=list[AssetTrajectoryResponse])
-async def get_asset_trajectory(
+def get_asset_trajectory(
     asset_id: str,
     start_time: Optional[datetime] = Query(None),
     end_time: Optional[datetime] = Query(None),
     limit: int = Query(1000, le=10000),
     current_user: User = Depends(require_read),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get asset trajectory history"""
     trajectories = AssetService.get_asset_trajectory(
@@ -45,7 +45,7 @@ def _access_to_response(access, db: Session) -> GeofenceAccessResponse:
 
 
 @router.get("", response_model=GeofenceAccessListResponse)
-async def list_geofence_access(
+def list_geofence_access(
     geofence_id: str,
     current_user: User = Depends(require_write),
     db: Session = Depends(get_db)
@@ -65,7 +65,7 @@ async def list_geofence_access(
 
 
 @router.post("", response_model=GeofenceAccessResponse, status_code=status.HTTP_201_CREATED)
-async def grant_access(
+def grant_access(
     geofence_id: str,
     access_data: GeofenceAccessCreate,
     current_user: User = Depends(require_write),
@@ -94,7 +94,7 @@ async def grant_access(
 
 
 @router.post("/bulk", response_model=List[GeofenceAccessResponse], status_code=status.HTTP_201_CREATED)
-async def bulk_grant_access(
+def bulk_grant_access(
     geofence_id: str,
     bulk_data: BulkAccessCreate,
     current_user: User = Depends(require_write),
@@ -120,7 +120,7 @@ async def bulk_grant_access(
 
 
 @router.get("/{user_id}", response_model=GeofenceAccessResponse)
-async def get_user_access(
+def get_user_access(
     geofence_id: str,
     user_id: str,
     current_user: User = Depends(require_write),
@@ -135,7 +135,7 @@ async def get_user_access(
 
 
 @router.patch("/{user_id}", response_model=GeofenceAccessResponse)
-async def update_user_access(
+def update_user_access(
     geofence_id: str,
     user_id: str,
     access_data: GeofenceAccessUpdate,
@@ -157,7 +157,7 @@ async def update_user_access(
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def revoke_access(
+def revoke_access(
     geofence_id: str,
     user_id: str,
     current_user: User = Depends(require_delete),
@@ -174,7 +174,7 @@ user_access_router = APIRouter(prefix="/users/me/geofence-access", tags=["User G
 
 
 @user_access_router.get("", response_model=List[UserGeofenceAccessResponse])
-async def get_my_geofence_access(
+def get_my_geofence_access(
     current_user: User = Depends(require_write),
     db: Session = Depends(get_db)
 ):
@@ -2,14 +2,17 @@
 Geofence Router
 REST-compliant endpoints for geofence management
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from sqlalchemy.orm import Session
 from typing import Optional
 from uuid import UUID
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.dependencies import AuthDependency, require_read, require_write, require_delete
 from app.models.user import User
-from app.schemas.geofence import GeofenceCreate, GeofenceUpdate, GeofenceResponse, GeofenceListResponse, AccessInfo
+from app.schemas.geofence import (
+    GeofenceCreate, GeofenceUpdate, GeofenceResponse, GeofenceListResponse, AccessInfo,
+    GeofenceBatchEvaluateRequest, GeofenceBatchEvaluateResponse, BatchMembership
+)
 from app.services.geofence_service import GeofenceService
 from geoalchemy2.shape import to_shape
 from shapely.geometry import mapping
@@ -17,7 +20,11 @@ from shapely.geometry import mapping
 router = APIRouter(prefix="/geofences", tags=["Geofences"])
 
 
-def _geofence_to_response(geofence, include_access: bool = False) -> GeofenceResponse:
+def _geofence_to_response(
+    geofence,
+    include_access: bool = False,
+    distance_meters: Optional[float] = None
+) -> GeofenceResponse:
     """Convert geofence model to response schema"""
     geometry_shape = to_shape(geofence.geometry)
     center_shape = to_shape(geofence.center_point)
@@ -40,11 +47,13 @@ def _geofence_to_response(geofence, include_access: bool = False) -> GeofenceRes
         id=str(geofence.id),
         name=geofence.name,
         description=geofence.description,
+        geofence_type=geofence.geofence_type or "polygon",
         geometry=mapping(geometry_shape),
         center_point=Point(
             latitude=center_shape.y,
             longitude=center_shape.x
         ),
+        radius_meters=geofence.radius_meters,
         altitude_min_meters=geofence.altitude_min_meters,
         altitude_max_meters=geofence.altitude_max_meters,
         status=geofence.status,
@@ -52,25 +61,35 @@ def _geofence_to_response(geofence, include_access: bool = False) -> GeofenceRes
         organization_id=str(geofence.organization_id) if geofence.organization_id else None,
         created_at=geofence.created_at,
         updated_at=geofence.updated_at,
-        access_list=access_list
+        access_list=access_list,
+        distance_meters=distance_meters
     )
 
 
 @router.get("", response_model=GeofenceListResponse)
-async def list_geofences(
+def list_geofences(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     status: Optional[str] = Query(None),
     organization_id: Optional[str] = Query(None),
+    bbox: Optional[str] = Query(None, description="min_lon,min_lat,max_lon,max_lat (e.g. the map viewport)"),
     current_user: User = Depends(require_read),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """List geofences with pagination"""
     skip = (page - 1) * per_page
     org_id = UUID(organization_id) if organization_id else None
+    bounds = None
+    if bbox:
+        try:
+            bounds = tuple(float(value) for value in bbox.split(","))
+        except ValueError:
+            bounds = ()
+        if len(bounds) != 4:
+            raise HTTPException(status_code=400, detail="bbox must be min_lon,min_lat,max_lon,max_lat")
     
     geofences, total = GeofenceService.list_geofences(
-        db, skip=skip, limit=per_page, status=status, organization_id=org_id
+        db, skip=skip, limit=per_page, status=status, organization_id=org_id, bbox=bounds
     )
     
     return GeofenceListResponse(
@@ -83,7 +102,7 @@ async def list_geofences(
 
 
 @router.post("", response_model=GeofenceResponse, status_code=status.HTTP_201_CREATED)
-async def create_geofence(
+def create_geofence(
     geofence_data: GeofenceCreate,
     current_user: User = Depends(require_write),
     db: Session = Depends(get_db)
@@ -93,8 +112,33 @@ async def create_geofence(
     return _geofence_to_response(geofence)
 
 
+@router.post("/evaluate:batch", response_model=GeofenceBatchEvaluateResponse)
+def evaluate_batch(
+    request: GeofenceBatchEvaluateRequest,
+    current_user: User = Depends(require_read),
+    db: Session = Depends(get_read_db)
+):
+    """Active geofences containing each point, for backfills and what-if runs (no notifications are created)"""
+    memberships = GeofenceService.evaluate_batch(db, request.points)
+    
+    # Serialized directly: re-validating and jsonable_encoder-walking 100k results costs more than evaluating them
+    result = GeofenceBatchEvaluateResponse(
+        points=len(request.points),
+        memberships=[
+            BatchMembership(
+                index=i,
+                timestamp=request.points[i].timestamp,
+                asset_id=request.points[i].asset_id,
+                geofence_ids=[str(geofence_id) for geofence_id in geofence_ids]
+            )
+            for i, geofence_ids in memberships
+        ]
+    )
+    return Response(content=result.model_dump_json(), media_type="application/json")
+
+
 @router.get("/{geofence_id}", response_model=GeofenceResponse)
-async def get_geofence(
+def get_geofence(
     geofence_id: str,
     include_access: bool = Query(False, description="Include access list in response"),
     current_user: User = Depends(require_read),
@@ -108,7 +152,7 @@ async def get_geofence(
 
 
 @router.put("/{geofence_id}", response_model=GeofenceResponse)
-async def update_geofence(
+def update_geofence(
     geofence_id: str,
     geofence_data: GeofenceUpdate,
     current_user: User = Depends(require_write),
@@ -122,7 +166,7 @@ async def update_geofence(
 
 
 @router.patch("/{geofence_id}", response_model=GeofenceResponse)
-async def patch_geofence(
+def patch_geofence(
     geofence_id: str,
     geofence_data: GeofenceUpdate,
     current_user: User = Depends(require_write),
@@ -136,7 +180,7 @@ async def patch_geofence(
 
 
 @router.delete("/{geofence_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_geofence(
+def delete_geofence(
     geofence_id: str,
     current_user: User = Depends(require_delete),
     db: Session = Depends(get_db)
@@ -148,21 +192,22 @@ async def delete_geofence(
 
 
 @router.get("/nearby/search", response_model=GeofenceListResponse)
-async def find_nearby_geofences(
+def find_nearby_geofences(
     latitude: float = Query(..., ge=-90, le=90),
     longitude: float = Query(..., ge=-180, le=180),
     radius_meters: float = Query(5000, ge=0),
+    limit: int = Query(50, ge=1, le=500),
     current_user: User = Depends(require_read),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    """Find geofences near a point"""
-    geofences = GeofenceService.find_nearby_geofences(db, latitude, longitude, radius_meters)
+    """Find geofences within radius_meters of a point, nearest first"""
+    nearby = GeofenceService.find_nearby_geofences(db, latitude, longitude, radius_meters, limit)
     
     return GeofenceListResponse(
-        items=[_geofence_to_response(g) for g in geofences],
-        total=len(geofences),
+        items=[_geofence_to_response(g, distance_meters=d) for g, d in nearby],
+        total=len(nearby),
         page=1,
-        per_page=len(geofences),
+        per_page=limit,
         pages=1
     )
 
@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import Optional
 from uuid import UUID
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.dependencies import AuthDependency, require_read, require_write
 from app.models.user import User
 from app.schemas.notification import NotificationCreate, NotificationUpdate, NotificationResponse
@@ -33,6 +33,7 @@ def _notification_to_response(notification) -> NotificationResponse:
         distance_meters=notification.distance_meters,
         status=notification.status,
         is_read=notification.is_read,
+        triggered_at=notification.triggered_at,
         acknowledged_at=notification.acknowledged_at,
         resolved_at=notification.resolved_at,
         geofence_id=str(notification.geofence_id) if notification.geofence_id else None,
@@ -45,14 +46,14 @@ def _notification_to_response(notification) -> NotificationResponse:
 
 
 @router.get("", response_model=list[NotificationResponse])
-async def list_notifications(
+def list_notifications(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     status: Optional[str] = Query(None),
     severity: Optional[str] = Query(None),
     is_read: Optional[bool] = Query(None),
     current_user: User = Depends(require_read),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """List notifications"""
     skip = (page - 1) * per_page
@@ -63,7 +64,7 @@ async def list_notifications(
 
 
 @router.post("", response_model=NotificationResponse, status_code=status.HTTP_201_CREATED)
-async def create_notification(
+def create_notification(
     notification_data: NotificationCreate,
     current_user: User = Depends(require_write),
     db: Session = Depends(get_db)
@@ -74,20 +75,22 @@ async def create_notification(
 
 
 @router.post("/check-proximity/{asset_id}", response_model=list[NotificationResponse])
-async def check_proximity(
+def check_proximity(
     asset_id: str,
     latitude: float = Query(..., ge=-90, le=90),
     longitude: float = Query(..., ge=-180, le=180),
+    altitude: Optional[float] = Query(None, ge=0, description="Altitude in meters; defaults to the asset's last reported altitude"),
+    top: Optional[int] = Query(None, ge=1, description="Notify only the highest-priority matching geofences (e.g. 1 for alert routing)"),
     current_user: User = Depends(require_write),
     db: Session = Depends(get_db)
 ):
     """Check asset proximity to geofences and create notifications"""
-    notifications = NotificationService.check_proximity(db, UUID(asset_id), latitude, longitude)
+    notifications = NotificationService.check_proximity(db, UUID(asset_id), latitude, longitude, altitude, top)
     return [_notification_to_response(n) for n in notifications]
 
 
 @router.patch("/{notification_id}/acknowledge", response_model=NotificationResponse)
-async def acknowledge_notification(
+def acknowledge_notification(
     notification_id: str,
     current_user: User = Depends(require_write),
     db: Session = Depends(get_db)
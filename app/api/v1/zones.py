@@ -7,7 +7,7 @@ from sqlalchemy.orm import Session
 from typing import Optional
 from uuid import UUID
 import json
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.dependencies import AuthDependency, require_read, require_write, require_delete
 from app.models.user import User
 from app.schemas.zone import ZoneCreate, ZoneUpdate, ZoneResponse
@@ -32,12 +32,12 @@ def _zone_to_response(zone) -> ZoneResponse:
 
 
 @router.get("", response_model=list[ZoneResponse])
-async def list_zones(
+def list_zones(
     geofence_id: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     current_user: User = Depends(require_read),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """List zones"""
     skip = (page - 1) * per_page
@@ -48,7 +48,7 @@ async def list_zones(
 
 
 @router.post("", response_model=ZoneResponse, status_code=status.HTTP_201_CREATED)
-async def create_zone(
+def create_zone(
     zone_data: ZoneCreate,
     current_user: User = Depends(require_write),
     db: Session = Depends(get_db)
@@ -59,7 +59,7 @@ async def create_zone(
 
 
 @router.get("/{zone_id}", response_model=ZoneResponse)
-async def get_zone(
+def get_zone(
     zone_id: str,
     current_user: User = Depends(require_read),
     db: Session = Depends(get_db)
@@ -72,7 +72,7 @@ async def get_zone(
 
 
 @router.put("/{zone_id}", response_model=ZoneResponse)
-async def update_zone(
+def update_zone(
     zone_id: str,
     zone_data: ZoneUpdate,
     current_user: User = Depends(require_write),
@@ -86,7 +86,7 @@ async def update_zone(
 
 
 @router.patch("/{zone_id}", response_model=ZoneResponse)
-async def patch_zone(
+def patch_zone(
     zone_id: str,
     zone_data: ZoneUpdate,
     current_user: User = Depends(require_write),
@@ -100,7 +100,7 @@ async def patch_zone(
 
 
 @router.delete("/{zone_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_zone(
+def delete_zone(
     zone_id: str,
     current_user: User = Depends(require_delete),
     db: Session = Depends(get_db)
@@ -16,7 +16,7 @@ from app.models.api_key import APIKey, APIKeyScope
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 
-async def get_api_key(
+def get_api_key(
     api_key: Optional[str] = Depends(api_key_header),
     db: Session = Depends(get_db)
 ) -> Optional[APIKey]:
@@ -43,7 +43,7 @@ def require_scope(required_scope: str):
     Dependency that requires a specific scope.
     Use with API key authentication.
     """
-    async def scope_checker(
+    def scope_checker(
         api_key: Optional[APIKey] = Depends(get_api_key)
     ):
         if not api_key:
@@ -68,7 +68,7 @@ def require_any_scope(required_scopes: List[str]):
     """
     Dependency that requires any of the specified scopes.
     """
-    async def scope_checker(
+    def scope_checker(
         api_key: Optional[APIKey] = Depends(get_api_key)
     ):
         if not api_key:
@@ -0,0 +1,76 @@
+"""
+Database capabilities
+Probed once at startup so request paths never run catalog queries or extension DDL
+"""
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from app.core.config import get_settings
+
+settings = get_settings()
+
+SPATIAL_ENGINES = ("auto", "postgis", "inprocess", "cells")
+
+
+class DatabaseCapabilities:
+    """What the connected database supports and which spatial path services should take"""
+
+    __slots__ = ("probed", "dialect", "postgis_version", "spatial_engine")
+
+    def __init__(self):
+        self.probed = False
+        self.dialect: Optional[str] = None
+        self.postgis_version: Optional[str] = None
+        self.spatial_engine = "inprocess"
+
+    @property
+    def postgis(self) -> bool:
+        """True when spatial predicates should be pushed down to PostGIS"""
+        return self.spatial_engine == "postgis"
+
+    def as_dict(self) -> dict:
+        return {
+            "dialect": self.dialect,
+            "postgis_version": self.postgis_version,
+            "spatial_engine": self.spatial_engine
+        }
+
+
+capabilities = DatabaseCapabilities()
+
+
+def probe_capabilities(engine: Optional[Engine]) -> DatabaseCapabilities:
+    """
+    Record the dialect and installed PostGIS version, then resolve GEOFENCE_ENGINE.
+    The extension itself is created by migrations, never by the application.
+    """
+    capabilities.dialect = engine.dialect.name if engine is not None else None
+    capabilities.postgis_version = None
+    if engine is not None and capabilities.dialect == "postgresql":
+        try:
+            with engine.connect() as conn:
+                capabilities.postgis_version = conn.execute(
+                    text("SELECT extversion FROM pg_extension WHERE extname = 'postgis'")
+                ).scalar()
+        except Exception as e:
+            print(f"WARNING: Could not probe PostGIS: {e}")
+
+    requested = settings.GEOFENCE_ENGINE if settings.GEOFENCE_ENGINE in SPATIAL_ENGINES else "auto"
+    if requested == "cells":
+        capabilities.spatial_engine = "cells"
+    elif requested == "inprocess" or not capabilities.postgis_version:
+        if requested == "postgis":
+            print("WARNING: GEOFENCE_ENGINE=postgis but PostGIS is not installed; using in-process geometry")
+        capabilities.spatial_engine = "inprocess"
+    else:
+        capabilities.spatial_engine = "postgis"
+    capabilities.probed = True
+    return capabilities
+
+
+def get_capabilities() -> DatabaseCapabilities:
+    """Capabilities recorded at startup; probes on first use outside the app (scripts, workers)"""
+    if not capabilities.probed:
+        from app.core.database import engine
+        probe_capabilities(engine)
+    return capabilities
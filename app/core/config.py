@@ -18,6 +18,9 @@ class Settings(BaseSettings):
     DEBUG: bool = False
     ENVIRONMENT: str = "production"
     
+    # Optional subsystems (disabled subsystems are never imported)
+    API_KEYS_ENABLED: bool = True
+    
     # Security - Zero Trust
     SECRET_KEY: str = "dev-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
@@ -50,7 +53,27 @@ class Settings(BaseSettings):
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./geofence_dev.db")
     DB_POOL_SIZE: int = 20
     DB_MAX_OVERFLOW: int = 10
+    DB_MAX_CONNECTIONS: Optional[int] = None  # Server max_connections; when set, pool size is derived per worker
+    DB_RESERVED_CONNECTIONS: int = 5  # Kept free for migrations, admin and monitoring
+    APP_INSTANCES: int = 1  # Containers/hosts sharing the database
     DB_POOL_PRE_PING: bool = True
+    DB_CREATE_TABLES_ON_STARTUP: bool = False  # Schema is managed by Alembic; True runs create_all at startup (throwaway dev DBs)
+    DB_PGBOUNCER_MODE: bool = False  # DATABASE_URL points at PgBouncer in transaction pooling mode (no client-side pool)
+    DATABASE_READ_URL: Optional[str] = None  # Streaming replica for list/trajectory/nearby reads
+    DB_READ_MAX_LAG_SECONDS: float = 5.0  # Replica reads fall back to the primary beyond this replay lag
+    DB_READ_LAG_CHECK_INTERVAL_SECONDS: float = 2.0  # How long a lag measurement is reused
+    
+    # SQLite (edge deployments)
+    SQLITE_WAL_ENABLED: bool = True  # WAL journal, one writer connection + reader pool; False uses one connection, one session at a time
+    SQLITE_READ_POOL_SIZE: int = 4  # Concurrent reader connections
+    SQLITE_WRITE_TIMEOUT_SECONDS: float = 30.0  # Max wait in the queue for the writer (or only) connection
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # Wait on locks held by other processes before SQLITE_BUSY
+    SQLITE_CACHE_SIZE_KB: int = 65536  # Page cache per connection
+    SQLITE_MMAP_SIZE_BYTES: int = 268435456  # Memory-mapped I/O window (0 disables)
+    
+    # Server (gunicorn.conf.py reads the same environment variables)
+    WEB_CONCURRENCY: int = 1  # Worker processes per instance
+    SHUTDOWN_DRAIN_TIMEOUT_SECONDS: float = 20.0  # Wait for in-flight location writes on shutdown
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -62,13 +85,33 @@ class Settings(BaseSettings):
     
     # AI/LLM Service
     OPENAI_API_KEY: Optional[str] = None
-    AI_SERVICE_ENABLED: bool = True
+    AI_SERVICE_ENABLED: bool = True  # False also removes the /ai routes and job workers
+    AI_PROVIDER: str = "openai"  # openai, stub (deterministic offline responses)
     AI_MODEL: str = "gpt-4-turbo-preview"
     AI_TEMPERATURE: float = 0.7
+    AI_CONTEXT_TOKEN_BUDGET: int = 3000  # Prompt tokens per chat turn (system + summary + history + message)
+    AI_CONTEXT_MAX_MESSAGES: int = 50  # Newest messages considered for the window
+    AI_SUMMARY_TOKEN_BUDGET: int = 500  # Size cap for the rolling conversation summary
+    AI_RECOMMENDATION_CACHE_TTL_SECONDS: int = 3600  # 0 disables the recommendation cache
+    AI_JOB_BACKEND: str = "inprocess"  # inprocess (asyncio workers in the API process), celery
+    AI_JOB_WORKERS: int = 2  # In-process worker tasks
+    AI_JOB_BATCH_SIZE: int = 10  # Entities per batched recommendation prompt
+    AI_JOB_LEASE_SECONDS: int = 900  # A job still "running" after this long is presumed abandoned and may be rerun
+    CELERY_BROKER_URL: Optional[str] = None  # Defaults to REDIS_URL
     
     # Geospatial
     DEFAULT_SRID: int = 4326  # WGS84
-    MAX_GEOFENCE_POINTS: int = 1000
+    GEOFENCE_ENGINE: str = "auto"  # auto (PostGIS when installed), postgis, inprocess (shapely index in each worker), cells
+    GEOFENCE_CELL_PRECISION: int = 7  # Geohash length of the cells engine (7 is ~150 m); large fences use coarser cells
+    GEOFENCE_CELL_MAX_PER_FENCE: int = 20000  # Coverage size cap that decides how much coarser
+    GEOFENCE_INDEX_REFRESH_SECONDS: float = 5.0  # How often workers check for geofence changes made elsewhere
+    SAFE_RADIUS_CACHE_SIZE: int = 100000  # Assets whose last proximity result is kept per worker (0 disables)
+    SAFE_RADIUS_MAX_AGE_SECONDS: float = 60.0  # Re-evaluate at least this often even when an asset stays put
+    SWEPT_PATH_MAX_GAP_SECONDS: float = 300.0  # Pings further apart are not joined into a path for enter/exit detection
+    MAX_GEOFENCE_POINTS: int = 100000  # Vertex limit per polygon geofence
+    GEOFENCE_TILE_MAX_VERTICES: int = 256  # Polygons with more vertices are split into tiles of at most this many
+    MAX_CIRCLE_RADIUS_METERS: float = 50000.0  # Largest radius accepted for circular geofences
+    GEOFENCE_BATCH_MAX_POINTS: int = 100000  # Points accepted by one batch evaluation request
     
     # WebSocket
     WS_HEARTBEAT_INTERVAL: int = 30
@@ -77,6 +120,17 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "json"
     
+    # Monitoring
+    METRICS_ENABLED: bool = True
+    
+    # Query profiling (opt-in, adds per-statement overhead)
+    QUERY_PROFILING_ENABLED: bool = False
+    PROFILING_SLOW_REQUEST_MS: float = 500.0
+    PROFILING_SLOW_QUERY_MS: float = 100.0
+    PROFILING_DUPLICATE_THRESHOLD: int = 3  # Same statement shape this often in one request => N+1 suspect
+    PROFILING_SERVER_TIMING: bool = True
+    PROFILING_REPORT_FILE: Optional[str] = None  # JSON lines; logs to app.profiling when unset
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
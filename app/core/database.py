@@ -2,78 +2,341 @@
 Database configuration and session management
 PostgreSQL with PostGIS support, with SQLite fallback
 """
+from fastapi import Depends
 from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import QueuePool, StaticPool
-from typing import Generator, Optional
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.pool import NullPool, QueuePool
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+from typing import Generator, Optional, Tuple
 from app.core.config import get_settings
+from app.core.metrics import DB_REPLICA_LAG, TimedQueuePool, instrument_engine
 import os
+import threading
+import time
 
 settings = get_settings()
 
+
+def pool_limits() -> Tuple[int, int]:
+    """
+    (pool_size, max_overflow) for this process. With DB_MAX_CONNECTIONS set, the server's
+    connection budget (minus DB_RESERVED_CONNECTIONS) is split across every worker process
+    (WEB_CONCURRENCY x APP_INSTANCES), two thirds persistent and the rest overflow.
+    """
+    if not settings.DB_MAX_CONNECTIONS:
+        return settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+    
+    processes = max(1, settings.WEB_CONCURRENCY) * max(1, settings.APP_INSTANCES)
+    per_process = max(2, (settings.DB_MAX_CONNECTIONS - settings.DB_RESERVED_CONNECTIONS) // processes)
+    pool_size = max(1, per_process * 2 // 3)
+    return pool_size, per_process - pool_size
+
+
+def postgres_engine(url: str) -> Engine:
+    """
+    PostgreSQL engine. In DB_PGBOUNCER_MODE PgBouncer (transaction pooling) owns the pool:
+    a client-side pool would pin server connections, and psycopg 3 server-side prepared
+    statements would break when consecutive transactions land on different backends.
+    """
+    connect_args = {}
+    if settings.DB_PGBOUNCER_MODE:
+        if make_url(url).get_driver_name() == "psycopg":
+            connect_args["prepare_threshold"] = None
+        return create_engine(url, poolclass=NullPool, connect_args=connect_args, echo=settings.DEBUG)
+    
+    pool_size, max_overflow = pool_limits()
+    return create_engine(
+        url,
+        poolclass=TimedQueuePool if settings.METRICS_ENABLED else QueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        echo=settings.DEBUG
+    )
+
+
+# Replay lag in seconds; 0 when the server is a primary or has replayed everything it received
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
+
+class ReplicaLagGuard:
+    """
+    Decides whether reads may go to the replica. The lag is measured at most once per
+    DB_READ_LAG_CHECK_INTERVAL_SECONDS; an unreachable replica or unknown lag counts as stale.
+    """
+    
+    def __init__(self, replica: Engine, max_lag_seconds: float, check_interval_seconds: float):
+        self.replica = replica
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.lag_seconds: Optional[float] = None
+        self._checked_at = float("-inf")
+        self._healthy = False
+        self._lock = threading.Lock()
+    
+    def healthy(self) -> bool:
+        if time.monotonic() - self._checked_at < self.check_interval_seconds:
+            return self._healthy
+        with self._lock:
+            # Another thread may have measured while we waited
+            if time.monotonic() - self._checked_at >= self.check_interval_seconds:
+                self._healthy = self._measure()
+                self._checked_at = time.monotonic()
+        return self._healthy
+    
+    def _measure(self) -> bool:
+        try:
+            with self.replica.connect() as conn:
+                lag = conn.execute(REPLICA_LAG_SQL).scalar()
+        except Exception as e:
+            print(f"WARNING: Read replica unavailable, reading from primary: {e}")
+            self.lag_seconds = None
+            return False
+        self.lag_seconds = float(lag) if lag is not None else None
+        if self.lag_seconds is None:
+            return False
+        DB_REPLICA_LAG.set(self.lag_seconds)
+        return self.lag_seconds <= self.max_lag_seconds
+
+
+def sqlite_pragmas(read_only: bool = False):
+    """Connect hook applying the SQLite performance profile (WAL, relaxed fsync, cache, mmap)"""
+    def _apply(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        try:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            # Durable at checkpoints rather than every commit; safe from corruption in WAL mode
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+            cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+            cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE_BYTES)}")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.execute("PRAGMA foreign_keys=ON")
+            if read_only:
+                cursor.execute("PRAGMA query_only=ON")
+        finally:
+            cursor.close()
+    return _apply
+
+
+def sqlite_engines(url: str) -> Tuple[Engine, Optional[Engine]]:
+    """
+    (writer, reader) engines for SQLite. With SQLITE_WAL_ENABLED and a file database, reads
+    get their own pool of query-only connections; otherwise the reader is None and every
+    session shares the writer's one connection.
+    """
+    poolclass = TimedQueuePool if settings.METRICS_ENABLED else QueuePool
+    
+    # One writer connection: concurrent write transactions queue for it in the pool
+    # (FIFO, up to SQLITE_WRITE_TIMEOUT_SECONDS) instead of failing with "database is locked".
+    # Without WAL it is the only connection (an in-memory database lives only as long as it);
+    # a single-slot pool rather than StaticPool, so a session holds it exclusively: threadpool
+    # requests interleaving statements on one connection corrupt each other's transactions
+    writer = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        poolclass=poolclass,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=settings.SQLITE_WRITE_TIMEOUT_SECONDS,
+        echo=settings.DEBUG
+    )
+    if not settings.SQLITE_WAL_ENABLED or ":memory:" in url or "mode=memory" in url:
+        return writer, None
+    event.listen(writer, "connect", sqlite_pragmas())
+    
+    # WAL readers see the last committed snapshot and never block the writer
+    reader = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        poolclass=poolclass,
+        pool_size=max(1, settings.SQLITE_READ_POOL_SIZE),
+        max_overflow=0,
+        echo=settings.DEBUG
+    )
+    event.listen(reader, "connect", sqlite_pragmas(read_only=True))
+    return writer, reader
+
+
+class RoutingSession(Session):
+    """
+    Session for the SQLite WAL profile. Reads go to the reader pool; flushes, DML,
+    SELECT ... FOR UPDATE and anything after the first write in a transaction go to
+    the single writer connection, so a transaction always reads its own writes.
+    """
+    
+    writer: Optional[Engine] = None
+    reader: Optional[Engine] = None
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._writing = False
+    
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._writing or self._flushing or _is_write(mapper, clause):
+            self._writing = True
+            return self.writer
+        return self.reader
+    
+    def commit(self) -> None:
+        try:
+            super().commit()
+        finally:
+            self._writing = False
+    
+    def rollback(self) -> None:
+        try:
+            super().rollback()
+        finally:
+            self._writing = False
+    
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self._writing = False
+
+
+def _is_write(mapper, clause) -> bool:
+    if clause is None:
+        # session.connection() without a statement: assume the caller is about to write
+        return mapper is None
+    if isinstance(clause, UpdateBase):
+        return True
+    if isinstance(clause, TextClause):
+        return not clause.text.lstrip().upper().startswith(("SELECT", "WITH"))
+    return getattr(clause, "_for_update_arg", None) is not None
+
+
 # Try to use PostgreSQL, with graceful error handling
 database_url = settings.DATABASE_URL
 engine = None
+read_engine = None  # SQLite WAL reader pool; None routes everything to `engine`
+replica_engine = None  # PostgreSQL read replica (DATABASE_READ_URL)
 use_sqlite = False
 
 # Check if we should use SQLite fallback
 if "sqlite" in database_url.lower() or os.getenv("USE_SQLITE", "").lower() == "true":
     use_sqlite = True
     print("WARNING: Using SQLite - Geospatial features will be limited")
-    database_url = "sqlite:///./geofence_dev.db"
-    engine = create_engine(
-        database_url,
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-        echo=settings.DEBUG
-    )
+    if "sqlite" not in database_url.lower():
+        database_url = "sqlite:///./geofence_dev.db"
+    
+    engine, read_engine = sqlite_engines(database_url)
 else:
     try:
         # Try PostgreSQL with PostGIS
-        engine = create_engine(
-            database_url,
-            poolclass=QueuePool,
-            pool_size=settings.DB_POOL_SIZE,
-            max_overflow=settings.DB_MAX_OVERFLOW,
-            pool_pre_ping=settings.DB_POOL_PRE_PING,
-            echo=settings.DEBUG
-        )
-        
-        # Test connection
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-        
-        # Enable PostGIS extension on connection (only for PostgreSQL)
-        @event.listens_for(engine, "connect")
-        def set_postgis_extension(dbapi_conn, connection_record):
-            """Enable PostGIS extension on each connection"""
-            try:
-                with dbapi_conn.cursor() as cursor:
-                    cursor.execute("CREATE EXTENSION IF NOT EXISTS postgis")
-                    cursor.execute("CREATE EXTENSION IF NOT EXISTS postgis_topology")
-            except Exception:
-                # If PostGIS is not available, continue without it
-                pass
-        
-        print("SUCCESS: Connected to PostgreSQL database")
+        engine = postgres_engine(database_url)
+        if settings.DATABASE_READ_URL:
+            replica_engine = postgres_engine(settings.DATABASE_READ_URL)
+
     except Exception as e:
-        print(f"WARNING: Could not connect to PostgreSQL: {e}")
+        print(f"WARNING: Could not configure PostgreSQL engine: {e}")
         print("INFO: The app will start but database features will be unavailable.")
         print("TIP: To enable full features, set up PostgreSQL or use: USE_SQLITE=true")
         # Create a dummy engine that will fail gracefully
         engine = None
 
-if engine:
+if engine and settings.METRICS_ENABLED:
+    instrument_engine(engine)
+    if read_engine is not None:
+        instrument_engine(read_engine, "read")
+    if replica_engine is not None:
+        instrument_engine(replica_engine, "replica")
+
+if engine and settings.QUERY_PROFILING_ENABLED:
+    from app.core.profiling import attach_profiler
+    attach_profiler(engine)
+    for extra_engine in (read_engine, replica_engine):
+        if extra_engine is not None:
+            attach_profiler(extra_engine)
+
+if engine and read_engine is not None:
+    RoutingSession.writer = engine
+    RoutingSession.reader = read_engine
+    SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
+elif engine:
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 else:
     SessionLocal = None
 
+if engine and replica_engine is not None:
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    replica_guard = ReplicaLagGuard(
+        replica_engine, settings.DB_READ_MAX_LAG_SECONDS, settings.DB_READ_LAG_CHECK_INTERVAL_SECONDS
+    )
+else:
+    ReadSessionLocal = None
+    replica_guard = None
+
 Base = declarative_base()
 
-# Store database availability
+# Store database availability (confirmed by init_db at startup)
 DB_AVAILABLE = engine is not None
 
+
+def check_database_connection() -> bool:
+    """Probe the database once and record the result in DB_AVAILABLE"""
+    global DB_AVAILABLE
+    if engine is None:
+        DB_AVAILABLE = False
+        return False
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        DB_AVAILABLE = True
+    except Exception as e:
+        print(f"WARNING: Could not connect to database: {e}")
+        print("INFO: The app will start but database features will be unavailable.")
+        print("TIP: To enable full features, set up PostgreSQL or use: USE_SQLITE=true")
+        DB_AVAILABLE = False
+    return DB_AVAILABLE
+
+
+def init_db() -> bool:
+    """
+    Startup hook: verify connectivity, register models and probe capabilities. Schema changes
+    are applied with `alembic upgrade head`; create_all only runs when DB_CREATE_TABLES_ON_STARTUP is set.
+    """
+    if not check_database_connection():
+        return False
+    
+    # Register every mapper before the first request, including disabled subsystems' tables
+    from app.models import import_all_models
+    import_all_models()
+    
+    from app.core.capabilities import probe_capabilities
+    capabilities = probe_capabilities(engine)
+    print(f"INFO: Spatial engine: {capabilities.spatial_engine} (PostGIS {capabilities.postgis_version or 'not installed'})")
+    
+    if settings.DB_CREATE_TABLES_ON_STARTUP:
+        try:
+            Base.metadata.create_all(bind=engine)
+            print("SUCCESS: Database tables created successfully")
+        except Exception as e:
+            print(f"WARNING: Could not create database tables: {e}")
+    return True
+
+
+def dispose_db() -> None:
+    """Shutdown hook: close pooled connections so the server sees them released immediately"""
+    for extra_engine in (read_engine, replica_engine):
+        if extra_engine is not None:
+            extra_engine.dispose()
+    if engine is not None:
+        engine.dispose()
+
+
 def get_db() -> Generator[Session, None, None]:
     """
     Database session dependency
@@ -88,3 +351,20 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
+
+def get_read_db(db: Session = Depends(get_db)) -> Generator[Session, None, None]:
+    """
+    Database session dependency for read-only endpoints
+    Uses the read replica while its lag is within DB_READ_MAX_LAG_SECONDS, otherwise the
+    request's primary session (shared with the auth dependencies, so a request never holds
+    two connections from a single-connection pool)
+    """
+    if replica_guard is None or not replica_guard.healthy():
+        yield db
+        return
+    
+    replica_db = ReadSessionLocal()
+    try:
+        yield replica_db
+    finally:
+        replica_db.close()
@@ -20,7 +20,7 @@ class AuthDependency:
     """Authentication dependency manager"""
     
     @staticmethod
-    async def get_current_user(
+    def get_current_user(
         credentials: HTTPAuthorizationCredentials = Security(security),
         db: Session = Depends(get_db)
     ) -> User:
@@ -76,7 +76,7 @@ class PermissionChecker:
     def __init__(self, required_permissions: List[str]):
         self.required_permissions = required_permissions
     
-    async def __call__(
+    def __call__(
         self,
         current_user: User = Depends(AuthDependency.get_current_user),
         db: Session = Depends(get_db)
@@ -116,7 +116,7 @@ class RoleChecker:
     def __init__(self, allowed_roles: List[str]):
         self.allowed_roles = allowed_roles
     
-    async def __call__(
+    def __call__(
         self,
         current_user: User = Depends(AuthDependency.get_current_user),
         db: Session = Depends(get_db)
@@ -0,0 +1,203 @@
+"""
+Prometheus metrics
+Request, database and geospatial hot-path instrumentation
+"""
+from contextvars import ContextVar
+from typing import Optional
+import os
+import time
+
+from fastapi import Response
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+
+# HTTP
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"]
+)
+
+# Database
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Duration of individual SQL statements",
+    ["engine", "operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "Number of SQL statements executed per HTTP request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds",
+    "Total time spent in SQL statements per HTTP request",
+    ["route"]
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    ["engine"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Connections currently checked out of the pool",
+    ["engine"],
+    multiprocess_mode="livesum"
+)
+DB_REPLICA_LAG = Gauge(
+    "db_replica_lag_seconds",
+    "Last measured replay lag of the read replica",
+    multiprocess_mode="max"
+)
+
+# Geospatial
+PROXIMITY_CHECK_LATENCY = Histogram(
+    "geofence_proximity_check_seconds",
+    "Latency of a single proximity check",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+GEOFENCES_EVALUATED = Histogram(
+    "geofence_evaluations_per_ping",
+    "Geofences evaluated for a single location ping",
+    buckets=(0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+)
+
+# Caches
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache name and result (hit ratio = hit / total)",
+    ["cache", "result"]
+)
+
+
+class RequestStats:
+    """Per-request database counters, shared with threadpool dependencies via contextvars"""
+
+    __slots__ = ("query_count", "query_seconds")
+
+    def __init__(self):
+        self.query_count = 0
+        self.query_seconds = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Stats for the request being handled, if any"""
+    return _request_stats.get()
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Record a cache hit or miss"""
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports how long callers wait for a connection"""
+
+    engine_name = "primary"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(engine=self.engine_name).observe(time.perf_counter() - start)
+
+
+def instrument_engine(engine: Engine, name: str = "primary") -> None:
+    """Attach query timing and pool listeners to an engine"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["metrics_query_start"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        DB_QUERY_DURATION.labels(engine=name, operation=operation).observe(elapsed)
+
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.query_count += 1
+            stats.query_seconds += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("metrics_query_start"):
+            conn.info["metrics_query_start"].pop()
+
+    pool = engine.pool
+    if isinstance(pool, TimedQueuePool):
+        pool.engine_name = name
+    if isinstance(pool, QueuePool):
+        # Updated on events rather than set_function, which multiprocess mode cannot collect
+        checked_out = DB_POOL_CHECKED_OUT.labels(engine=name)
+
+        @event.listens_for(pool, "checkout")
+        def _on_checkout(dbapi_conn, connection_record, connection_proxy):
+            checked_out.set(pool.checkedout())
+
+        @event.listens_for(pool, "checkin")
+        def _on_checkin(dbapi_conn, connection_record):
+            checked_out.set(pool.checkedout())
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency and per-request DB usage"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stats.reset(token)
+            # Use the route template, not the raw path, to keep label cardinality bounded
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            REQUEST_LATENCY.labels(
+                method=scope["method"],
+                route=route_path,
+                status=str(status_code)
+            ).observe(time.perf_counter() - start)
+            DB_QUERIES_PER_REQUEST.labels(route=route_path).observe(stats.query_count)
+            DB_TIME_PER_REQUEST.labels(route=route_path).observe(stats.query_seconds)
+
+
+def metrics_response() -> Response:
+    """
+    Render metrics in Prometheus text format. Under a multi-worker server
+    (PROMETHEUS_MULTIPROC_DIR set) every worker's samples are aggregated.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,207 @@
+"""
+Per-request query profiler
+Opt-in statement recording, duplicate-shape detection and slow-request reports
+"""
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+import json
+import logging
+import os
+import re
+import sys
+import time
+
+from sqlalchemy import event
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.engine import Engine
+from app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger("app.profiling")
+
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_CALLER_DIRS = tuple(os.path.join(_APP_ROOT, d) + os.sep for d in ("services", "api", "core"))
+_PROFILER_FILE = os.path.abspath(__file__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_IN_LIST_RE = re.compile(r"\bIN\s*\((?:\s*(?:\?|%\([^)]+\)s|:\w+|__\[POSTCOMPILE_\w+\])\s*,?)+\)", re.IGNORECASE)
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a statement so repeated executions of the same query compare equal"""
+    shape = _WHITESPACE_RE.sub(" ", statement).strip()
+    shape = _IN_LIST_RE.sub("IN (...)", shape)
+    return _LITERAL_RE.sub("?", shape)
+
+
+def _find_caller() -> str:
+    """Name of the innermost application function (service method or route) issuing a query"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename != _PROFILER_FILE and filename.startswith(_CALLER_DIRS):
+            code = frame.f_code
+            return f"{getattr(code, 'co_qualname', code.co_name)} ({os.path.relpath(filename, _APP_ROOT)}:{frame.f_lineno})"
+        frame = frame.f_back
+    return "unknown"
+
+
+class QueryRecord:
+    """A single executed statement"""
+
+    __slots__ = ("statement", "shape", "duration_ms", "caller")
+
+    def __init__(self, statement: str, duration_ms: float, caller: str):
+        self.statement = statement
+        self.shape = statement_shape(statement)
+        self.duration_ms = duration_ms
+        self.caller = caller
+
+
+class RequestProfile:
+    """All statements executed while handling one request"""
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.queries: List[QueryRecord] = []
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    @property
+    def db_ms(self) -> float:
+        return sum(q.duration_ms for q in self.queries)
+
+    def duplicate_shapes(self, threshold: int) -> Dict[str, List[QueryRecord]]:
+        """Statement shapes executed at least `threshold` times (N+1 candidates)"""
+        grouped: Dict[str, List[QueryRecord]] = {}
+        for query in self.queries:
+            grouped.setdefault(query.shape, []).append(query)
+        return {shape: records for shape, records in grouped.items() if len(records) >= threshold}
+
+    def slow_queries(self, threshold_ms: float) -> List[QueryRecord]:
+        return [q for q in self.queries if q.duration_ms >= threshold_ms]
+
+    def server_timing(self) -> str:
+        """Value for the Server-Timing response header"""
+        return (
+            f'db;dur={self.db_ms:.2f};desc="{len(self.queries)} queries", '
+            f"app;dur={self.elapsed_ms:.2f}"
+        )
+
+    def report(self) -> dict:
+        """Structured slow-request report"""
+        duplicates = self.duplicate_shapes(settings.PROFILING_DUPLICATE_THRESHOLD)
+        return {
+            "method": self.method,
+            "path": self.path,
+            "total_ms": round(self.elapsed_ms, 2),
+            "db_ms": round(self.db_ms, 2),
+            "query_count": len(self.queries),
+            "duplicate_shapes": [
+                {
+                    "shape": shape,
+                    "count": len(records),
+                    "total_ms": round(sum(r.duration_ms for r in records), 2),
+                    "callers": sorted({r.caller for r in records})
+                }
+                for shape, records in sorted(duplicates.items(), key=lambda item: -len(item[1]))
+            ],
+            "slow_queries": [
+                {"statement": q.shape, "duration_ms": round(q.duration_ms, 2), "caller": q.caller}
+                for q in self.slow_queries(settings.PROFILING_SLOW_QUERY_MS)
+            ],
+            "queries": [
+                {"duration_ms": round(q.duration_ms, 2), "caller": q.caller, "statement": q.shape}
+                for q in self.queries
+            ]
+        }
+
+    def exceeds_thresholds(self) -> bool:
+        return (
+            self.elapsed_ms >= settings.PROFILING_SLOW_REQUEST_MS
+            or bool(self.slow_queries(settings.PROFILING_SLOW_QUERY_MS))
+            or bool(self.duplicate_shapes(settings.PROFILING_DUPLICATE_THRESHOLD))
+        )
+
+
+_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+def attach_profiler(engine: Engine) -> None:
+    """Record every statement executed on `engine` into the active request profile"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _profile.get() is not None:
+            conn.info.setdefault("profiler_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = _profile.get()
+        starts = conn.info.get("profiler_query_start")
+        if profile is None or not starts:
+            return
+        duration_ms = (time.perf_counter() - starts.pop()) * 1000
+        profile.queries.append(QueryRecord(statement, duration_ms, _find_caller()))
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("profiler_query_start"):
+            conn.info["profiler_query_start"].pop()
+
+
+def _write_report(profile: RequestProfile) -> None:
+    report = profile.report()
+    if settings.PROFILING_REPORT_FILE:
+        with open(settings.PROFILING_REPORT_FILE, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(report) + "\n")
+        return
+
+    lines = [
+        f"Slow request {report['method']} {report['path']}: "
+        f"{report['total_ms']}ms total, {report['db_ms']}ms in {report['query_count']} queries"
+    ]
+    for dup in report["duplicate_shapes"]:
+        lines.append(f"  duplicate x{dup['count']} ({dup['total_ms']}ms) from {', '.join(dup['callers'])}: {dup['shape']}")
+    for slow in report["slow_queries"]:
+        lines.append(f"  slow {slow['duration_ms']}ms from {slow['caller']}: {slow['statement']}")
+    logger.warning("\n".join(lines))
+
+
+class QueryProfilerMiddleware:
+    """ASGI middleware that profiles each request and emits Server-Timing and slow-request reports"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"])
+        token = _profile.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and settings.PROFILING_SERVER_TIMING:
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", profile.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _profile.reset(token)
+            if profile.exceeds_thresholds():
+                try:
+                    # File I/O and report formatting stay off the event loop
+                    await run_in_threadpool(_write_report, profile)
+                except Exception as e:
+                    logger.error(f"Could not write profiling report: {e}")
@@ -0,0 +1,22 @@
+"""
+Production server worker
+Gunicorn worker class running uvicorn with uvloop and httptools
+"""
+from typing import Any
+from uvicorn.workers import UvicornWorker
+
+
+class UvloopWorker(UvicornWorker):
+    """UvicornWorker pinned to uvloop/httptools that honours gunicorn's graceful_timeout"""
+
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        "lifespan": "on",
+        "server_header": False
+    }
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # Let in-flight requests finish before lifespan shutdown (which drains location writes)
+        self.config.timeout_graceful_shutdown = max(1, int(self.cfg.graceful_timeout) - 5)
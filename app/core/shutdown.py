@@ -0,0 +1,54 @@
+"""
+Graceful shutdown
+Tracks in-flight writes so a stopping worker finishes them before releasing the database
+"""
+from contextlib import contextmanager
+from typing import Iterator
+import asyncio
+import threading
+import time
+
+
+class InFlightTracker:
+    """
+    Counts operations in progress. Thread-safe, because tracked work runs in the threadpool
+    and can outlive a request cancelled by the server's graceful timeout.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._count = 0
+        self._lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+
+    @property
+    def in_flight(self) -> int:
+        return self._count
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        with self._lock:
+            self._count += 1
+            self._idle.clear()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._count -= 1
+                if self._count == 0:
+                    self._idle.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """Wait until in-flight operations finish; False on timeout"""
+        deadline = time.monotonic() + timeout
+        while not self._idle.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(0.05, remaining))
+        return True
+
+
+# Asset location updates (asset row + trajectory point, followed by proximity checks)
+location_writes = InFlightTracker("location_writes")
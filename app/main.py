@@ -2,30 +2,44 @@
 Main FastAPI Application
 Production-grade geo-fencing platform backend
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from app.core.config import get_settings
 from app.api.v1 import api_router
-from app.core.database import Base, engine, DB_AVAILABLE
-from app.models import ai_service, api_key, asset, geofence, geofence_access, notification, organization, rbac, user, zone
+from app.core.database import dispose_db, init_db
+from app.core.shutdown import location_writes
+from app.core.metrics import MetricsMiddleware, metrics_response
 import logging
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
-# Create database tables (only if database is available)
-from app.core.database import engine, DB_AVAILABLE
-if engine and DB_AVAILABLE:
-    try:
-        Base.metadata.create_all(bind=engine)
-        logger.info("SUCCESS: Database tables created successfully")
-    except Exception as e:
-        logger.warning(f"WARNING: Could not create database tables: {e}")
-        logger.info("INFO: App will run in limited mode without database")
-else:
-    logger.warning("WARNING: Database not available - API endpoints requiring database will not work")
-    logger.info("TIP: To enable database features, set up PostgreSQL or use USE_SQLITE=true")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Database checks, schema creation and background workers run here, not at import"""
+    if await run_in_threadpool(init_db):
+        logger.info("SUCCESS: Database ready")
+    else:
+        logger.warning("WARNING: Database not available - API endpoints requiring database will not work")
+        logger.info("TIP: To enable database features, set up PostgreSQL or use USE_SQLITE=true")
+    
+    if settings.AI_SERVICE_ENABLED:
+        from app.services.recommendation_jobs import start_job_workers, stop_job_workers
+        await start_job_workers()
+    
+    yield
+    
+    # Let location writes that outlived their requests commit before the pool is closed
+    if not await location_writes.drain(settings.SHUTDOWN_DRAIN_TIMEOUT_SECONDS):
+        logger.warning(f"WARNING: {location_writes.in_flight} location writes still running at shutdown")
+    if settings.AI_SERVICE_ENABLED:
+        await stop_job_workers()
+    dispose_db()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -33,7 +47,8 @@ app = FastAPI(
     description="Production-grade geo-fencing platform with AI-first, zero-trust architecture",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
-    openapi_url="/api/openapi.json"
+    openapi_url="/api/openapi.json",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -45,6 +60,15 @@ app.add_middleware(
     allow_headers=settings.get_cors_headers(),
 )
 
+# Prometheus instrumentation
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Per-request query profiler (opt-in)
+if settings.QUERY_PROFILING_ENABLED:
+    from app.core.profiling import QueryProfilerMiddleware
+    app.add_middleware(QueryProfilerMiddleware)
+
 # Include API routers
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
@@ -70,6 +94,13 @@ async def health_check():
     }
 
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus scrape endpoint"""
+        return metrics_response()
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler"""
@@ -1,2 +1,13 @@
 """Database models"""
+import importlib
 
+MODEL_MODULES = (
+    "user", "rbac", "organization", "geofence", "geofence_access", "geofence_stats", "geofence_cell", "geofence_tile",
+    "geofence_version", "zone", "asset", "notification", "api_key", "ai_service"
+)
+
+
+def import_all_models() -> None:
+    """Register every model with Base.metadata (schema creation, workers, scripts)"""
+    for name in MODEL_MODULES:
+        importlib.import_module(f"app.models.{name}")
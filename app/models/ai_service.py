@@ -2,7 +2,7 @@
 AI/LLM service models
 For explanations, recommendations, and chat interactions
 """
-from sqlalchemy import Column, String, Text, ForeignKey, JSON
+from sqlalchemy import Column, String, Text, ForeignKey, JSON, Integer, Index, DateTime
 from sqlalchemy.orm import relationship
 from app.models.base import BaseModel
 
@@ -15,8 +15,13 @@ class AIConversation(BaseModel):
     context_type = Column(String(50))  # e.g., "geofence", "asset", "zone", "general"
     context_id = Column(String(36))  # UUID of related entity
     
+    # Rolling summary of turns that no longer fit the context window
+    summary = Column(Text)
+    summarized_message_count = Column(Integer, default=0, nullable=False)  # Oldest N messages folded into summary
+    last_sequence = Column(Integer, default=0, nullable=False)  # Highest message sequence handed out
+    
     # Relationships
-    messages = relationship("AIMessage", back_populates="conversation", cascade="all, delete-orphan", order_by="AIMessage.created_at")
+    messages = relationship("AIMessage", back_populates="conversation", cascade="all, delete-orphan", order_by="AIMessage.sequence")
     user_id = Column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     
     def __repr__(self):
@@ -28,6 +33,7 @@ class AIMessage(BaseModel):
     __tablename__ = "ai_messages"
     
     conversation_id = Column(ForeignKey("ai_conversations.id", ondelete="CASCADE"), nullable=False, index=True)
+    sequence = Column(Integer, nullable=False)  # Position in the conversation; turns can share created_at
     role = Column(String(20), nullable=False)  # "user" or "assistant"
     content = Column(Text, nullable=False)
     message_metadata = Column(JSON)  # Additional metadata (model used, tokens, etc.)
@@ -35,6 +41,10 @@ class AIMessage(BaseModel):
     # Relationships
     conversation = relationship("AIConversation", back_populates="messages")
     
+    __table_args__ = (
+        Index("idx_ai_message_sequence", "conversation_id", "sequence", unique=True),
+    )
+    
     def __repr__(self):
         return f"<AIMessage {self.role} in {self.conversation_id}>"
 
@@ -52,6 +62,31 @@ class AIRecommendation(BaseModel):
     status = Column(String(20), default="pending")  # pending, accepted, rejected, implemented
     recommendation_metadata = Column(JSON)
     
+    # Canonical hash of (entity, recommendation type, context); set only on cacheable results
+    context_hash = Column(String(64))
+    
+    __table_args__ = (
+        Index("idx_ai_recommendation_cache", "context_hash", "created_at"),
+    )
+    
     def __repr__(self):
         return f"<AIRecommendation {self.title}>"
 
+
+
+class AIRecommendationJob(BaseModel):
+    """Queued recommendation generation for one or more entities"""
+    __tablename__ = "ai_recommendation_jobs"
+    
+    status = Column(String(20), default="queued", nullable=False, index=True)  # queued, running, completed, failed
+    entity_type = Column(String(50), nullable=False)
+    entity_ids = Column(JSON, nullable=False)  # List of entity UUIDs
+    recommendation_type = Column(String(50), nullable=False)
+    recommendation_ids = Column(JSON)  # Entity ID -> AIRecommendation ID, set on completion
+    error = Column(Text)
+    started_at = Column(DateTime(timezone=True))
+    completed_at = Column(DateTime(timezone=True))
+    user_id = Column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    
+    def __repr__(self):
+        return f"<AIRecommendationJob {self.id} {self.status}>"
@@ -4,6 +4,7 @@ Trackable entities (devices, vehicles, etc.)
 """
 from sqlalchemy import Column, String, Text, ForeignKey, Float, DateTime, Index
 from sqlalchemy.orm import relationship
+from app.core.database import Base
 from app.models.base import BaseModel
 from app.models.geometry_utils import GeometryColumn, USE_SQLITE
 from app.core.config import get_settings
@@ -19,34 +20,64 @@ class Asset(BaseModel):
     asset_type = Column(String(50), nullable=False)  # e.g., "drone", "vehicle", "device"
     identifier = Column(String(100), unique=True, nullable=False, index=True)  # Unique identifier
     
-    # Current location
-    current_location = GeometryColumn("POINT", srid=settings.DEFAULT_SRID, index=True)
-    altitude_meters = Column(Float)
-    heading_degrees = Column(Float)  # 0-360
-    speed_mps = Column(Float)  # meters per second
-    
     # Status
     status = Column(String(20), default="active", index=True)  # active, inactive, offline
-    last_seen = Column(DateTime(timezone=True), index=True)
     
     # Relationships
     owner_id = Column(ForeignKey("users.id", ondelete="SET NULL"), index=True)
     organization_id = Column(ForeignKey("organizations.id", ondelete="CASCADE"), index=True)
     owner = relationship("User", back_populates="assets")
     
-    # Trajectory history
+    # Live telemetry (joined on every load) and trajectory history
+    position = relationship(
+        "AssetPosition", back_populates="asset", uselist=False, lazy="joined", cascade="all, delete-orphan"
+    )
     trajectories = relationship("AssetTrajectory", back_populates="asset", cascade="all, delete-orphan")
     
-    # Spatial index (only for PostgreSQL)
-    __table_args__ = (
-        (Index("idx_asset_location", "current_location", postgresql_using="gist"),)
-        if not USE_SQLITE else ()
-    )
+    @property
+    def current_location(self):
+        return self.position.location if self.position else None
+    
+    @property
+    def altitude_meters(self):
+        return self.position.altitude_meters if self.position else None
+    
+    @property
+    def heading_degrees(self):
+        return self.position.heading_degrees if self.position else None
+    
+    @property
+    def speed_mps(self):
+        return self.position.speed_mps if self.position else None
+    
+    @property
+    def last_seen(self):
+        return self.position.recorded_at if self.position else None
     
     def __repr__(self):
         return f"<Asset {self.name} ({self.identifier})>"
 
 
+class AssetPosition(Base):
+    """
+    Latest position per asset, rewritten on every ping. Kept narrow and free of secondary
+    indexes so pings never touch the assets row and PostgreSQL can update it in place (HOT).
+    """
+    __tablename__ = "asset_positions"
+    
+    asset_id = Column(ForeignKey("assets.id", ondelete="CASCADE"), primary_key=True)
+    location = GeometryColumn("POINT", srid=settings.DEFAULT_SRID)
+    altitude_meters = Column(Float)
+    heading_degrees = Column(Float)  # 0-360
+    speed_mps = Column(Float)  # meters per second
+    recorded_at = Column(DateTime(timezone=True), nullable=False)
+    
+    asset = relationship("Asset", back_populates="position")
+    
+    # Leave free space in each page for the new row versions of HOT updates
+    __table_args__ = {"postgresql_with": {"fillfactor": 70}}
+
+
 class AssetTrajectory(BaseModel):
     """Asset trajectory history"""
     __tablename__ = "asset_trajectories"
@@ -64,7 +95,9 @@ class AssetTrajectory(BaseModel):
     # Spatial index (only for PostgreSQL)
     __table_args__ = (
         (Index("idx_trajectory_location", "location", postgresql_using="gist"),
-         Index("idx_trajectory_time", "recorded_at"),)
-        if not USE_SQLITE else (Index("idx_trajectory_time", "recorded_at"),)
+         Index("idx_trajectory_time", "recorded_at"),
+         Index("idx_trajectory_asset_time", "asset_id", "recorded_at"),)
+        if not USE_SQLITE else (Index("idx_trajectory_time", "recorded_at"),
+                                Index("idx_trajectory_asset_time", "asset_id", "recorded_at"))
     )
 
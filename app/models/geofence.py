@@ -2,7 +2,7 @@
 Geofence model
 Geometric boundaries with altitude support
 """
-from sqlalchemy import Column, String, Float, ForeignKey, Text, Index
+from sqlalchemy import Column, String, Float, Boolean, Integer, ForeignKey, Text, Index, false
 from sqlalchemy.orm import relationship
 from app.models.base import BaseModel
 from app.models.geometry_utils import GeometryColumn, USE_SQLITE
@@ -18,8 +18,17 @@ class Geofence(BaseModel):
     name = Column(String(100), nullable=False, index=True)
     description = Column(Text)
     
-    # Geometry - PostGIS Geography type (Text for SQLite)
+    # Geometry - PostGIS Geography type (Text for SQLite); the center point for circular geofences
     geometry = GeometryColumn("GEOMETRY", srid=settings.DEFAULT_SRID, nullable=False, index=True)
+    geofence_type = Column(String(20), nullable=False, default="polygon", server_default="polygon")  # polygon, circular
+    radius_meters = Column(Float)  # Circular geofences only
+    tiled = Column(Boolean, nullable=False, default=False, server_default=false())  # Contained-point tests use geofence_tiles
+    
+    # Bounding box (maintained by GeofenceService) so spatial selection is index-driven without PostGIS
+    min_lon = Column(Float)
+    min_lat = Column(Float)
+    max_lon = Column(Float)
+    max_lat = Column(Float)
     
     # Center point for quick distance calculations
     center_point = GeometryColumn("POINT", srid=settings.DEFAULT_SRID, nullable=False, index=True)
@@ -30,7 +39,7 @@ class Geofence(BaseModel):
     
     # Metadata
     status = Column(String(20), default="active", index=True)  # active, inactive, monitoring
-    priority = Column(String(20), default=1)  # 1-5
+    priority = Column(Integer, nullable=False, default=1, server_default="1", index=True)  # 1-5, higher is more important
     
     # Relationships
     organization_id = Column(ForeignKey("organizations.id", ondelete="CASCADE"), index=True)
@@ -40,8 +49,11 @@ class Geofence(BaseModel):
     notifications = relationship("Notification", back_populates="geofence", lazy="dynamic")
     access_list = relationship("GeofenceAccess", back_populates="geofence", cascade="all, delete-orphan")
     
-    # Spatial indexes (only for PostgreSQL)
+    # Bounding-box B-tree indexes; spatial indexes only for PostgreSQL
     __table_args__ = (
+        Index("idx_geofence_bbox_lat", "min_lat", "max_lat"),
+        Index("idx_geofence_bbox_lon", "min_lon", "max_lon"),
+    ) + (
         (Index("idx_geofence_geometry", "geometry", postgresql_using="gist"),
          Index("idx_geofence_center", "center_point", postgresql_using="gist"),)
         if not USE_SQLITE else ()
@@ -0,0 +1,20 @@
+"""
+Geofence cell model
+Geohash cells covering each geofence, for the cell-lookup geofence engine
+"""
+from sqlalchemy import Column, String, Boolean, ForeignKey, Index
+from app.core.database import Base
+
+
+class GeofenceCell(Base):
+    """One geohash cell touched by a geofence; `inside` when the whole cell lies within it"""
+    __tablename__ = "geofence_cells"
+
+    cell = Column(String(12), primary_key=True)
+    geofence_id = Column(ForeignKey("geofences.id", ondelete="CASCADE"), primary_key=True)
+    inside = Column(Boolean, nullable=False, default=False)
+
+    __table_args__ = (Index("idx_geofence_cells_geofence", "geofence_id"),)
+
+    def __repr__(self):
+        return f"<GeofenceCell {self.cell} {self.geofence_id}>"
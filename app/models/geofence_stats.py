@@ -0,0 +1,62 @@
+"""
+Geofence statistics model
+Incrementally maintained per-geofence activity summary (one row per geofence)
+"""
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, String, Index
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+from app.models.base import BaseModel
+
+
+class GeofenceStats(BaseModel):
+    """Pre-aggregated notification activity for a geofence, updated as events are recorded"""
+    __tablename__ = "geofence_stats"
+    
+    geofence_id = Column(ForeignKey("geofences.id", ondelete="CASCADE"), nullable=False, unique=True, index=True)
+    
+    # Counters
+    event_count = Column(Integer, default=0, nullable=False)
+    breach_count = Column(Integer, default=0, nullable=False)
+    
+    # Distance to boundary
+    distance_sum_meters = Column(Float, default=0.0, nullable=False)
+    distance_samples = Column(Integer, default=0, nullable=False)
+    min_distance_meters = Column(Float)
+    
+    # Recency
+    first_event_at = Column(DateTime(timezone=True))
+    last_event_at = Column(DateTime(timezone=True))
+    last_breach_at = Column(DateTime(timezone=True))
+    
+    # Breakdowns by type, severity and hour (asset sightings are read separately)
+    counters = relationship(
+        "GeofenceStatCounter",
+        primaryjoin="and_(GeofenceStats.geofence_id == foreign(GeofenceStatCounter.geofence_id), "
+                    "GeofenceStatCounter.dimension != 'asset')",
+        viewonly=True,
+        lazy="selectin"
+    )
+    
+    def __repr__(self):
+        return f"<GeofenceStats {self.geofence_id} ({self.event_count} events)>"
+
+
+class GeofenceStatCounter(Base):
+    """
+    One keyed counter of a geofence's activity, incremented in place: events by notification
+    type, by severity and by UTC hour ("00"-"23"), and the last sighting of each asset
+    """
+    __tablename__ = "geofence_stat_counters"
+    
+    geofence_id = Column(ForeignKey("geofences.id", ondelete="CASCADE"), primary_key=True)
+    dimension = Column(String(20), primary_key=True)  # type, severity, hour, asset
+    key = Column(String(50), primary_key=True)
+    count = Column(Integer, default=0, nullable=False)
+    last_at = Column(DateTime(timezone=True))
+    
+    __table_args__ = (
+        Index("idx_geofence_stat_counters_recent", "geofence_id", "dimension", "last_at"),
+    )
+    
+    def __repr__(self):
+        return f"<GeofenceStatCounter {self.geofence_id} {self.dimension}={self.key} ({self.count})>"
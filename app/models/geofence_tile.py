@@ -0,0 +1,26 @@
+"""
+Geofence tile model
+Pieces of large polygon geofences, indexed individually for point-in-polygon tests
+"""
+from sqlalchemy import Column, Integer, ForeignKey, Index
+from app.core.database import Base
+from app.models.geometry_utils import GeometryColumn, USE_SQLITE
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class GeofenceTile(Base):
+    """One piece of a tiled geofence (at most GEOFENCE_TILE_MAX_VERTICES vertices); a geofence's tiles cover it exactly"""
+    __tablename__ = "geofence_tiles"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    geofence_id = Column(ForeignKey("geofences.id", ondelete="CASCADE"), nullable=False)
+    geometry = GeometryColumn("POLYGON", srid=settings.DEFAULT_SRID, nullable=False, index=True)
+
+    __table_args__ = (Index("idx_geofence_tiles_geofence", "geofence_id"),) + (
+        (Index("idx_geofence_tiles_geometry", "geometry", postgresql_using="gist"),) if not USE_SQLITE else ()
+    )
+
+    def __repr__(self):
+        return f"<GeofenceTile {self.id} {self.geofence_id}>"
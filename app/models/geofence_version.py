@@ -0,0 +1,17 @@
+"""
+Geofence version model
+Monotonic counter of geofence changes, read by per-process geofence index caches
+"""
+from sqlalchemy import Column, Integer, BigInteger
+from app.core.database import Base
+
+
+class GeofenceVersion(Base):
+    """Single row (id 1) bumped in every transaction that writes geofences, their tiles or cells"""
+    __tablename__ = "geofence_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<GeofenceVersion {self.version}>"
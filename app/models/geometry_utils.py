@@ -2,6 +2,7 @@
 Geometry column utility for SQLite/PostgreSQL compatibility
 """
 from sqlalchemy import Column, Text
+from sqlalchemy.types import TypeDecorator
 from app.core.config import get_settings
 import os
 
@@ -10,20 +11,49 @@ settings = get_settings()
 # Detect if using SQLite
 USE_SQLITE = "sqlite" in settings.DATABASE_URL.lower() or os.getenv("USE_SQLITE", "").lower() == "true"
 
+
+class SQLiteGeometry(TypeDecorator):
+    """
+    WKT text column for SQLite.
+    Accepts GeoAlchemy2 elements on write and returns WKTElement on read,
+    so services can use from_shape/to_shape regardless of backend.
+    """
+    impl = Text
+    cache_ok = True
+    
+    def __init__(self, srid: int = None):
+        super().__init__()
+        self.srid = srid or settings.DEFAULT_SRID
+    
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        from geoalchemy2.shape import to_shape
+        return to_shape(value).wkt
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        from geoalchemy2.elements import WKTElement
+        return WKTElement(value, srid=self.srid)
+
+
 def GeometryColumn(geometry_type: str, srid: int = None, nullable: bool = True, index: bool = False):
     """
     Returns appropriate column type based on database.
-    For SQLite: returns Text column (stores WKT/GeoJSON as string)
-    For PostgreSQL: returns GeoAlchemy2 Geometry column
+    For SQLite: returns WKT text column (see SQLiteGeometry)
+    For PostgreSQL: returns GeoAlchemy2 Geometry column. Spatial indexes are declared
+    explicitly as GiST indexes in each model's __table_args__ (and created by migrations),
+    so neither GeoAlchemy2's implicit index nor a B-tree index is added here; `index` only
+    documents that the column is spatially indexed.
     """
     if USE_SQLITE:
-        # SQLite: store geometry as Text (WKT or GeoJSON string)
-        return Column(Text, nullable=nullable)
+        # SQLite: store geometry as WKT text
+        return Column(SQLiteGeometry(srid), nullable=nullable)
     else:
         # PostgreSQL with PostGIS
         from geoalchemy2 import Geometry
         return Column(
-            Geometry(geometry_type, srid=srid or settings.DEFAULT_SRID),
-            nullable=nullable,
-            index=index
+            Geometry(geometry_type, srid=srid or settings.DEFAULT_SRID, spatial_index=False),
+            nullable=nullable
         )
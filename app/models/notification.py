@@ -26,6 +26,7 @@ class Notification(BaseModel):
     # Status
     status = Column(String(20), default="active", index=True)  # active, acknowledged, resolved, dismissed
     is_read = Column(Boolean, default=False, index=True)
+    triggered_at = Column(DateTime(timezone=True))  # When the event happened (interpolated for crossings between pings)
     acknowledged_at = Column(DateTime(timezone=True))
     resolved_at = Column(DateTime(timezone=True))
     
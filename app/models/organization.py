@@ -2,10 +2,10 @@
 Organization model
 Multi-tenant support
 """
-from sqlalchemy import Column, String, Text
+from sqlalchemy import Column, String, Text, Index
 from sqlalchemy.orm import relationship
 from app.models.base import BaseModel
-from app.models.geometry_utils import GeometryColumn
+from app.models.geometry_utils import GeometryColumn, USE_SQLITE
 from app.core.config import get_settings
 
 settings = get_settings()
@@ -26,6 +26,12 @@ class Organization(BaseModel):
     geofences = relationship("Geofence", backref="organization", lazy="dynamic")
     assets = relationship("Asset", backref="organization", lazy="dynamic")
     
+    # Spatial index (only for PostgreSQL)
+    __table_args__ = (
+        (Index("idx_organization_location", "headquarters_location", postgresql_using="gist"),)
+        if not USE_SQLITE else ()
+    )
+    
     def __repr__(self):
         return f"<Organization {self.name}>"
 
@@ -14,7 +14,7 @@ class Zone(BaseModel):
     name = Column(String(100), nullable=False, index=True)
     description = Column(Text)
     zone_type = Column(String(50), nullable=False)  # e.g., "restricted", "monitoring", "safe"
-    priority = Column(String(20), default=1)  # 1-5
+    priority = Column(Integer, nullable=False, default=1, server_default="1")  # 1-5, higher is more important
     
     # Relationships
     geofence_id = Column(ForeignKey("geofences.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -60,3 +60,27 @@ class AIRecommendationResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+
+class AIRecommendationJobCreate(BaseModel):
+    """Recommendation job submission"""
+    entity_type: str = Field(..., description="Entity type: geofence, asset")
+    entity_ids: List[str] = Field(..., min_length=1, max_length=100, description="Entities to analyze")
+    recommendation_type: str = Field(..., description="e.g., geofence_optimization, security_alert")
+
+
+class AIRecommendationJobResponse(BaseModel):
+    """Recommendation job status"""
+    id: str
+    status: str
+    entity_type: str
+    entity_ids: List[str]
+    recommendation_type: str
+    recommendations: List[AIRecommendationResponse] = []
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
@@ -1,9 +1,12 @@
 """
 Geofence schemas
 """
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, validator, model_validator
 from typing import Optional, Dict, Any, List
 from datetime import datetime
+from app.core.config import get_settings
+
+settings = get_settings()
 
 
 class Point(BaseModel):
@@ -17,33 +20,85 @@ class GeometryCreate(BaseModel):
     """Geometry creation schema (GeoJSON format)"""
     type: str = Field(..., description="Geometry type: Point, Polygon, LineString, etc.")
     coordinates: list = Field(..., description="Coordinates array following GeoJSON spec")
+    
+    @model_validator(mode="after")
+    def check_size(self):
+        # Positions are the innermost arrays; count them without building the geometry
+        count, pending = 0, [self.coordinates]
+        while pending:
+            value = pending.pop()
+            if value and isinstance(value[0], (int, float)):
+                count += 1
+            else:
+                pending.extend(item for item in value if isinstance(item, list))
+        if count > settings.MAX_GEOFENCE_POINTS:
+            raise ValueError(f"geometry has {count} points; at most {settings.MAX_GEOFENCE_POINTS} are allowed")
+        return self
 
 
 class GeofenceCreate(BaseModel):
     """Geofence creation schema"""
     name: str = Field(..., min_length=1, max_length=100)
     description: Optional[str] = None
-    geometry: GeometryCreate = Field(..., description="GeoJSON geometry object")
+    geofence_type: str = Field("polygon", pattern="^(polygon|circular)$")
+    geometry: Optional[GeometryCreate] = Field(None, description="GeoJSON geometry object (polygon geofences)")
     center_point: Point = Field(..., description="Center point for quick calculations")
+    radius_meters: Optional[float] = Field(
+        None, gt=0, le=settings.MAX_CIRCLE_RADIUS_METERS, description="Radius around center_point (circular geofences)"
+    )
     altitude_min_meters: float = Field(0.0, ge=0)
     altitude_max_meters: float = Field(500.0, ge=0)
     status: str = Field("active", pattern="^(active|inactive|monitoring)$")
     priority: int = Field(1, ge=1, le=5)
     organization_id: Optional[str] = None
+    
+    @model_validator(mode="after")
+    def check_shape(self):
+        if self.geofence_type == "circular" and self.radius_meters is None:
+            raise ValueError("radius_meters is required for circular geofences")
+        if self.geofence_type == "polygon" and self.geometry is None:
+            raise ValueError("geometry is required for polygon geofences")
+        return self
 
 
 class GeofenceUpdate(BaseModel):
     """Geofence update schema"""
     name: Optional[str] = Field(None, min_length=1, max_length=100)
     description: Optional[str] = None
-    geometry: Optional[GeometryCreate] = None
+    geometry: Optional[GeometryCreate] = None  # Makes the geofence a polygon
     center_point: Optional[Point] = None
+    radius_meters: Optional[float] = Field(None, gt=0, le=settings.MAX_CIRCLE_RADIUS_METERS)  # Makes the geofence circular
     altitude_min_meters: Optional[float] = Field(None, ge=0)
     altitude_max_meters: Optional[float] = Field(None, ge=0)
     status: Optional[str] = Field(None, pattern="^(active|inactive|monitoring)$")
     priority: Optional[int] = Field(None, ge=1, le=5)
 
 
+class BatchPoint(Point):
+    """Point in a batch evaluation; timestamp and asset_id are echoed back with its memberships"""
+    timestamp: Optional[datetime] = None
+    asset_id: Optional[str] = None
+
+
+class GeofenceBatchEvaluateRequest(BaseModel):
+    """Points to test against all active geofences in one call"""
+    points: List[BatchPoint] = Field(..., min_length=1, max_length=settings.GEOFENCE_BATCH_MAX_POINTS)
+
+
+class BatchMembership(BaseModel):
+    """Active geofences containing one point of the batch"""
+    index: int  # Position of the point in the request
+    timestamp: Optional[datetime] = None
+    asset_id: Optional[str] = None
+    geofence_ids: List[str]
+
+
+class GeofenceBatchEvaluateResponse(BaseModel):
+    """Batch evaluation result; points inside no geofence are omitted from memberships"""
+    points: int
+    memberships: List[BatchMembership]
+
+
 class AccessInfo(BaseModel):
     """Brief access info for geofence response"""
     user_id: str
@@ -56,8 +111,10 @@ class GeofenceResponse(BaseModel):
     id: str
     name: str
     description: Optional[str]
+    geofence_type: str = "polygon"
     geometry: Dict[str, Any]  # GeoJSON
     center_point: Point
+    radius_meters: Optional[float] = None
     altitude_min_meters: float
     altitude_max_meters: float
     status: str
@@ -66,6 +123,7 @@ class GeofenceResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     access_list: Optional[List[AccessInfo]] = None
+    distance_meters: Optional[float] = None  # Set by nearby search
     
     class Config:
         from_attributes = True
@@ -37,6 +37,7 @@ class NotificationResponse(BaseModel):
     distance_meters: Optional[float]
     status: str
     is_read: bool
+    triggered_at: Optional[datetime] = None
     acknowledged_at: Optional[datetime]
     resolved_at: Optional[datetime]
     geofence_id: Optional[str]
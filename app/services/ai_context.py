@@ -0,0 +1,99 @@
+"""
+AI Context Assembly
+Single Responsibility: Build compact entity context for recommendation prompts from pre-aggregated data
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import Any, Dict, List
+from uuid import UUID
+from datetime import datetime
+from app.models.asset import Asset
+from app.models.geofence import Geofence
+from app.models.zone import Zone
+from app.services.geofence_stats_service import GeofenceStatsService
+
+
+class AIContextService:
+    """
+    Assembles what the model needs to know about geofences and assets. Reads entity rows
+    and the pre-aggregated geofence stats only (a fixed number of queries per batch,
+    independent of history size).
+    """
+
+    @staticmethod
+    def build(db: Session, entity_type: str, entity_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Context per entity ID; unknown types or IDs yield no entry"""
+        uuids = {}
+        for entity_id in entity_ids:
+            try:
+                uuids[UUID(str(entity_id))] = str(entity_id)
+            except ValueError:
+                continue
+        if not uuids:
+            return {}
+
+        if entity_type == "geofence":
+            return AIContextService._geofence_contexts(db, uuids)
+        if entity_type == "asset":
+            return AIContextService._asset_contexts(db, uuids)
+        return {}
+
+    @staticmethod
+    def _geofence_contexts(db: Session, uuids: Dict[UUID, str]) -> Dict[str, Dict[str, Any]]:
+        geofences = db.query(Geofence).filter(Geofence.id.in_(uuids.keys())).all()
+        zone_counts = dict(
+            db.query(Zone.geofence_id, func.count(Zone.id))
+            .filter(Zone.geofence_id.in_(uuids.keys()))
+            .group_by(Zone.geofence_id)
+            .all()
+        )
+        stats = GeofenceStatsService.get_stats_map(db, list(uuids.keys()))
+        recent_assets = GeofenceStatsService.get_recent_asset_counts(db, list(uuids.keys()))
+
+        contexts = {}
+        for geofence in geofences:
+            contexts[uuids[geofence.id]] = {
+                "name": geofence.name,
+                "description": geofence.description,
+                "status": geofence.status,
+                "priority": geofence.priority,
+                "altitude_range_meters": [geofence.altitude_min_meters, geofence.altitude_max_meters],
+                "zone_count": zone_counts.get(geofence.id, 0),
+                "activity": GeofenceStatsService.summarize(stats.get(geofence.id), recent_assets.get(geofence.id, 0))
+            }
+        return contexts
+
+    @staticmethod
+    def _asset_contexts(db: Session, uuids: Dict[UUID, str]) -> Dict[str, Dict[str, Any]]:
+        assets = db.query(Asset).filter(Asset.id.in_(uuids.keys())).all()
+        return {
+            uuids[asset.id]: {
+                "name": asset.name,
+                "asset_type": asset.asset_type,
+                "status": asset.status,
+                "last_seen": asset.last_seen,
+                "altitude_meters": asset.altitude_meters,
+                "speed_mps": asset.speed_mps,
+                "heading_degrees": asset.heading_degrees
+            }
+            for asset in assets
+        }
+
+    @staticmethod
+    def render(context: Dict[str, Any], indent: str = "") -> str:
+        """Render context as indented 'key: value' lines, dropping empty values"""
+        lines = []
+        for key, value in context.items():
+            if value is None or value == {} or value == []:
+                continue
+            label = key.replace("_", " ")
+            if isinstance(value, dict):
+                lines.append(f"{indent}{label}:")
+                lines.append(AIContextService.render(value, indent + "  "))
+            elif isinstance(value, list):
+                lines.append(f"{indent}{label}: {', '.join(str(v) for v in value)}")
+            elif isinstance(value, datetime):
+                lines.append(f"{indent}{label}: {value.isoformat(timespec='minutes')}")
+            else:
+                lines.append(f"{indent}{label}: {value}")
+        return "\n".join(line for line in lines if line)
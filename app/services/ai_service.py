@@ -3,17 +3,24 @@ AI/LLM Service
 Single Responsibility: Handle AI interactions, explanations, and recommendations
 """
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any
 from uuid import UUID
-import openai
+import json
+import logging
 from app.models.ai_service import AIConversation, AIMessage, AIRecommendation
 from app.schemas.ai_service import AIMessageCreate
+from app.services.ai_context import AIContextService
+from app.services.conversation_context import ConversationContextBuilder
+from app.services.llm_client import get_llm_client
+from app.services.recommendation_cache import RecommendationCache
 from app.core.config import get_settings
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
-if settings.OPENAI_API_KEY:
-    openai.api_key = settings.OPENAI_API_KEY
+SYSTEM_PROMPT = "You are an AI assistant for a geo-fencing platform. Help users understand geofences, zones, assets, and provide recommendations."
+UNAVAILABLE_MESSAGE = "AI service is currently unavailable."
+RECOMMENDATION_SYSTEM_PROMPT = "You are an expert system analyst providing actionable recommendations."
 
 
 class AIService:
@@ -41,13 +48,12 @@ class AIService:
         return conversation
     
     @staticmethod
-    def send_message(
+    def _get_or_create_conversation(
         db: Session,
         message_data: AIMessageCreate,
         user_id: UUID
-    ) -> tuple[AIMessage, AIMessage]:
-        """Send a message to AI and get response"""
-        # Get or create conversation
+    ) -> AIConversation:
+        """Resolve the conversation a message belongs to"""
         if message_data.conversation_id:
             conversation = db.query(AIConversation).filter(
                 AIConversation.id == UUID(message_data.conversation_id)
@@ -62,10 +68,40 @@ class AIService:
         
         if not conversation:
             raise ValueError("Conversation not found")
+        return conversation
+    
+    @staticmethod
+    def _reserve_sequences(db: Session, conversation_id: UUID, count: int) -> int:
+        """
+        Hand out the next `count` positions in the conversation and return the first.
+        The counter update holds the conversation row until commit, so concurrent writers never share a position.
+        """
+        db.query(AIConversation).filter(AIConversation.id == conversation_id).update(
+            {AIConversation.last_sequence: AIConversation.last_sequence + count},
+            synchronize_session=False
+        )
+        last = db.query(AIConversation.last_sequence).filter(AIConversation.id == conversation_id).scalar()
+        return last - count + 1
+    
+    @staticmethod
+    def send_message(
+        db: Session,
+        message_data: AIMessageCreate,
+        user_id: UUID
+    ) -> tuple[AIMessage, AIMessage]:
+        """Send a message to AI and get response"""
+        conversation = AIService._get_or_create_conversation(db, message_data, user_id)
+        
+        # Build model input before the new message is stored so it is not sent twice
+        client = get_llm_client()
+        if client.available:
+            message_history = AIService._build_message_history(db, conversation, message_data.content)
         
-        # Save user message
+        # Save user message; the reply takes the position after it
+        sequence = AIService._reserve_sequences(db, conversation.id, 2)
         user_message = AIMessage(
             conversation_id=conversation.id,
+            sequence=sequence,
             role="user",
             content=message_data.content,
             message_metadata=message_data.metadata
@@ -74,18 +110,15 @@ class AIService:
         db.flush()
         
         # Get AI response
-        if settings.AI_SERVICE_ENABLED and settings.OPENAI_API_KEY:
-            ai_response_content = AIService._get_ai_response(
-                db,
-                conversation,
-                message_data.content
-            )
+        if client.available:
+            ai_response_content = AIService._get_ai_response(message_history)
         else:
-            ai_response_content = "AI service is currently unavailable."
+            ai_response_content = UNAVAILABLE_MESSAGE
         
         # Save AI message
         ai_message = AIMessage(
             conversation_id=conversation.id,
+            sequence=sequence + 1,
             role="assistant",
             content=ai_response_content,
             message_metadata={"model": settings.AI_MODEL}
@@ -98,45 +131,88 @@ class AIService:
         return user_message, ai_message
     
     @staticmethod
-    def _get_ai_response(
+    def _build_message_history(
         db: Session,
         conversation: AIConversation,
         user_message: str
-    ) -> str:
-        """Get AI response using OpenAI API"""
-        # Get conversation history
-        messages = db.query(AIMessage).filter(
-            AIMessage.conversation_id == conversation.id
-        ).order_by(AIMessage.created_at).all()
-        
-        # Build context
-        system_prompt = "You are an AI assistant for a geo-fencing platform. Help users understand geofences, zones, assets, and provide recommendations."
+    ) -> List[Dict[str, str]]:
+        """Build the token-budgeted chat history sent to the model"""
+        system_prompt = SYSTEM_PROMPT
         
         if conversation.context_type:
             system_prompt += f"\n\nContext: {conversation.context_type}"
             if conversation.context_id:
                 system_prompt += f" (ID: {conversation.context_id})"
         
-        message_history = [{"role": "system", "content": system_prompt}]
-        
-        for msg in messages:
-            message_history.append({
-                "role": msg.role,
-                "content": msg.content
-            })
-        
-        message_history.append({"role": "user", "content": user_message})
-        
+        return ConversationContextBuilder.build(db, conversation, user_message, system_prompt)
+    
+    @staticmethod
+    def _get_ai_response(message_history: List[Dict[str, str]]) -> str:
+        """Get AI response using OpenAI API"""
         try:
-            response = openai.ChatCompletion.create(
-                model=settings.AI_MODEL,
-                messages=message_history,
-                temperature=settings.AI_TEMPERATURE
-            )
-            return response.choices[0].message.content
+            return get_llm_client().complete(message_history, settings.AI_TEMPERATURE)
         except Exception as e:
             return f"Error generating AI response: {str(e)}"
     
+    @staticmethod
+    def prepare_stream(
+        db: Session,
+        message_data: AIMessageCreate,
+        user_id: UUID
+    ) -> tuple[AIMessage, int, List[Dict[str, str]]]:
+        """
+        Save the user message, reserve the reply's position and build the model input for a streamed reply.
+        Commits before returning so the caller can release the session while the model generates.
+        """
+        conversation = AIService._get_or_create_conversation(db, message_data, user_id)
+        message_history = AIService._build_message_history(db, conversation, message_data.content)
+        
+        # Reserve the reply's position now so messages sent during generation queue after it
+        sequence = AIService._reserve_sequences(db, conversation.id, 2)
+        user_message = AIMessage(
+            conversation_id=conversation.id,
+            sequence=sequence,
+            role="user",
+            content=message_data.content,
+            message_metadata=message_data.metadata
+        )
+        db.add(user_message)
+        db.commit()
+        db.refresh(user_message)
+        return user_message, sequence + 1, message_history
+    
+    @staticmethod
+    async def stream_ai_response(message_history: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """Stream response tokens from the model without touching the database"""
+        client = get_llm_client()
+        if not client.available:
+            yield UNAVAILABLE_MESSAGE
+            return
+        
+        async for token in client.stream(message_history, settings.AI_TEMPERATURE):
+            yield token
+    
+    @staticmethod
+    def save_assistant_message(
+        db: Session,
+        conversation_id: UUID,
+        sequence: int,
+        content: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> AIMessage:
+        """Persist a completed assistant reply at the position reserved by prepare_stream"""
+        ai_message = AIMessage(
+            conversation_id=conversation_id,
+            sequence=sequence,
+            role="assistant",
+            content=content,
+            message_metadata=metadata or {"model": settings.AI_MODEL}
+        )
+        db.add(ai_message)
+        db.commit()
+        db.refresh(ai_message)
+        return ai_message
+    
     @staticmethod
     def generate_recommendation(
         db: Session,
@@ -145,41 +221,149 @@ class AIService:
         recommendation_type: str,
         context: Dict[str, Any]
     ) -> AIRecommendation:
-        """Generate AI recommendation for an entity"""
-        # Build prompt for recommendation
+        """Generate AI recommendation for an entity, reusing a cached one for identical input"""
+        context_hash = RecommendationCache.context_hash(entity_type, entity_id, recommendation_type, context)
+        cached = RecommendationCache.lookup(db, entity_type, entity_id, context_hash)
+        if cached:
+            return cached
+        
+        # Build prompt from pre-aggregated entity context plus anything the client supplied
+        entity_context = AIContextService.build(db, entity_type, [entity_id]).get(str(entity_id), {})
         prompt = f"Analyze this {entity_type} and provide recommendations for {recommendation_type}."
-        prompt += f"\n\nContext: {context}"
+        prompt += f"\n\n{AIService._describe_entity(entity_context, context)}"
         
-        if settings.AI_SERVICE_ENABLED and settings.OPENAI_API_KEY:
+        # Only successful model output is cacheable
+        cacheable = False
+        client = get_llm_client()
+        if client.available:
             try:
-                response = openai.ChatCompletion.create(
-                    model=settings.AI_MODEL,
-                    messages=[
-                        {"role": "system", "content": "You are an expert system analyst providing actionable recommendations."},
+                ai_content = client.complete(
+                    [
+                        {"role": "system", "content": RECOMMENDATION_SYSTEM_PROMPT},
                         {"role": "user", "content": prompt}
                     ],
                     temperature=0.5
                 )
-                ai_content = response.choices[0].message.content
+                cacheable = True
             except Exception as e:
                 ai_content = f"Recommendation generation failed: {str(e)}"
         else:
             ai_content = "AI service unavailable for recommendations."
         
-        recommendation = AIRecommendation(
+        recommendation = AIService._build_recommendation(
+            entity_type, entity_id, recommendation_type, context, ai_content,
+            context_hash if cacheable else None
+        )
+        db.add(recommendation)
+        db.commit()
+        db.refresh(recommendation)
+        return recommendation
+    
+    @staticmethod
+    def generate_recommendations_batch(
+        db: Session,
+        entity_type: str,
+        entity_ids: List[str],
+        recommendation_type: str,
+        contexts: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, AIRecommendation]:
+        """
+        Generate recommendations for several entities of one type with a single prompt.
+        Cached results are reused; entities missing from the model's answer fall back to
+        individual generation. Returns entity ID -> recommendation.
+        """
+        results: Dict[str, AIRecommendation] = {}
+        pending: Dict[str, str] = {}
+        for entity_id in entity_ids:
+            context = contexts.get(entity_id, {})
+            context_hash = RecommendationCache.context_hash(entity_type, entity_id, recommendation_type, context)
+            cached = RecommendationCache.lookup(db, entity_type, entity_id, context_hash)
+            if cached:
+                results[entity_id] = cached
+            else:
+                pending[entity_id] = context_hash
+        
+        client = get_llm_client()
+        if len(pending) > 1 and client.available:
+            entity_contexts = AIContextService.build(db, entity_type, list(pending))
+            answers = AIService._complete_batch(entity_type, recommendation_type, {
+                entity_id: AIService._describe_entity(entity_contexts.get(entity_id, {}), contexts.get(entity_id, {}))
+                for entity_id in pending
+            })
+            for entity_id, content in answers.items():
+                if entity_id not in pending:
+                    continue
+                recommendation = AIService._build_recommendation(
+                    entity_type, entity_id, recommendation_type, contexts.get(entity_id, {}),
+                    content, pending.pop(entity_id)
+                )
+                db.add(recommendation)
+                results[entity_id] = recommendation
+            db.commit()
+        
+        for entity_id in pending:
+            results[entity_id] = AIService.generate_recommendation(
+                db, entity_type, entity_id, recommendation_type, contexts.get(entity_id, {})
+            )
+        return results
+    
+    @staticmethod
+    def _complete_batch(
+        entity_type: str,
+        recommendation_type: str,
+        descriptions: Dict[str, str]
+    ) -> Dict[str, str]:
+        """Ask for one recommendation per entity as a JSON object; empty on failure"""
+        prompt = (
+            f"Analyze each {entity_type} below and provide recommendations for {recommendation_type}. "
+            "Respond only with a JSON object mapping each ID to its recommendation text."
+        )
+        for entity_id, description in descriptions.items():
+            prompt += f"\n\nID: {entity_id}\n{description}"
+        
+        try:
+            content = get_llm_client().complete(
+                [
+                    {"role": "system", "content": RECOMMENDATION_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.5
+            )
+            answers = json.loads(content.strip().removeprefix("```json").strip("`").strip())
+        except Exception as e:
+            logger.warning(f"Batched recommendation generation failed, falling back per entity: {e}")
+            return {}
+        if not isinstance(answers, dict):
+            return {}
+        return {str(k): str(v) for k, v in answers.items() if v}
+    
+    @staticmethod
+    def _describe_entity(entity_context: Dict[str, Any], request_context: Dict[str, Any]) -> str:
+        """Prompt section describing one entity"""
+        description = AIContextService.render(entity_context) or "No stored data for this entity."
+        if request_context:
+            description += f"\nRequest context:\n{AIContextService.render(request_context, '  ')}"
+        return description
+    
+    @staticmethod
+    def _build_recommendation(
+        entity_type: str,
+        entity_id: str,
+        recommendation_type: str,
+        context: Dict[str, Any],
+        content: str,
+        context_hash: Optional[str]
+    ) -> AIRecommendation:
+        return AIRecommendation(
             recommendation_type=recommendation_type,
             entity_type=entity_type,
             entity_id=entity_id,
             title=f"Recommendation for {entity_type}",
-            description=ai_content,
+            description=content,
             confidence_score="0.7",
-            recommendation_metadata=context
+            recommendation_metadata=context,
+            context_hash=context_hash
         )
-        
-        db.add(recommendation)
-        db.commit()
-        db.refresh(recommendation)
-        return recommendation
     
     @staticmethod
     def get_conversation(db: Session, conversation_id: UUID) -> Optional[AIConversation]:
@@ -9,7 +9,7 @@ from shapely.geometry import Point as ShapelyPoint
 from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
-from app.models.asset import Asset, AssetTrajectory
+from app.models.asset import Asset, AssetPosition, AssetTrajectory
 from app.schemas.asset import AssetCreate, AssetUpdate, AssetTrajectoryCreate
 
 
@@ -31,13 +31,15 @@ class AssetService:
             name=asset_data.name,
             asset_type=asset_data.asset_type,
             identifier=asset_data.identifier,
-            current_location=location_wkb,
-            altitude_meters=asset_data.altitude_meters,
-            heading_degrees=asset_data.heading_degrees,
-            speed_mps=asset_data.speed_mps,
             owner_id=user_id,
             organization_id=UUID(asset_data.organization_id) if asset_data.organization_id else None,
-            last_seen=datetime.utcnow()
+            position=AssetPosition(
+                location=location_wkb,
+                altitude_meters=asset_data.altitude_meters,
+                heading_degrees=asset_data.heading_degrees,
+                speed_mps=asset_data.speed_mps,
+                recorded_at=datetime.utcnow()
+            )
         )
         
         db.add(asset)
@@ -56,7 +58,7 @@ class AssetService:
         asset_id: UUID,
         location_data: AssetTrajectoryCreate
     ) -> Optional[Asset]:
-        """Update asset location and create trajectory point"""
+        """Update asset location (asset_positions only; the assets row is untouched) and create trajectory point"""
         asset = db.query(Asset).filter(Asset.id == asset_id).first()
         if not asset:
             return None
@@ -67,12 +69,16 @@ class AssetService:
             location_data.location.latitude
         )
         location_wkb = from_shape(point, srid=4326)
+        now = datetime.utcnow()
         
-        asset.current_location = location_wkb
-        asset.altitude_meters = location_data.altitude_meters
-        asset.heading_degrees = location_data.heading_degrees
-        asset.speed_mps = location_data.speed_mps
-        asset.last_seen = datetime.utcnow()
+        if asset.position is None:
+            asset.position = AssetPosition(asset_id=asset_id)
+        position = asset.position
+        position.location = location_wkb
+        position.altitude_meters = location_data.altitude_meters
+        position.heading_degrees = location_data.heading_degrees
+        position.speed_mps = location_data.speed_mps
+        position.recorded_at = now
         
         # Create trajectory point
         trajectory = AssetTrajectory(
@@ -81,7 +87,7 @@ class AssetService:
             altitude_meters=location_data.altitude_meters,
             heading_degrees=location_data.heading_degrees,
             speed_mps=location_data.speed_mps,
-            recorded_at=datetime.utcnow()
+            recorded_at=now
         )
         db.add(trajectory)
         
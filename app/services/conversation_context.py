@@ -0,0 +1,179 @@
+"""
+Conversation Context Builder
+Single Responsibility: Build a token-budgeted chat history with a rolling summary of older turns
+"""
+from functools import lru_cache
+from sqlalchemy.orm import Session
+from typing import Callable, Dict, List, Optional
+import logging
+from app.models.ai_service import AIConversation, AIMessage
+from app.services.llm_client import get_llm_client
+from app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Per-message framing overhead used by chat models (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_PROMPT = (
+    "Summarize the conversation below between an operator and a geo-fencing assistant. "
+    "Keep facts, entity names and IDs, decisions and open questions. Be concise."
+)
+
+
+@lru_cache()
+def _token_counter() -> Callable[[str], int]:
+    """Exact tokenizer when tiktoken is installed, otherwise a ~4 chars/token estimate"""
+    try:
+        import tiktoken
+        try:
+            encoding = tiktoken.encoding_for_model(settings.AI_MODEL)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoding.encode(text))
+    except ImportError:
+        return lambda text: len(text) // 4 + 1
+
+
+def count_tokens(text: str) -> int:
+    """Approximate model tokens in a string"""
+    return _token_counter()(text or "")
+
+
+def count_message_tokens(message: Dict[str, str]) -> int:
+    """Tokens used by one chat message including framing"""
+    return count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+class ConversationContextBuilder:
+    """Builds the model input for a conversation turn within AI_CONTEXT_TOKEN_BUDGET"""
+
+    @staticmethod
+    def build(
+        db: Session,
+        conversation: AIConversation,
+        user_message: str,
+        system_prompt: str
+    ) -> List[Dict[str, str]]:
+        """
+        Return system prompt, rolling summary, the most recent turns that fit the budget
+        and the new user message. Must be called before the new user message is stored.
+        Older turns that fall out of the window are folded into conversation.summary;
+        the caller commits.
+        """
+        system_message = {"role": "system", "content": system_prompt}
+        new_message = {"role": "user", "content": user_message}
+        fixed_tokens = count_message_tokens(system_message) + count_message_tokens(new_message)
+
+        summarized = conversation.summarized_message_count or 0
+        total = db.query(AIMessage).filter(AIMessage.conversation_id == conversation.id).count()
+
+        # Only the newest messages can be in the window; never load the whole history
+        recent = db.query(AIMessage).filter(
+            AIMessage.conversation_id == conversation.id
+        ).order_by(AIMessage.sequence.desc()).limit(settings.AI_CONTEXT_MAX_MESSAGES).all()
+        recent.reverse()
+        first_position = total - len(recent)
+
+        summary_tokens = count_tokens(conversation.summary) + MESSAGE_OVERHEAD_TOKENS if conversation.summary else 0
+        budget = settings.AI_CONTEXT_TOKEN_BUDGET - fixed_tokens - summary_tokens
+
+        # Walk back from the newest message until the budget is spent
+        window: List[AIMessage] = []
+        used = 0
+        for msg in reversed(recent):
+            position = first_position + len(recent) - len(window) - 1
+            if position < summarized:
+                break
+            tokens = count_tokens(msg.content) + MESSAGE_OVERHEAD_TOKENS
+            if used + tokens > budget:
+                break
+            window.insert(0, msg)
+            used += tokens
+        window_start = total - len(window)
+
+        if window_start > summarized:
+            # Fold everything outside the window, plus the older half of the window so the
+            # next few turns fit without summarizing again
+            while window and used > budget // 2:
+                used -= count_tokens(window[0].content) + MESSAGE_OVERHEAD_TOKENS
+                window.pop(0)
+                window_start += 1
+
+            to_fold = [m for i, m in enumerate(recent) if summarized <= first_position + i < window_start]
+            if summarized < first_position:
+                # Summary lags behind the fetched tail; load the gap explicitly
+                gap = db.query(AIMessage).filter(
+                    AIMessage.conversation_id == conversation.id
+                ).order_by(AIMessage.sequence).offset(summarized).limit(first_position - summarized).all()
+                to_fold = gap + to_fold
+
+            conversation.summary = ConversationContextBuilder._summarize(conversation.summary, to_fold)
+            conversation.summarized_message_count = window_start
+
+        messages = [system_message]
+        if conversation.summary:
+            messages.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{conversation.summary}"
+            })
+        messages.extend({"role": m.role, "content": m.content} for m in window)
+        messages.append(new_message)
+        return messages
+
+    @staticmethod
+    def _summarize(previous_summary: Optional[str], messages: List[AIMessage]) -> str:
+        """Fold messages into the rolling summary, falling back to truncation without a model"""
+        transcript = "\n".join(f"{m.role}: {m.content}" for m in messages)
+        client = get_llm_client()
+        if client.available:
+            prompt = transcript
+            if previous_summary:
+                prompt = f"Existing summary:\n{previous_summary}\n\nNew messages:\n{transcript}"
+            try:
+                summary = client.complete(
+                    [
+                        {"role": "system", "content": SUMMARY_PROMPT},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.0
+                )
+                # The model is asked for a short summary but not trusted to keep to the budget
+                return ConversationContextBuilder._fit_budget(summary.splitlines())
+            except Exception as e:
+                logger.warning(f"Conversation summarization failed, truncating instead: {e}")
+
+        # Extractive fallback: keep the most recent lines that fit the summary budget
+        lines = ([previous_summary] if previous_summary else []) + [
+            f"{m.role}: {m.content[:300]}" for m in messages
+        ]
+        return ConversationContextBuilder._fit_budget(lines)
+
+    @staticmethod
+    def _fit_budget(lines: List[str]) -> str:
+        """The most recent lines that fit AI_SUMMARY_TOKEN_BUDGET; a single oversized line is cut to fit"""
+        kept: List[str] = []
+        used = 0
+        for line in reversed(lines):
+            tokens = count_tokens(line)
+            if used + tokens > settings.AI_SUMMARY_TOKEN_BUDGET:
+                if not kept:
+                    kept.append(ConversationContextBuilder._truncate(line, settings.AI_SUMMARY_TOKEN_BUDGET))
+                break
+            kept.insert(0, line)
+            used += tokens
+        return "\n".join(kept)
+
+    @staticmethod
+    def _truncate(text: str, budget: int) -> str:
+        """Longest word prefix of text within budget tokens"""
+        words = text.split()
+        low, high = 0, len(words)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if count_tokens(" ".join(words[:middle])) <= budget:
+                low = middle
+            else:
+                high = middle - 1
+        return " ".join(words[:low])
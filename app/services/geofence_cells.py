@@ -0,0 +1,195 @@
+"""
+Geofence Cells
+Single Responsibility: Geohash cell coverage of geofences for constant-time candidate lookup
+"""
+import math
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+import shapely
+from shapely.geometry.base import BaseGeometry
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.geofence_cell import GeofenceCell
+from app.services.geofence_index import geofence_bounds, haversine_meters
+
+settings = get_settings()
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def _bit_counts(precision: int) -> Tuple[int, int]:
+    """(longitude bits, latitude bits) of a geohash; longitude takes the odd leftover bit"""
+    total = 5 * precision
+    return (total + 1) // 2, total // 2
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """(width, height) in degrees of a geohash cell"""
+    lon_bits, lat_bits = _bit_counts(precision)
+    return 360.0 / (1 << lon_bits), 180.0 / (1 << lat_bits)
+
+
+def _cell_indices(longitude, latitude, precision: int):
+    """Column and row of the cell containing the coordinates (scalars or arrays)"""
+    lon_bits, lat_bits = _bit_counts(precision)
+    columns = np.clip(np.floor((np.asarray(longitude) + 180.0) / 360.0 * (1 << lon_bits)), 0, (1 << lon_bits) - 1)
+    rows = np.clip(np.floor((np.asarray(latitude) + 90.0) / 180.0 * (1 << lat_bits)), 0, (1 << lat_bits) - 1)
+    return columns.astype(np.int64), rows.astype(np.int64)
+
+
+def geohashes(columns: np.ndarray, rows: np.ndarray, precision: int) -> List[str]:
+    """Geohash strings for arrays of cell columns and rows (bits interleaved, longitude first)"""
+    lon_bits, lat_bits = _bit_counts(precision)
+    value = np.zeros(np.shape(columns), dtype=np.int64)
+    for bit in range(5 * precision):
+        if bit % 2 == 0:
+            value = (value << 1) | ((columns >> (lon_bits - 1 - bit // 2)) & 1)
+        else:
+            value = (value << 1) | ((rows >> (lat_bits - 1 - bit // 2)) & 1)
+    digits = [(value >> (5 * (precision - 1 - k))) & 31 for k in range(precision)]
+    return ["".join(GEOHASH_ALPHABET[d] for d in chars) for chars in zip(*(d.ravel().tolist() for d in digits))]
+
+
+def _spread_bits(value: int) -> int:
+    """Insert a zero bit above each of the low 32 bits (Morton encoding)"""
+    value &= 0xFFFFFFFF
+    value = (value | (value << 16)) & 0x0000FFFF0000FFFF
+    value = (value | (value << 8)) & 0x00FF00FF00FF00FF
+    value = (value | (value << 4)) & 0x0F0F0F0F0F0F0F0F
+    value = (value | (value << 2)) & 0x3333333333333333
+    return (value | (value << 1)) & 0x5555555555555555
+
+
+def geohash(longitude: float, latitude: float, precision: int) -> str:
+    """Geohash of a single point (the per-ping path, so bit-interleaved without a per-bit loop)"""
+    lon_bits, lat_bits = _bit_counts(precision)
+    column = min(int((longitude + 180.0) / 360.0 * (1 << lon_bits)), (1 << lon_bits) - 1)
+    row = min(int((latitude + 90.0) / 180.0 * (1 << lat_bits)), (1 << lat_bits) - 1)
+    if lon_bits == lat_bits:
+        value = (_spread_bits(column) << 1) | _spread_bits(row)
+    else:
+        value = _spread_bits(column) | (_spread_bits(row) << 1)
+    return "".join(GEOHASH_ALPHABET[(value >> shift) & 31] for shift in range(5 * (precision - 1), -1, -5))
+
+
+def coverage_boxes(geometry: BaseGeometry, radius_meters: Optional[float] = None) -> List[Tuple[float, float, float, float]]:
+    """
+    Bounding boxes a geofence's cells are laid over: the circle's, or one per polygon part, so
+    a fence split at the antimeridian is not covered across the whole globe
+    """
+    if radius_meters is not None:
+        return [geofence_bounds(geometry, radius_meters)]
+    return [part.bounds for part in shapely.get_parts(geometry)]
+
+
+def cell_precision(boxes: List[Tuple[float, float, float, float]]) -> int:
+    """Finest precision up to GEOFENCE_CELL_PRECISION that covers the boxes within GEOFENCE_CELL_MAX_PER_FENCE cells"""
+    for precision in range(settings.GEOFENCE_CELL_PRECISION, 1, -1):
+        width, height = cell_size(precision)
+        cells = sum(
+            (math.floor((max_lon - min_lon) / width) + 2) * (math.floor((max_lat - min_lat) / height) + 2)
+            for min_lon, min_lat, max_lon, max_lat in boxes
+        )
+        if cells <= settings.GEOFENCE_CELL_MAX_PER_FENCE:
+            return precision
+    return 1
+
+
+def polyfill(geometry: BaseGeometry, radius_meters: Optional[float] = None) -> List[Tuple[str, bool]]:
+    """
+    (geohash, inside) for every cell touching a geofence: a polygon, or a circle given by its
+    center point and radius. `inside` cells lie entirely within the geofence.
+    """
+    boxes = coverage_boxes(geometry, radius_meters)
+    precision = cell_precision(boxes)
+    width, height = cell_size(precision)
+    grids = []
+    for min_lon, min_lat, max_lon, max_lat in boxes:
+        first_column, first_row = _cell_indices(min_lon, min_lat, precision)
+        last_column, last_row = _cell_indices(max_lon, max_lat, precision)
+        # A circle reaching past the antimeridian runs on into columns that wrap around
+        if min_lon < -180.0:
+            first_column = math.floor((min_lon + 180.0) / width)
+        if max_lon > 180.0:
+            last_column = math.floor((max_lon + 180.0) / width)
+        columns, rows = np.meshgrid(
+            np.arange(first_column, last_column + 1, dtype=np.int64),
+            np.arange(first_row, last_row + 1, dtype=np.int64)
+        )
+        grids.append(np.column_stack((columns.ravel(), rows.ravel())))
+    columns, rows = np.unique(np.concatenate(grids), axis=0).T
+    west, south = columns * width - 180.0, rows * height - 90.0
+    east, north = west + width, south + height
+
+    if radius_meters is None:
+        shapely.prepare(geometry)
+        cells = shapely.box(west, south, east, north)
+        touching = shapely.intersects(geometry, cells)
+        inside = shapely.covers(geometry, cells)
+    else:
+        center_lon, center_lat = geometry.x, geometry.y
+        nearest = haversine_meters(
+            center_lon, center_lat, np.clip(center_lon, west, east), np.clip(center_lat, south, north)
+        )
+        touching = nearest <= radius_meters
+        inside = touching
+        for corner_lon, corner_lat in ((west, south), (west, north), (east, south), (east, north)):
+            inside = inside & (haversine_meters(center_lon, center_lat, corner_lon, corner_lat) <= radius_meters)
+
+    keep = np.flatnonzero(touching)
+    hashes = geohashes(columns[keep] % (1 << _bit_counts(precision)[0]), rows[keep], precision)
+    return list(zip(hashes, inside[keep].tolist()))
+
+
+class CellCoverage:
+    """
+    In-memory geohash cell -> geofence map for the active geofences of a GeofenceIndex. A point
+    hashes to one cell per precision in use; geofences marked inside that cell match without
+    any geometry test, the rest are only candidates.
+    """
+
+    def __init__(self, cells: Dict[str, Tuple[Tuple[int, ...], Tuple[int, ...]]]):
+        self._cells = cells
+        self._precisions = sorted({len(cell) for cell in cells})
+
+    @classmethod
+    def load(cls, db: Session, geofences: List, positions: np.ndarray) -> "CellCoverage":
+        """
+        Coverage for the geofences at `positions`. Cells persisted by GeofenceService are reused;
+        geofences without them (or stored at another precision) are polyfilled here.
+        """
+        persisted: Dict[UUID, List[Tuple[str, bool]]] = {}
+        for geofence_id, cell, inside in db.query(GeofenceCell.geofence_id, GeofenceCell.cell, GeofenceCell.inside):
+            persisted.setdefault(geofence_id, []).append((cell, inside))
+
+        buckets: Dict[str, Tuple[List[int], List[int]]] = {}
+        for position in positions.tolist():
+            geofence = geofences[position]
+            cells = persisted.get(geofence.id)
+            expected = cell_precision(coverage_boxes(geofence.geometry, geofence.radius_meters))
+            if not cells or len(cells[0][0]) != expected:
+                cells = polyfill(geofence.geometry, geofence.radius_meters)
+            for cell, inside in cells:
+                bucket = buckets.setdefault(cell, ([], []))
+                bucket[0 if inside else 1].append(position)
+        return cls({cell: (tuple(inside), tuple(edge)) for cell, (inside, edge) in buckets.items()})
+
+    def lookup(self, longitude: float, latitude: float) -> Tuple[np.ndarray, np.ndarray]:
+        """(positions certainly containing the point, positions needing an exact test)"""
+        if not self._precisions:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        point_hash = geohash(longitude, latitude, self._precisions[-1])
+        inside: List[int] = []
+        edge: List[int] = []
+        for precision in self._precisions:
+            entry = self._cells.get(point_hash[:precision])
+            if entry is not None:
+                inside.extend(entry[0])
+                edge.extend(entry[1])
+        return np.array(inside, dtype=np.intp), np.array(edge, dtype=np.intp)
+
+    def __len__(self) -> int:
+        return len(self._cells)
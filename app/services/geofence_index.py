@@ -0,0 +1,627 @@
+"""
+Geofence Index
+Single Responsibility: In-process spatial index of geofences for the non-PostGIS path
+"""
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+import shapely
+from geoalchemy2.shape import to_shape
+from shapely.geometry import LineString, Point as ShapelyPoint
+from shapely.geometry.base import BaseGeometry
+from shapely.strtree import STRtree
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.capabilities import get_capabilities
+from app.core.config import get_settings
+from app.core.metrics import record_cache_lookup
+from app.models.geofence import Geofence
+from app.models.geofence_tile import GeofenceTile
+from app.models.geofence_version import GeofenceVersion
+
+settings = get_settings()
+
+EARTH_RADIUS_METERS = 6371008.8
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_METERS / 180
+
+
+def haversine_meters(lon: float, lat: float, lons: np.ndarray, lats: np.ndarray) -> np.ndarray:
+    """Great-circle distances from one point to arrays of points"""
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def great_circle_meters(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    """Scalar haversine distance (cheaper than the numpy version for a single pair)"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((phi2 - phi1) / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * math.asin(math.sqrt(min(1.0, a)))
+
+
+def longitude_offset(longitude, reference):
+    """longitude - reference in degrees, wrapped to [-180, 180) so offsets across the antimeridian stay small"""
+    return (longitude - reference + 180.0) % 360.0 - 180.0
+
+
+def distance_meters(geometry: BaseGeometry, lon: float, lat: float) -> float:
+    """
+    Distance from a point to a geometry (0 inside), in a local equirectangular projection
+    centred on the point; accurate to well under 1% at geofence scales
+    """
+    scale = np.array([METERS_PER_DEGREE * math.cos(math.radians(lat)), METERS_PER_DEGREE])
+    origin = np.array([lon, lat])
+    projected = shapely.transform(geometry, lambda coords: (coords - origin) * scale)
+    return float(projected.distance(ShapelyPoint(0.0, 0.0)))
+
+
+def geofence_bounds(
+    geometry: BaseGeometry,
+    radius_meters: Optional[float] = None
+) -> Tuple[float, float, float, float]:
+    """(min_lon, min_lat, max_lon, max_lat) of a polygon, or of a circle around its center point"""
+    if radius_meters is None:
+        return geometry.bounds
+    half_lat = radius_meters / METERS_PER_DEGREE
+    half_lon = radius_meters / (METERS_PER_DEGREE * max(math.cos(math.radians(geometry.y)), 0.01))
+    return geometry.x - half_lon, geometry.y - half_lat, geometry.x + half_lon, geometry.y + half_lat
+
+
+def subdivide(geometry: BaseGeometry, max_vertices: int) -> List[BaseGeometry]:
+    """
+    Polygon pieces of at most max_vertices vertices whose union is the geometry, made by
+    halving its bounding box along the longer side (as PostGIS ST_Subdivide does)
+    """
+    pieces = []
+    pending = [(geometry, 0)]
+    while pending:
+        part, depth = pending.pop()
+        if shapely.get_num_coordinates(part) <= max_vertices or depth >= 50:
+            pieces.extend(p for p in shapely.get_parts(part) if not p.is_empty)
+            continue
+        min_x, min_y, max_x, max_y = part.bounds
+        if max_x - min_x >= max_y - min_y:
+            middle = (min_x + max_x) / 2
+            halves = ((min_x, min_y, middle, max_y), (middle, min_y, max_x, max_y))
+        else:
+            middle = (min_y + max_y) / 2
+            halves = ((min_x, min_y, max_x, middle), (min_x, middle, max_x, max_y))
+        for half in halves:
+            clipped = shapely.get_parts(shapely.clip_by_rect(part, *half))
+            polygons = [p for p in clipped if p.geom_type == "Polygon" and not p.is_empty]
+            if polygons:
+                pending.append((shapely.multipolygons(polygons), depth + 1))
+    return pieces
+
+
+def boundary_pieces(geometry: BaseGeometry, max_vertices: int) -> List[BaseGeometry]:
+    """The geometry's boundary as linestrings of at most max_vertices vertices (the geometry itself if it has none)"""
+    boundary = geometry.boundary
+    if boundary.is_empty:
+        return [geometry]
+    pieces = []
+    for line in shapely.get_parts(boundary):
+        coords = shapely.get_coordinates(line)
+        for start in range(0, max(len(coords) - 1, 1), max_vertices - 1):
+            pieces.append(LineString(coords[start:start + max_vertices]))
+    return pieces
+
+
+def boundary_crossings(geometry: BaseGeometry, segment: LineString) -> List[Tuple[str, float]]:
+    """
+    ("enter" | "exit", fraction along segment) for each boundary crossing of a two-point
+    segment, in travel order. Containment is sampled between consecutive crossings, so
+    grazing a vertex or running along an edge does not produce spurious events.
+    """
+    hits = geometry.boundary.intersection(segment)
+    if hits.is_empty:
+        return []
+    fractions = sorted({
+        round(segment.project(ShapelyPoint(x, y), normalized=True), 9)
+        for x, y in shapely.get_coordinates(hits)
+    })
+    bounds = [0.0] + fractions + [1.0]
+    inside = [geometry.intersects(segment.interpolate(0.0, normalized=True))]
+    for start, end in zip(bounds[1:-1], bounds[2:]):
+        inside.append(geometry.intersects(segment.interpolate((start + end) / 2, normalized=True)))
+
+    events = []
+    for fraction, before, after in zip(fractions, inside, inside[1:]):
+        if before != after:
+            events.append(("enter" if after else "exit", fraction))
+    return events
+
+
+def circle_crossings(center: Tuple[float, float], radius_meters: float, segment: LineString) -> List[Tuple[str, float]]:
+    """boundary_crossings for a circle, solved exactly in a local projection around the segment"""
+    (x0, y0), (x1, y1) = segment.coords
+    kx = METERS_PER_DEGREE * math.cos(math.radians((y0 + y1) / 2))
+    fx, fy = longitude_offset(x0, center[0]) * kx, (y0 - center[1]) * METERS_PER_DEGREE
+    dx, dy = (x1 - x0) * kx, (y1 - y0) * METERS_PER_DEGREE
+    a = dx * dx + dy * dy
+    b = 2 * (fx * dx + fy * dy)
+    c = fx * fx + fy * fy - radius_meters * radius_meters
+    discriminant = b * b - 4 * a * c
+    if a == 0 or discriminant <= 0:
+        return []
+    root = math.sqrt(discriminant)
+    events = []
+    for event_type, fraction in (("enter", (-b - root) / (2 * a)), ("exit", (-b + root) / (2 * a))):
+        if 0.0 <= fraction <= 1.0:
+            events.append((event_type, fraction))
+    return events
+
+
+def fence_crossings(geometry: BaseGeometry, radius_meters: Optional[float], segment: LineString) -> List[Tuple[str, float]]:
+    """Crossings of a geofence given as stored: a polygon, or a center point with a radius"""
+    if radius_meters is not None:
+        return circle_crossings((geometry.x, geometry.y), radius_meters, segment)
+    return boundary_crossings(geometry, segment)
+
+
+def altitude_stable_range(edges: np.ndarray, altitude: float) -> Tuple[float, float]:
+    """
+    Open interval around an altitude containing none of the given band limits, so moving
+    vertically inside it cannot change which bands admit the asset. An altitude exactly on
+    a limit gets the degenerate interval (altitude, altitude).
+    """
+    if np.any(edges == altitude):
+        return altitude, altitude
+    below = edges[edges < altitude]
+    above = edges[edges > altitude]
+    return (
+        float(below.max()) if below.size else -math.inf,
+        float(above.min()) if above.size else math.inf
+    )
+
+
+class IndexedGeofence:
+    """Immutable snapshot of the geofence fields the evaluator needs"""
+
+    __slots__ = (
+        "id", "name", "status", "geometry", "center", "radius_meters",
+        "altitude_min_meters", "altitude_max_meters", "priority", "tiles"
+    )
+
+    def __init__(self, geofence: Geofence, tiles: Optional[List[BaseGeometry]] = None):
+        self.id: UUID = geofence.id
+        self.name: str = geofence.name
+        self.status: str = geofence.status
+        self.geometry: BaseGeometry = to_shape(geofence.geometry)
+        center = to_shape(geofence.center_point)
+        self.center: Tuple[float, float] = (center.x, center.y)
+        # Set only for circular geofences, whose geometry is the center point
+        self.radius_meters: Optional[float] = geofence.radius_meters if geofence.geofence_type == "circular" else None
+        self.altitude_min_meters: Optional[float] = geofence.altitude_min_meters
+        self.altitude_max_meters: Optional[float] = geofence.altitude_max_meters
+        self.priority: int = geofence.priority
+        # Pieces tested for point containment: stored tiles, else large polygons are split here
+        if self.radius_meters is not None:
+            self.tiles: List[BaseGeometry] = []
+        elif tiles:
+            self.tiles = tiles
+        else:
+            self.tiles = subdivide(self.geometry, settings.GEOFENCE_TILE_MAX_VERTICES)
+
+
+class AltitudeBands:
+    """
+    Altitude interval index aligned with GeofenceIndex positions: [min, max] per geofence, with
+    unset limits open-ended. Candidates from the horizontal bounding-box query are rejected
+    vertically here, as one array comparison, before any exact polygon test.
+    """
+
+    def __init__(self, geofences: List[IndexedGeofence]):
+        self.mins = np.array(
+            [-math.inf if g.altitude_min_meters is None else g.altitude_min_meters for g in geofences], dtype=float
+        )
+        self.maxs = np.array(
+            [math.inf if g.altitude_max_meters is None else g.altitude_max_meters for g in geofences], dtype=float
+        )
+
+    def admits(self, indices: np.ndarray, low: Optional[float], high: Optional[float]) -> np.ndarray:
+        """Indices whose band overlaps [low, high]; an unknown altitude (None) is not filtered"""
+        if low is None or high is None:
+            return indices
+        return indices[self.admitting(indices, low, high)]
+
+    def admitting(self, indices: np.ndarray, low: Optional[float], high: Optional[float]) -> np.ndarray:
+        """Mask form of `admits`, for arrays that repeat indices (one entry per tile)"""
+        if low is None or high is None:
+            return np.ones(len(indices), dtype=bool)
+        return (self.mins[indices] <= high) & (self.maxs[indices] >= low)
+
+    def admitting_each(self, indices: np.ndarray, altitudes: np.ndarray) -> np.ndarray:
+        """Pairwise mask: band of indices[k] admits altitudes[k] (NaN, an unknown altitude, is not filtered)"""
+        return np.isnan(altitudes) | ((self.mins[indices] <= altitudes) & (self.maxs[indices] >= altitudes))
+
+    def stable_range(self, indices: np.ndarray, altitude: float) -> Tuple[float, float]:
+        return altitude_stable_range(np.concatenate((self.mins[indices], self.maxs[indices])), altitude)
+
+
+class GeofenceIndex:
+    """
+    STRtree over polygon geofences, center/radius arrays for circular ones (tested all at once
+    with a vectorized haversine), altitude bands, and center-point arrays for radius search.
+    Point containment and boundary tests run against small pieces of each polygon (its tiles
+    and boundary chunks), so their cost follows local rather than total vertex count.
+    """
+
+    def __init__(self, geofences: List[IndexedGeofence]):
+        self.geofences = geofences
+        self._geometries = np.array([g.geometry for g in geofences], dtype=object)
+        self._active = np.array([g.status == "active" for g in geofences], dtype=bool)
+        circular = np.array([g.radius_meters is not None for g in geofences], dtype=bool)
+        self._circular = circular
+        self._radii = np.array([g.radius_meters or 0.0 for g in geofences], dtype=float)
+        self.bands = AltitudeBands(geofences)
+        self._center_lons = np.array([g.center[0] for g in geofences], dtype=float)
+        self._center_lats = np.array([g.center[1] for g in geofences], dtype=float)
+
+        # Evaluation order for top-k lookups: priority descending, then position
+        self._priorities = np.array([g.priority for g in geofences], dtype=float)
+        self._by_rank = np.lexsort((np.arange(len(geofences)), -self._priorities))
+        self._rank = np.empty(len(geofences), dtype=np.intp)
+        self._rank[self._by_rank] = np.arange(len(geofences))
+
+        self._polygons = np.flatnonzero(~circular)
+        self._tree = STRtree(self._geometries[self._polygons])
+
+        self._all_circles = np.flatnonzero(circular)
+        self._circles = np.flatnonzero(circular & self._active)
+        self._circle_lons = self._center_lons[self._circles]
+        self._circle_lats = self._center_lats[self._circles]
+        self._circle_radii = self._radii[self._circles]
+        half_lats = self._circle_radii / METERS_PER_DEGREE
+        half_lons = self._circle_radii / (METERS_PER_DEGREE * np.maximum(np.cos(np.radians(self._circle_lats)), 0.01))
+        # Boxes reaching past the antimeridian are repeated on its other side
+        west = np.flatnonzero(self._circle_lons - half_lons < -180.0)
+        east = np.flatnonzero(self._circle_lons + half_lons > 180.0)
+        self._circle_box_owners = np.concatenate((np.arange(len(self._circles)), west, east))
+        shifts = np.concatenate((np.zeros(len(self._circles)), np.full(len(west), 360.0), np.full(len(east), -360.0)))
+        box_lons = self._circle_lons[self._circle_box_owners] + shifts
+        box_half_lons = half_lons[self._circle_box_owners]
+        box_lats = self._circle_lats[self._circle_box_owners]
+        box_half_lats = half_lats[self._circle_box_owners]
+        self._circle_tree = STRtree(shapely.box(
+            box_lons - box_half_lons, box_lats - box_half_lats,
+            box_lons + box_half_lons, box_lats + box_half_lats
+        ))
+
+        # Tiles of active polygons, each mapped back to its geofence position
+        active_polygons = self._polygons[self._active[self._polygons]]
+        tiles = [(tile, i) for i in active_polygons for tile in geofences[i].tiles]
+        self._tiles = np.array([tile for tile, _ in tiles], dtype=object)
+        self._tile_owners = np.array([i for _, i in tiles], dtype=np.intp)
+        shapely.prepare(self._tiles)
+        self._tile_tree = STRtree(self._tiles)
+
+        # Boundaries of active polygons: moving less than the distance to the nearest one cannot change containment
+        chunks = [
+            (chunk, i) for i in active_polygons
+            for chunk in boundary_pieces(geofences[i].geometry, settings.GEOFENCE_TILE_MAX_VERTICES)
+        ]
+        self._boundaries = np.array([chunk for chunk, _ in chunks], dtype=object)
+        self._boundary_owners = np.array([i for _, i in chunks], dtype=np.intp)
+        self._boundary_tree = STRtree(self._boundaries)
+        self.cells = None  # CellCoverage, when GEOFENCE_ENGINE=cells
+
+    @classmethod
+    def load(cls, db: Session, cells: bool = False) -> "GeofenceIndex":
+        tiles: Dict[UUID, List[BaseGeometry]] = {}
+        for geofence_id, geometry in db.query(GeofenceTile.geofence_id, GeofenceTile.geometry):
+            tiles.setdefault(geofence_id, []).append(to_shape(geometry))
+        rows = db.query(Geofence).all()
+        index = cls([IndexedGeofence(row, tiles.get(row.id)) for row in rows])
+        if cells:
+            from app.services.geofence_cells import CellCoverage
+            index.cells = CellCoverage.load(db, index.geofences, np.flatnonzero(index._active))
+        return index
+
+    def _candidates(self, geometry: BaseGeometry) -> np.ndarray:
+        """Positions of active polygon geofences whose bounding box intersects the geometry"""
+        candidates = self._polygons[self._tree.query(geometry)]
+        return candidates[self._active[candidates]]
+
+    def _circle_distances(self, longitude: float, latitude: float) -> np.ndarray:
+        """Distance from the point to every active circle's center"""
+        return haversine_meters(longitude, latitude, self._circle_lons, self._circle_lats)
+
+    def _circles_containing(self, longitude: float, latitude: float) -> np.ndarray:
+        if not self._circles.size:
+            return self._circles
+        return self._circles[self._circle_distances(longitude, latitude) <= self._circle_radii]
+
+    def containing(
+        self,
+        longitude: float,
+        latitude: float,
+        altitude: Optional[float] = None,
+        top: Optional[int] = None
+    ) -> List[IndexedGeofence]:
+        """
+        Active geofences whose geometry intersects the point and whose altitude band admits it.
+        With `top`, only the `top` highest-priority of them, most important first.
+        """
+        if top is not None:
+            return self._top_containing(longitude, latitude, altitude, top)
+        if self.cells is not None:
+            inside, edge = self.cells.lookup(longitude, latitude)
+            inside = self.bands.admits(inside, altitude, altitude)
+            edge = self.bands.admits(edge, altitude, altitude)
+            hits = edge[self._contains_point(edge, longitude, latitude)]
+            return [self.geofences[i] for i in np.sort(np.concatenate((inside, hits)))]
+
+        hits = self._polygons_containing(ShapelyPoint(longitude, latitude), altitude)
+        circles = self.bands.admits(self._circles_containing(longitude, latitude), altitude, altitude)
+        return [self.geofences[i] for i in np.sort(np.concatenate((hits, circles)))]
+
+    def _top_containing(
+        self,
+        longitude: float,
+        latitude: float,
+        altitude: Optional[float],
+        top: int
+    ) -> List[IndexedGeofence]:
+        """
+        `containing` limited to the `top` best-ranked matches. Circles (and cells known to lie
+        inside) are decided up front; candidate polygon tiles are then tested one priority level
+        at a time, highest first, stopping once `top` matches outrank every remaining candidate.
+        """
+        point = ShapelyPoint(longitude, latitude)
+        tiles = self._tile_tree.query(point)
+        tiles = tiles[self.bands.admitting(self._tile_owners[tiles], altitude, altitude)]
+        if self.cells is not None:
+            inside, edge = self.cells.lookup(longitude, latitude)
+            edge = self.bands.admits(edge, altitude, altitude)
+            circles = edge[self._circular[edge]]
+            certain = np.concatenate((
+                self.bands.admits(inside, altitude, altitude),
+                circles[self._contains_point(circles, longitude, latitude)]
+            ))
+            tiles = tiles[np.isin(self._tile_owners[tiles], edge)]
+        else:
+            certain = self.bands.admits(self._circles_containing(longitude, latitude), altitude, altitude)
+
+        ranks = np.sort(self._rank[certain])
+        tiles = tiles[np.argsort(self._rank[self._tile_owners[tiles]], kind="stable")]
+        owners = self._tile_owners[tiles]
+        levels = -self._priorities[owners]  # Ascending
+        start = 0
+        while start < len(tiles) and np.searchsorted(ranks, self._rank[owners[start]]) < top:
+            end = start + int(np.searchsorted(levels[start:], levels[start], side="right"))
+            hits = owners[start:end][shapely.intersects(self._tiles[tiles[start:end]], point)]
+            ranks = np.sort(np.concatenate((ranks, self._rank[np.unique(hits)])))
+            start = end
+        return [self.geofences[i] for i in self._by_rank[ranks[:top]]]
+
+    def containing_many(
+        self,
+        longitudes: np.ndarray,
+        latitudes: np.ndarray,
+        altitudes: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        `containing` for arrays of points at once: (point indices, geofence positions) of every
+        match, ordered by point then position. Both trees are queried in bulk and the exact
+        tests run as single vectorized calls; NaN altitudes are not filtered by band.
+        """
+        longitudes = np.asarray(longitudes, dtype=float)
+        latitudes = np.asarray(latitudes, dtype=float)
+        altitudes = np.full(len(longitudes), np.nan) if altitudes is None else np.asarray(altitudes, dtype=float)
+        points = shapely.points(longitudes, latitudes)
+
+        point_tiles, tiles = self._tile_tree.query(points)
+        owners = self._tile_owners[tiles]
+        keep = self.bands.admitting_each(owners, altitudes[point_tiles])
+        point_tiles, tiles, owners = point_tiles[keep], tiles[keep], owners[keep]
+        keep = shapely.intersects_xy(self._tiles[tiles], longitudes[point_tiles], latitudes[point_tiles])
+        point_tiles, owners = point_tiles[keep], owners[keep]
+
+        point_circles, boxes = self._circle_tree.query(points)
+        circles = self._circles[self._circle_box_owners[boxes]]
+        keep = self.bands.admitting_each(circles, altitudes[point_circles])
+        point_circles, circles = point_circles[keep], circles[keep]
+        keep = haversine_meters(
+            longitudes[point_circles], latitudes[point_circles], self._center_lons[circles], self._center_lats[circles]
+        ) <= self._radii[circles]
+        point_circles, circles = point_circles[keep], circles[keep]
+
+        # A point in several tiles of one polygon (on a shared edge) is one match
+        count = max(len(self.geofences), 1)
+        pairs = np.unique(
+            np.concatenate((point_tiles, point_circles)).astype(np.int64) * count + np.concatenate((owners, circles))
+        )
+        return pairs // count, pairs % count
+
+    def _polygons_containing(self, point: ShapelyPoint, altitude: Optional[float] = None) -> np.ndarray:
+        """Sorted positions of active polygons containing the point: tile bounding boxes, then bands, then the tiles"""
+        tiles = self._tile_tree.query(point)
+        tiles = tiles[self.bands.admitting(self._tile_owners[tiles], altitude, altitude)]
+        tiles = tiles[shapely.intersects(self._tiles[tiles], point)]
+        return np.unique(self._tile_owners[tiles])
+
+    def _contains_point(self, positions: np.ndarray, longitude: float, latitude: float) -> np.ndarray:
+        """Exact containment of the point for each position (circles by distance, polygons by geometry)"""
+        result = np.zeros(len(positions), dtype=bool)
+        circular = self._circular[positions]
+        if circular.any():
+            circles = positions[circular]
+            result[circular] = haversine_meters(
+                longitude, latitude, self._center_lons[circles], self._center_lats[circles]
+            ) <= self._radii[circles]
+        if not circular.all():
+            result[~circular] = np.isin(
+                positions[~circular], self._polygons_containing(ShapelyPoint(longitude, latitude))
+            )
+        return result
+
+    def altitude_stable_range(self, longitude: float, latitude: float, altitude: float) -> Tuple[float, float]:
+        """Vertical interval in which `containing` cannot change at this point (bounding-box candidates' band limits)"""
+        candidates = np.concatenate((
+            self._candidates(ShapelyPoint(longitude, latitude)),
+            self._circles_containing(longitude, latitude)
+        ))
+        return self.bands.stable_range(candidates, altitude)
+
+    def crossed_by(
+        self,
+        segment: LineString,
+        altitude_low: Optional[float] = None,
+        altitude_high: Optional[float] = None
+    ) -> List[IndexedGeofence]:
+        """
+        Active geofences whose boundary the segment touches and whose band overlaps the altitudes
+        flown along it (bounding boxes, then bands, then the exact test)
+        """
+        chunks = self._boundary_tree.query(segment)
+        chunks = chunks[self.bands.admitting(self._boundary_owners[chunks], altitude_low, altitude_high)]
+        hits = np.unique(self._boundary_owners[chunks[shapely.intersects(self._boundaries[chunks], segment)]])
+        circles = self.bands.admits(self._circles_crossed_by(segment), altitude_low, altitude_high)
+        return [self.geofences[i] for i in np.sort(np.concatenate((hits, circles)))]
+
+    def _circles_crossed_by(self, segment: LineString) -> np.ndarray:
+        """Active circles with one end of the segment inside and the other outside, or cut through"""
+        if not self._circles.size:
+            return self._circles
+        (x0, y0), (x1, y1) = segment.coords
+        kx = METERS_PER_DEGREE * math.cos(math.radians((y0 + y1) / 2))
+        cx, cy = longitude_offset(self._circle_lons, x0) * kx, (self._circle_lats - y0) * METERS_PER_DEGREE
+        dx, dy = (x1 - x0) * kx, (y1 - y0) * METERS_PER_DEGREE
+        length_squared = dx * dx + dy * dy
+        t = np.clip((cx * dx + cy * dy) / length_squared, 0.0, 1.0) if length_squared else 0.0
+        nearest = np.hypot(cx - t * dx, cy - t * dy)
+        farthest = np.maximum(np.hypot(cx, cy), np.hypot(cx - dx, cy - dy))
+        return self._circles[(nearest <= self._circle_radii) & (farthest >= self._circle_radii)]
+
+    def distance(self, geofence: IndexedGeofence, longitude: float, latitude: float) -> float:
+        """Distance in meters from the point to the geofence (0 inside)"""
+        if geofence.radius_meters is not None:
+            center_distance = great_circle_meters(geofence.center[0], geofence.center[1], longitude, latitude)
+            return max(0.0, center_distance - geofence.radius_meters)
+        return distance_meters(geofence.geometry, longitude, latitude)
+
+    def safe_radius(self, longitude: float, latitude: float) -> float:
+        """
+        Lower bound, in meters, on the distance from the point to the nearest active fence
+        boundary (degrees scaled by the shorter, east-west, meters-per-degree)
+        """
+        radius = math.inf
+        if self._boundaries.size:
+            point = ShapelyPoint(longitude, latitude)
+            nearest = self._boundary_tree.nearest(point)
+            degrees = self._boundaries[nearest].distance(point)
+            radius = degrees * METERS_PER_DEGREE * math.cos(math.radians(latitude))
+        if self._circles.size:
+            radius = min(radius, float(np.abs(self._circle_distances(longitude, latitude) - self._circle_radii).min()))
+        return radius
+
+    def nearest(
+        self,
+        longitude: float,
+        latitude: float,
+        radius_meters: float,
+        limit: int
+    ) -> List[Tuple[IndexedGeofence, float]]:
+        """
+        Geofences of any status whose geometry lies within radius_meters of the point, nearest
+        first, with their distance in meters (0 inside). Polygons come from the STRtree within
+        a box of that radius; circles are measured all at once from their centers.
+        """
+        half_lat = radius_meters / METERS_PER_DEGREE
+        half_lon = radius_meters / (METERS_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+        window = shapely.box(longitude - half_lon, latitude - half_lat, longitude + half_lon, latitude + half_lat)
+        polygons = self._polygons[self._tree.query(window)]
+        found = [(i, distance_meters(self.geofences[i].geometry, longitude, latitude)) for i in polygons]
+
+        if self._all_circles.size:
+            center_distances = haversine_meters(
+                longitude, latitude, self._center_lons[self._all_circles], self._center_lats[self._all_circles]
+            )
+            distances = np.maximum(center_distances - self._radii[self._all_circles], 0.0)
+            found.extend(zip(self._all_circles, distances.tolist()))
+
+        found = sorted((d, i) for i, d in found if d <= radius_meters)[:limit]
+        return [(self.geofences[i], d) for d, i in found]
+
+
+def bump_geofence_version(db: Session) -> None:
+    """
+    Record a geofence change for every worker's index cache. Call in the transaction that
+    writes geofences, tiles or cells, just before commit: the row stays locked until then.
+    """
+    bumped = db.execute(update(GeofenceVersion).where(GeofenceVersion.id == 1).values(
+        version=GeofenceVersion.version + 1
+    )).rowcount
+    if bumped:
+        return
+    # Schema created without migrations; a concurrent writer may create the row first
+    try:
+        with db.begin_nested():
+            db.add(GeofenceVersion(id=1, version=1))
+    except IntegrityError:
+        db.execute(update(GeofenceVersion).where(GeofenceVersion.id == 1).values(version=GeofenceVersion.version + 1))
+
+
+class GeofenceIndexCache:
+    """
+    Per-process GeofenceIndex. Local writes invalidate it immediately; changes made by other
+    workers are noticed through geofence_version, checked every GEOFENCE_INDEX_REFRESH_SECONDS.
+    """
+
+    def __init__(self):
+        self._index: Optional[GeofenceIndex] = None
+        self._version: Optional[int] = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+        self.generation = 0  # Bumped whenever geofences are known to have changed
+        self._latest_version = 0  # Last geofence_version read by `version`
+        self._latest_checked_at = float("-inf")
+
+    def get(self, db: Session) -> GeofenceIndex:
+        index = self._index
+        if index is not None and time.monotonic() - self._checked_at < settings.GEOFENCE_INDEX_REFRESH_SECONDS:
+            record_cache_lookup("geofence_index", True)
+            return index
+
+        with self._lock:
+            version = db.query(GeofenceVersion.version).filter(GeofenceVersion.id == 1).scalar() or 0
+            hit = self._index is not None and version == self._version
+            if not hit:
+                if self._index is not None:
+                    self.generation += 1
+                self._index = GeofenceIndex.load(db, cells=get_capabilities().spatial_engine == "cells")
+                self._version = version
+            self._checked_at = time.monotonic()
+            record_cache_lookup("geofence_index", hit)
+            return self._index
+
+    def version(self, db: Session) -> int:
+        """
+        geofence_version, read at most every GEOFENCE_INDEX_REFRESH_SECONDS (and right after a
+        local write) without loading the index: the PostGIS engine keys cached results on it
+        """
+        if time.monotonic() - self._latest_checked_at < settings.GEOFENCE_INDEX_REFRESH_SECONDS:
+            return self._latest_version
+        version = db.query(GeofenceVersion.version).filter(GeofenceVersion.id == 1).scalar() or 0
+        with self._lock:
+            self._latest_version = version
+            self._latest_checked_at = time.monotonic()
+        return version
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._index = None
+            self._version = None
+            self._latest_checked_at = float("-inf")
+            self.generation += 1
+
+
+geofence_index = GeofenceIndexCache()
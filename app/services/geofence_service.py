@@ -3,13 +3,20 @@ Geofence Service
 Single Responsibility: Manage geofence operations
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from geoalchemy2.shape import from_shape
+from sqlalchemy import and_, case, func, insert, or_
+from geoalchemy2.shape import from_shape, to_shape
+import numpy as np
+import shapely
 from shapely.geometry import shape, Point as ShapelyPoint
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 from app.models.geofence import Geofence
-from app.schemas.geofence import GeofenceCreate, GeofenceUpdate
+from app.models.geofence_cell import GeofenceCell
+from app.models.geofence_tile import GeofenceTile
+from app.schemas.geofence import BatchPoint, GeofenceCreate, GeofenceUpdate
+from app.services.geofence_cells import polyfill
+from app.services.geofence_index import bump_geofence_version, geofence_bounds, geofence_index, subdivide
+from app.core.capabilities import get_capabilities
 from app.core.config import get_settings
 
 settings = get_settings()
@@ -18,13 +25,57 @@ settings = get_settings()
 class GeofenceService:
     """Service for geofence operations"""
     
+    @staticmethod
+    def _update_bounds(geofence: Geofence, geometry_shape) -> None:
+        """Persist the bounding box used as the B-tree prefilter for spatial selection"""
+        geofence.min_lon, geofence.min_lat, geofence.max_lon, geofence.max_lat = geofence_bounds(
+            geometry_shape, geofence.radius_meters if geofence.geofence_type == "circular" else None
+        )
+    
+    @staticmethod
+    def _store_cells(db: Session, geofence: Geofence, geometry_shape) -> None:
+        """Persist the geohash coverage read by the cells engine (skipped under other engines)"""
+        if get_capabilities().spatial_engine != "cells":
+            return
+        if geofence.id is None:
+            db.flush()
+        db.query(GeofenceCell).filter(GeofenceCell.geofence_id == geofence.id).delete(synchronize_session=False)
+        radius_meters = geofence.radius_meters if geofence.geofence_type == "circular" else None
+        cells = polyfill(geometry_shape, radius_meters)
+        if cells:
+            db.execute(insert(GeofenceCell), [
+                {"cell": cell, "geofence_id": geofence.id, "inside": inside} for cell, inside in cells
+            ])
+    
+    @staticmethod
+    def _store_tiles(db: Session, geofence: Geofence, geometry_shape) -> None:
+        """Split polygons above GEOFENCE_TILE_MAX_VERTICES into tiles so containment tests stay local"""
+        if geofence.id is None:
+            db.flush()
+        db.query(GeofenceTile).filter(GeofenceTile.geofence_id == geofence.id).delete(synchronize_session=False)
+        geofence.tiled = (
+            geofence.geofence_type != "circular"
+            and shapely.get_num_coordinates(geometry_shape) > settings.GEOFENCE_TILE_MAX_VERTICES
+        )
+        if geofence.tiled:
+            db.execute(insert(GeofenceTile), [
+                {"geofence_id": geofence.id, "geometry": from_shape(tile, srid=settings.DEFAULT_SRID)}
+                for tile in subdivide(geometry_shape, settings.GEOFENCE_TILE_MAX_VERTICES)
+            ])
+    
+    @staticmethod
+    def bbox_intersects(min_lon: float, min_lat: float, max_lon: float, max_lat: float):
+        """Filter expression: the geofence's bounding box overlaps the given one"""
+        return and_(
+            Geofence.min_lat <= max_lat,
+            Geofence.max_lat >= min_lat,
+            Geofence.min_lon <= max_lon,
+            Geofence.max_lon >= min_lon
+        )
+    
     @staticmethod
     def create_geofence(db: Session, geofence_data: GeofenceCreate, user_id: UUID) -> Geofence:
         """Create a new geofence"""
-        # Convert GeoJSON to PostGIS geometry
-        geometry_shape = shape(geofence_data.geometry.dict())
-        geometry_wkb = from_shape(geometry_shape, srid=settings.DEFAULT_SRID)
-        
         # Convert center point
         center_shape = ShapelyPoint(
             geofence_data.center_point.longitude,
@@ -32,11 +83,21 @@ class GeofenceService:
         )
         center_wkb = from_shape(center_shape, srid=settings.DEFAULT_SRID)
         
+        # Convert GeoJSON to PostGIS geometry; circles store only their center and radius
+        circular = geofence_data.geofence_type == "circular"
+        if circular:
+            geometry_wkb = center_wkb
+        else:
+            geometry_shape = shape(geofence_data.geometry.dict())
+            geometry_wkb = from_shape(geometry_shape, srid=settings.DEFAULT_SRID)
+        
         geofence = Geofence(
             name=geofence_data.name,
             description=geofence_data.description,
+            geofence_type=geofence_data.geofence_type,
             geometry=geometry_wkb,
             center_point=center_wkb,
+            radius_meters=geofence_data.radius_meters if circular else None,
             altitude_min_meters=geofence_data.altitude_min_meters,
             altitude_max_meters=geofence_data.altitude_max_meters,
             status=geofence_data.status,
@@ -44,9 +105,14 @@ class GeofenceService:
             organization_id=UUID(geofence_data.organization_id) if geofence_data.organization_id else None,
             created_by_id=user_id
         )
+        GeofenceService._update_bounds(geofence, center_shape if circular else geometry_shape)
         
         db.add(geofence)
+        GeofenceService._store_tiles(db, geofence, center_shape if circular else geometry_shape)
+        GeofenceService._store_cells(db, geofence, center_shape if circular else geometry_shape)
+        bump_geofence_version(db)
         db.commit()
+        geofence_index.invalidate()
         db.refresh(geofence)
         return geofence
     
@@ -61,15 +127,18 @@ class GeofenceService:
         skip: int = 0,
         limit: int = 100,
         status: Optional[str] = None,
-        organization_id: Optional[UUID] = None
+        organization_id: Optional[UUID] = None,
+        bbox: Optional[Tuple[float, float, float, float]] = None
     ) -> tuple[List[Geofence], int]:
-        """List geofences with pagination"""
+        """List geofences with pagination, optionally only those overlapping a (min_lon, min_lat, max_lon, max_lat) box"""
         query = db.query(Geofence)
         
         if status:
             query = query.filter(Geofence.status == status)
         if organization_id:
             query = query.filter(Geofence.organization_id == organization_id)
+        if bbox:
+            query = query.filter(GeofenceService.bbox_intersects(*bbox))
         
         total = query.count()
         geofences = query.offset(skip).limit(limit).all()
@@ -94,12 +163,26 @@ class GeofenceService:
         if geofence_data.geometry is not None:
             geometry_shape = shape(geofence_data.geometry.dict())
             geofence.geometry = from_shape(geometry_shape, srid=settings.DEFAULT_SRID)
+            geofence.geofence_type = "polygon"
+            geofence.radius_meters = None
         if geofence_data.center_point is not None:
             center_shape = ShapelyPoint(
                 geofence_data.center_point.longitude,
                 geofence_data.center_point.latitude
             )
             geofence.center_point = from_shape(center_shape, srid=settings.DEFAULT_SRID)
+        if geofence_data.radius_meters is not None:
+            geofence.geofence_type = "circular"
+            geofence.radius_meters = geofence_data.radius_meters
+        if geofence.geofence_type == "circular":
+            geofence.geometry = geofence.center_point
+        if any(value is not None for value in (
+            geofence_data.geometry, geofence_data.center_point, geofence_data.radius_meters
+        )):
+            geometry_shape = to_shape(geofence.geometry)
+            GeofenceService._update_bounds(geofence, geometry_shape)
+            GeofenceService._store_tiles(db, geofence, geometry_shape)
+            GeofenceService._store_cells(db, geofence, geometry_shape)
         if geofence_data.altitude_min_meters is not None:
             geofence.altitude_min_meters = geofence_data.altitude_min_meters
         if geofence_data.altitude_max_meters is not None:
@@ -109,7 +192,9 @@ class GeofenceService:
         if geofence_data.priority is not None:
             geofence.priority = geofence_data.priority
         
+        bump_geofence_version(db)
         db.commit()
+        geofence_index.invalidate()
         db.refresh(geofence)
         return geofence
     
@@ -121,7 +206,9 @@ class GeofenceService:
             return False
         
         db.delete(geofence)
+        bump_geofence_version(db)
         db.commit()
+        geofence_index.invalidate()
         return True
     
     @staticmethod
@@ -129,19 +216,61 @@ class GeofenceService:
         db: Session,
         latitude: float,
         longitude: float,
-        radius_meters: float = 5000
-    ) -> List[Geofence]:
-        """Find geofences near a point"""
-        point = ShapelyPoint(longitude, latitude)
-        point_wkb = from_shape(point, srid=settings.DEFAULT_SRID)
+        radius_meters: float = 5000,
+        limit: int = 50
+    ) -> List[Tuple[Geofence, float]]:
+        """
+        Find geofences whose boundary (not just center) is within radius_meters of a point,
+        nearest first, with the distance in meters (0 when the point is inside)
+        """
+        if not get_capabilities().postgis:
+            nearest = geofence_index.get(db).nearest(longitude, latitude, radius_meters, limit)
+            if not nearest:
+                return []
+            rows = {g.id: g for g in db.query(Geofence).filter(Geofence.id.in_([g.id for g, _ in nearest])).all()}
+            return [(rows[g.id], distance) for g, distance in nearest if g.id in rows]
         
-        geofences = db.query(Geofence).filter(
-            func.ST_DWithin(
-                Geofence.center_point,
-                point_wkb,
-                radius_meters
-            )
-        ).all()
+        # Geography so the radius is in meters rather than degrees; circles are measured from their center
+        point = func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), settings.DEFAULT_SRID)
+        circular = Geofence.geofence_type == "circular"
+        geometry_distance = func.ST_Distance(func.geography(Geofence.geometry), func.geography(point))
+        distance = case(
+            (circular, func.greatest(geometry_distance - Geofence.radius_meters, 0.0)),
+            else_=geometry_distance
+        )
         
-        return geofences
-
+        # Index-assisted window in degrees (GiST for polygons, bounding-box columns for circles),
+        # exact distance only on its rows
+        min_lon, min_lat, max_lon, max_lat = geofence_bounds(ShapelyPoint(longitude, latitude), radius_meters)
+        window = func.ST_MakeEnvelope(min_lon, min_lat, max_lon, max_lat, settings.DEFAULT_SRID)
+        rows = db.query(Geofence, distance).filter(
+            or_(
+                and_(~circular, Geofence.geometry.op("&&")(window)),
+                and_(circular, GeofenceService.bbox_intersects(min_lon, min_lat, max_lon, max_lat))
+            ),
+            distance <= radius_meters
+        ).order_by(distance).limit(limit).all()
+        
+        return [(geofence, float(d)) for geofence, d in rows]
+    
+    @staticmethod
+    def evaluate_batch(db: Session, points: List[BatchPoint]) -> List[Tuple[int, List[UUID]]]:
+        """
+        (point index, ids of the active geofences containing it) for each point inside at least
+        one geofence. Evaluated in bulk against this worker's geofence index under every engine;
+        a point without altitude is checked against every band.
+        """
+        index = geofence_index.get(db)
+        count = len(points)
+        point_indices, positions = index.containing_many(
+            np.fromiter((p.longitude for p in points), dtype=float, count=count),
+            np.fromiter((p.latitude for p in points), dtype=float, count=count),
+            np.fromiter((np.nan if p.altitude is None else p.altitude for p in points), dtype=float, count=count)
+        )
+        if not point_indices.size:
+            return []
+        
+        ids = [index.geofences[i].id for i in positions.tolist()]
+        starts = np.flatnonzero(np.diff(point_indices, prepend=-1)).tolist()
+        ends = starts[1:] + [len(ids)]
+        return [(int(point_indices[start]), ids[start:end]) for start, end in zip(starts, ends)]
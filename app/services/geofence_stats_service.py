@@ -0,0 +1,221 @@
+"""
+Geofence Stats Service
+Single Responsibility: Maintain pre-aggregated per-geofence activity summaries
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import case, delete, func, extract
+from sqlalchemy.dialects import postgresql, sqlite
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID, uuid4
+from datetime import datetime, timedelta, timezone
+from app.models.geofence_stats import GeofenceStatCounter, GeofenceStats
+from app.models.notification import Notification
+
+# Notification types counted as boundary breaches ("enter" is emitted by swept-path detection)
+BREACH_TYPES = ("breach", "enter")
+RECENT_ASSETS_DAYS = 7
+
+
+def _insert(db: Session, model):
+    """INSERT ... ON CONFLICT for the session's dialect"""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
+class GeofenceStatsService:
+    """
+    Keeps one geofence_stats row (plus keyed breakdown counters) per geofence current as
+    notifications are created, so readers (AI context assembly, dashboards) never scan the
+    notifications table.
+    """
+
+    @staticmethod
+    def record_notifications(db: Session, notifications: Iterable[Notification]) -> None:
+        """
+        Fold new notifications into their geofences' stats. Runs in the caller's transaction as
+        upserts that add to the stored counters in place, so concurrent writers never read and
+        rewrite a shared row; callers record last, right before commit, to keep row locks short.
+        """
+        at = datetime.now(timezone.utc)
+        totals: Dict[UUID, Dict[str, Any]] = {}
+        counts: Dict[Tuple[UUID, str, str], int] = {}
+        for notification in notifications:
+            geofence_id = notification.geofence_id
+            if not geofence_id:
+                continue
+            row = totals.setdefault(geofence_id, {
+                "id": uuid4(), "geofence_id": geofence_id, "event_count": 0, "breach_count": 0,
+                "distance_sum_meters": 0.0, "distance_samples": 0, "min_distance_meters": None,
+                "first_event_at": at, "last_event_at": at, "last_breach_at": None
+            })
+            row["event_count"] += 1
+            if notification.notification_type in BREACH_TYPES:
+                row["breach_count"] += 1
+                row["last_breach_at"] = at
+            if notification.distance_meters is not None:
+                row["distance_sum_meters"] += notification.distance_meters
+                row["distance_samples"] += 1
+                if row["min_distance_meters"] is None or notification.distance_meters < row["min_distance_meters"]:
+                    row["min_distance_meters"] = notification.distance_meters
+
+            keys = [("type", notification.notification_type), ("severity", notification.severity), ("hour", f"{at.hour:02d}")]
+            if notification.asset_id:
+                keys.append(("asset", str(notification.asset_id)))
+            for dimension, key in keys:
+                if key:
+                    counts[(geofence_id, dimension, key)] = counts.get((geofence_id, dimension, key), 0) + 1
+        if not totals:
+            return
+
+        # Rows in a stable order so concurrent batches lock them in the same sequence
+        statement = _insert(db, GeofenceStats).values([totals[g] for g in sorted(totals, key=str)])
+        new = statement.excluded
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[GeofenceStats.geofence_id],
+            set_={
+                "event_count": GeofenceStats.event_count + new.event_count,
+                "breach_count": GeofenceStats.breach_count + new.breach_count,
+                "distance_sum_meters": GeofenceStats.distance_sum_meters + new.distance_sum_meters,
+                "distance_samples": GeofenceStats.distance_samples + new.distance_samples,
+                "min_distance_meters": case(
+                    (GeofenceStats.min_distance_meters.is_(None), new.min_distance_meters),
+                    (new.min_distance_meters < GeofenceStats.min_distance_meters, new.min_distance_meters),
+                    else_=GeofenceStats.min_distance_meters
+                ),
+                "first_event_at": func.coalesce(GeofenceStats.first_event_at, new.first_event_at),
+                "last_event_at": new.last_event_at,
+                "last_breach_at": func.coalesce(new.last_breach_at, GeofenceStats.last_breach_at),
+                "updated_at": func.now()
+            }
+        ))
+
+        statement = _insert(db, GeofenceStatCounter).values([
+            {"geofence_id": geofence_id, "dimension": dimension, "key": key, "count": count, "last_at": at}
+            for (geofence_id, dimension, key), count in sorted(counts.items(), key=lambda item: (str(item[0][0]), item[0][1], item[0][2]))
+        ])
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[GeofenceStatCounter.geofence_id, GeofenceStatCounter.dimension, GeofenceStatCounter.key],
+            set_={
+                "count": GeofenceStatCounter.count + statement.excluded.count,
+                "last_at": statement.excluded.last_at
+            }
+        ))
+
+    @staticmethod
+    def _empty(geofence_id: UUID) -> GeofenceStats:
+        return GeofenceStats(
+            geofence_id=geofence_id,
+            event_count=0,
+            breach_count=0,
+            distance_sum_meters=0.0,
+            distance_samples=0
+        )
+
+    @staticmethod
+    def rebuild(db: Session, geofence_id: UUID) -> GeofenceStats:
+        """Recompute a geofence's stats from the notifications table (backfill/repair)"""
+        base = db.query(Notification).filter(Notification.geofence_id == geofence_id)
+        stats = db.query(GeofenceStats).filter(GeofenceStats.geofence_id == geofence_id).first()
+        if not stats:
+            stats = GeofenceStatsService._empty(geofence_id)
+            db.add(stats)
+
+        totals = base.with_entities(
+            func.count(Notification.id),
+            func.coalesce(func.sum(Notification.distance_meters), 0.0),
+            func.count(Notification.distance_meters),
+            func.min(Notification.distance_meters),
+            func.min(Notification.created_at),
+            func.max(Notification.created_at)
+        ).one()
+        stats.event_count, stats.distance_sum_meters, stats.distance_samples = totals[0], totals[1], totals[2]
+        stats.min_distance_meters, stats.first_event_at, stats.last_event_at = totals[3], totals[4], totals[5]
+
+        breaches = base.filter(Notification.notification_type.in_(BREACH_TYPES))
+        stats.breach_count = breaches.count()
+        stats.last_breach_at = breaches.with_entities(func.max(Notification.created_at)).scalar()
+
+        hour = extract("hour", Notification.created_at)
+        rows = [
+            ("type", key, count, None)
+            for key, count in base.with_entities(Notification.notification_type, func.count()).group_by(Notification.notification_type)
+        ] + [
+            ("severity", key, count, None)
+            for key, count in base.with_entities(Notification.severity, func.count()).group_by(Notification.severity)
+        ] + [
+            ("hour", f"{int(h):02d}", count, None)
+            for h, count in base.with_entities(hour, func.count()).group_by(hour)
+        ] + [
+            ("asset", str(asset_id), count, seen)
+            for asset_id, count, seen in base.filter(Notification.asset_id.isnot(None)).with_entities(
+                Notification.asset_id, func.count(), func.max(Notification.created_at)
+            ).group_by(Notification.asset_id)
+        ]
+        db.execute(delete(GeofenceStatCounter).where(GeofenceStatCounter.geofence_id == geofence_id))
+        db.add_all(
+            GeofenceStatCounter(geofence_id=geofence_id, dimension=dimension, key=key, count=count, last_at=last_at)
+            for dimension, key, count, last_at in rows if key
+        )
+
+        db.commit()
+        db.refresh(stats)
+        return stats
+
+    @staticmethod
+    def get_stats_map(db: Session, geofence_ids: List[UUID]) -> Dict[UUID, GeofenceStats]:
+        """Stats rows for several geofences in one query"""
+        if not geofence_ids:
+            return {}
+        rows = db.query(GeofenceStats).filter(GeofenceStats.geofence_id.in_(geofence_ids)).all()
+        return {row.geofence_id: row for row in rows}
+
+    @staticmethod
+    def get_recent_asset_counts(db: Session, geofence_ids: List[UUID]) -> Dict[UUID, int]:
+        """Distinct assets seen in each geofence within RECENT_ASSETS_DAYS, in one query"""
+        if not geofence_ids:
+            return {}
+        since = datetime.now(timezone.utc) - timedelta(days=RECENT_ASSETS_DAYS)
+        return dict(
+            db.query(GeofenceStatCounter.geofence_id, func.count())
+            .filter(
+                GeofenceStatCounter.geofence_id.in_(geofence_ids),
+                GeofenceStatCounter.dimension == "asset",
+                GeofenceStatCounter.last_at >= since
+            )
+            .group_by(GeofenceStatCounter.geofence_id)
+            .all()
+        )
+
+    @staticmethod
+    def summarize(stats: Optional[GeofenceStats], recent_assets: int = 0) -> Dict[str, Any]:
+        """Compact, prompt-ready view of a stats row"""
+        if stats is None or not stats.event_count:
+            return {"event_count": 0}
+
+        breakdown: Dict[str, Dict[str, int]] = {}
+        for counter in stats.counters:
+            breakdown.setdefault(counter.dimension, {})[counter.key] = counter.count
+        hourly = [breakdown.get("hour", {}).get(f"{h:02d}", 0) for h in range(24)]
+        busiest = sorted((h for h in range(24) if hourly[h]), key=lambda h: -hourly[h])[:3]
+        summary: Dict[str, Any] = {
+            "event_count": stats.event_count,
+            "breach_count": stats.breach_count,
+            "breach_rate": round(stats.breach_count / stats.event_count, 3),
+            "events_by_type": breakdown.get("type", {}),
+            "events_by_severity": breakdown.get("severity", {}),
+            "busiest_hours_utc": [f"{h:02d}:00 ({hourly[h]})" for h in busiest],
+            "recent_distinct_assets": recent_assets,
+            "first_event_at": stats.first_event_at,
+            "last_event_at": stats.last_event_at,
+            "last_breach_at": stats.last_breach_at
+        }
+        if stats.first_event_at and stats.last_event_at:
+            span = stats.last_event_at.replace(tzinfo=None) - stats.first_event_at.replace(tzinfo=None)
+            days = max(span.total_seconds() / 86400, 1.0)
+            summary["events_per_day"] = round(stats.event_count / days, 2)
+        if stats.distance_samples:
+            summary["avg_distance_meters"] = round(stats.distance_sum_meters / stats.distance_samples, 1)
+            summary["min_distance_meters"] = round(stats.min_distance_meters, 1)
+        return summary
+
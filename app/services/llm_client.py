@@ -0,0 +1,89 @@
+"""
+LLM client
+Chat completions over the OpenAI SDK (or an offline stub), blocking and streaming
+"""
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List, Optional
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class LLMClient:
+    """OpenAI chat completion client (SDK clients are created on first use)"""
+
+    def __init__(self, api_key: Optional[str], model: str):
+        self.api_key = api_key
+        self.model = model
+        self._client = None
+        self._async_client = None
+
+    @property
+    def available(self) -> bool:
+        """Whether the client can reach a model"""
+        return bool(settings.AI_SERVICE_ENABLED and self.api_key)
+
+    def _sync(self):
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(api_key=self.api_key)
+        return self._client
+
+    def _async(self):
+        if self._async_client is None:
+            from openai import AsyncOpenAI
+            self._async_client = AsyncOpenAI(api_key=self.api_key)
+        return self._async_client
+
+    def complete(self, messages: List[Dict[str, str]], temperature: float) -> str:
+        """Blocking chat completion"""
+        response = self._sync().chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature
+        )
+        return response.choices[0].message.content
+
+    async def stream(self, messages: List[Dict[str, str]], temperature: float) -> AsyncIterator[str]:
+        """Yield completion tokens as the model produces them"""
+        response = await self._async().chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            stream=True
+        )
+        async for chunk in response:
+            if not chunk.choices:
+                continue
+            token = chunk.choices[0].delta.content
+            if token:
+                yield token
+
+
+class StubLLMClient(LLMClient):
+    """Deterministic offline client for development and tests (AI_PROVIDER=stub)"""
+
+    def __init__(self, model: str = "stub"):
+        super().__init__(None, model)
+        self.calls = 0
+
+    @property
+    def available(self) -> bool:
+        return settings.AI_SERVICE_ENABLED
+
+    def complete(self, messages: List[Dict[str, str]], temperature: float) -> str:
+        self.calls += 1
+        last = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+        return f"[stub] {last[:200]}"
+
+    async def stream(self, messages: List[Dict[str, str]], temperature: float) -> AsyncIterator[str]:
+        for i, word in enumerate(self.complete(messages, temperature).split(" ")):
+            yield word if i == 0 else " " + word
+
+
+@lru_cache()
+def get_llm_client() -> LLMClient:
+    """Shared LLM client instance for the configured AI_PROVIDER"""
+    if settings.AI_PROVIDER == "stub":
+        return StubLLMClient(settings.AI_MODEL)
+    return LLMClient(settings.OPENAI_API_KEY, settings.AI_MODEL)
@@ -3,15 +3,37 @@ Notification Service
 Single Responsibility: Manage notifications and proximity detection
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from geoalchemy2.shape import from_shape
-from shapely.geometry import Point as ShapelyPoint
-from typing import List, Optional
+from sqlalchemy import and_, case, func, or_, true
+from geoalchemy2.shape import from_shape, to_shape
+from shapely.geometry import LineString, Point as ShapelyPoint
+from typing import List, Optional, Tuple
 from uuid import UUID
-from datetime import datetime
+from datetime import datetime, timezone
+import math
+import numpy as np
+from app.models.asset import AssetTrajectory
 from app.models.notification import Notification
 from app.models.geofence import Geofence
+from app.models.geofence_tile import GeofenceTile
 from app.schemas.notification import NotificationCreate, NotificationUpdate
+from app.services.geofence_stats_service import GeofenceStatsService
+from app.services.geofence_service import GeofenceService
+from app.services.geofence_index import (
+    METERS_PER_DEGREE, GeofenceIndex, altitude_stable_range, fence_crossings, geofence_index
+)
+from app.services.proximity_cache import safe_radius_cache
+from app.core.capabilities import get_capabilities
+from app.core.config import get_settings
+from app.core.metrics import PROXIMITY_CHECK_LATENCY, GEOFENCES_EVALUATED
+
+settings = get_settings()
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Trajectory times come back timezone-aware from PostgreSQL and naive (UTC) from SQLite"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
 
 
 class NotificationService:
@@ -40,52 +62,354 @@ class NotificationService:
         )
         
         db.add(notification)
+        GeofenceStatsService.record_notifications(db, [notification])
         db.commit()
         db.refresh(notification)
         return notification
     
     @staticmethod
+    @PROXIMITY_CHECK_LATENCY.time()
     def check_proximity(
         db: Session,
         asset_id: UUID,
         latitude: float,
-        longitude: float
+        longitude: float,
+        altitude: Optional[float] = None,
+        top: Optional[int] = None
     ) -> List[Notification]:
-        """Check if asset is in proximity to any geofence and create notifications"""
+        """
+        Check if asset is in proximity to any geofence and create notifications. The path from
+        the asset's previous trajectory point is also checked, so fences crossed between pings
+        produce enter/exit notifications stamped with the interpolated crossing time.
+        
+        Only fences whose altitude band contains the asset's altitude match. Without an explicit
+        altitude the one recorded with the asset's latest location is used; an asset with no
+        known altitude is checked against every band.
+        
+        With `top`, proximity notifications are raised only for the `top` highest-priority
+        matching fences (enter/exit crossings are unaffected), and evaluation stops once they
+        are known.
+        """
         point = ShapelyPoint(longitude, latitude)
         point_wkb = from_shape(point, srid=4326)
+        previous, current_at, recorded_altitude = NotificationService._previous_ping(db, asset_id, longitude, latitude)
+        if altitude is None:
+            altitude = recorded_altitude
         
-        # Find intersecting geofences
-        geofences = db.query(Geofence).filter(
-            func.ST_Intersects(Geofence.geometry, point_wkb),
-            Geofence.status == "active"
-        ).all()
-        
-        notifications = []
-        for geofence in geofences:
-            # Calculate distance to boundary
-            distance = db.scalar(
-                func.ST_Distance(geofence.geometry, point_wkb)
+        # Find intersecting geofences with their distance in meters; skipped while the asset
+        # (and its previous ping) are closer than the nearest fence boundary to its last evaluation.
+        # Cached results are keyed on the index generation, or under PostGIS (no index loaded) on
+        # geofence_version, so fence changes made by other workers are noticed.
+        postgis = get_capabilities().postgis
+        index = None if postgis else geofence_index.get(db)
+        generation = geofence_index.version(db) if postgis else geofence_index.generation
+        matches = safe_radius_cache.lookup(
+            asset_id, longitude, latitude, generation,
+            altitude=altitude, previous=previous[:2] if previous else None, top=top
+        )
+        crossings = []
+        if matches is None:
+            if postgis:
+                matches, safe_radius, altitude_range = NotificationService._evaluate_postgis(
+                    db, point_wkb, longitude, latitude, altitude, top
+                )
+            else:
+                matches, safe_radius, altitude_range = NotificationService._evaluate_inprocess(
+                    index, longitude, latitude, altitude, top
+                )
+            safe_radius_cache.store(
+                asset_id, longitude, latitude, safe_radius, matches, generation, altitude, altitude_range, top
             )
+            GEOFENCES_EVALUATED.observe(len(matches))
             
+            if previous and (current_at - previous[2]).total_seconds() <= settings.SWEPT_PATH_MAX_GAP_SECONDS:
+                crossings = NotificationService._crossing_events(
+                    db, index, asset_id, previous, (longitude, latitude, altitude), current_at
+                )
+        
+        if top is not None:
+            matches = sorted(matches, key=lambda match: -match[3])[:top]  # Stable: ties keep evaluation order
+        
+        notifications = list(crossings)  # Crossings happened before this ping
+        for geofence_id, geofence_name, distance, _ in matches:
             notification = Notification(
                 notification_type="proximity",
                 severity="medium" if distance < 100 else "low",
-                title=f"Asset in proximity to {geofence.name}",
+                title=f"Asset in proximity to {geofence_name}",
                 message=f"Distance: {distance:.2f} meters",
                 location=point_wkb,
                 distance_meters=distance,
-                geofence_id=geofence.id,
-                asset_id=asset_id
+                geofence_id=geofence_id,
+                asset_id=asset_id,
+                triggered_at=current_at
             )
             notifications.append(notification)
         
         if notifications:
             db.add_all(notifications)
+            GeofenceStatsService.record_notifications(db, notifications)
             db.commit()
         
         return notifications
     
+    @staticmethod
+    def _previous_ping(
+        db: Session,
+        asset_id: UUID,
+        longitude: float,
+        latitude: float
+    ) -> Tuple[Optional[Tuple[float, float, datetime, Optional[float]]], datetime, Optional[float]]:
+        """
+        ((lon, lat, recorded_at, altitude) of the ping before this one, time of this ping, altitude
+        of this ping). When the location update already stored this ping, its trajectory row
+        supplies the time and altitude; otherwise the asset's latest recorded altitude is used.
+        """
+        rows = db.query(
+            AssetTrajectory.location, AssetTrajectory.recorded_at, AssetTrajectory.altitude_meters
+        ).filter(
+            AssetTrajectory.asset_id == asset_id
+        ).order_by(AssetTrajectory.recorded_at.desc()).limit(2).all()
+        
+        current_at = datetime.utcnow()
+        current_altitude = rows[0][2] if rows else None
+        for location, recorded_at, altitude in rows:
+            previous = to_shape(location)
+            recorded_at = _naive_utc(recorded_at)
+            if abs(previous.x - longitude) < 1e-9 and abs(previous.y - latitude) < 1e-9:
+                current_at = recorded_at
+                continue
+            return (previous.x, previous.y, recorded_at, altitude), current_at, current_altitude
+        return None, current_at, current_altitude
+    
+    @staticmethod
+    def _crossing_events(
+        db: Session,
+        index: Optional[GeofenceIndex],
+        asset_id: UUID,
+        previous: Tuple[float, float, datetime, Optional[float]],
+        current: Tuple[float, float, Optional[float]],
+        current_at: datetime
+    ) -> List[Notification]:
+        """
+        Enter/exit notifications for fence boundaries crossed on the straight path between two
+        pings, at altitudes (interpolated linearly between the pings) inside the fence's band
+        """
+        previous_lon, previous_lat, previous_at, previous_altitude = previous
+        current_lon, current_lat, current_altitude = current
+        segment = LineString([(previous_lon, previous_lat), (current_lon, current_lat)])
+        if previous_altitude is None or current_altitude is None:
+            previous_altitude = current_altitude = None
+        low = None if current_altitude is None else min(previous_altitude, current_altitude)
+        high = None if current_altitude is None else max(previous_altitude, current_altitude)
+        
+        if index is None:
+            segment_wkb = from_shape(segment, srid=4326)
+            circular = Geofence.geofence_type == "circular"
+            # && is the GiST bounding-box prefilter; the exact boundary test runs only on its hits
+            fences = [
+                (
+                    row.id, row.name, to_shape(row.geometry),
+                    row.radius_meters if row.geofence_type == "circular" else None,
+                    row.altitude_min_meters, row.altitude_max_meters
+                )
+                for row in db.query(
+                    Geofence.id, Geofence.name, Geofence.geometry, Geofence.geofence_type, Geofence.radius_meters,
+                    Geofence.altitude_min_meters, Geofence.altitude_max_meters
+                ).filter(
+                    Geofence.status == "active",
+                    NotificationService._band_overlaps(low, high),
+                    or_(
+                        and_(
+                            ~circular,
+                            Geofence.geometry.op("&&")(segment_wkb),
+                            func.ST_Intersects(func.ST_Boundary(Geofence.geometry), segment_wkb)
+                        ),
+                        and_(
+                            circular,
+                            GeofenceService.bbox_intersects(*segment.bounds),
+                            func.ST_DWithin(
+                                func.geography(Geofence.geometry), func.ST_GeogFromText(segment.wkt), Geofence.radius_meters
+                            )
+                        )
+                    )
+                ).all()
+            ]
+        else:
+            fences = [
+                (g.id, g.name, g.geometry, g.radius_meters, g.altitude_min_meters, g.altitude_max_meters)
+                for g in index.crossed_by(segment, low, high)
+            ]
+        
+        elapsed = current_at - previous_at
+        events = []
+        for geofence_id, geofence_name, geometry, radius_meters, altitude_min, altitude_max in fences:
+            for event_type, fraction in fence_crossings(geometry, radius_meters, segment):
+                if current_altitude is not None:
+                    crossing_altitude = previous_altitude + (current_altitude - previous_altitude) * fraction
+                    if (altitude_min is not None and crossing_altitude < altitude_min) or (
+                        altitude_max is not None and crossing_altitude > altitude_max
+                    ):
+                        continue
+                crossing = segment.interpolate(fraction, normalized=True)
+                triggered_at = previous_at + elapsed * fraction
+                events.append(Notification(
+                    notification_type=event_type,
+                    severity="high" if event_type == "enter" else "medium",
+                    title=f"Asset {'entered' if event_type == 'enter' else 'exited'} {geofence_name}",
+                    message=f"Boundary crossed at {triggered_at.isoformat(timespec='seconds')}Z between pings",
+                    location=from_shape(crossing, srid=4326),
+                    distance_meters=0.0,
+                    geofence_id=geofence_id,
+                    asset_id=asset_id,
+                    triggered_at=triggered_at
+                ))
+        events.sort(key=lambda n: n.triggered_at)
+        return events
+    
+    @staticmethod
+    def _band_overlaps(low: Optional[float], high: Optional[float]):
+        """SQL predicate: the geofence's altitude band overlaps [low, high] (always true for an unknown altitude)"""
+        if low is None or high is None:
+            return true()
+        return and_(
+            or_(Geofence.altitude_min_meters.is_(None), Geofence.altitude_min_meters <= high),
+            or_(Geofence.altitude_max_meters.is_(None), Geofence.altitude_max_meters >= low)
+        )
+    
+    @staticmethod
+    def _circle_window_degrees(latitude: float) -> float:
+        """
+        Half-width, in degrees, of the box searched for circular geofences: twice the largest
+        allowed radius, so any circle outside it is at least MAX_CIRCLE_RADIUS_METERS away
+        """
+        meters_per_degree = METERS_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01)
+        return 2 * settings.MAX_CIRCLE_RADIUS_METERS / meters_per_degree
+    
+    @staticmethod
+    def _evaluate_postgis(
+        db: Session,
+        point_wkb,
+        longitude: float,
+        latitude: float,
+        altitude: Optional[float] = None,
+        top: Optional[int] = None
+    ) -> Tuple[List[Tuple[UUID, str, float, int]], float, Optional[Tuple[float, float]]]:
+        """
+        Intersecting geofences with geodesic distances and priorities, the distance to the nearest
+        fence boundary, and the altitude range over which the result holds. Rows come from the
+        GiST bounding-box match; the band test is a CASE guard, so out-of-band fences never reach
+        ST_Intersects. Circular geofences are tested by distance from their center (stored as the
+        geometry), tiled polygons through geofence_tiles.
+        
+        With `top`, only the `top` highest-priority matches are fetched (ORDER BY priority LIMIT),
+        without the boundary distances; the safe radius is then 0, so the result is not cached.
+        """
+        point_geography = func.geography(func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326))
+        circular = Geofence.geofence_type == "circular"
+        geometry_distance = func.ST_Distance(func.geography(Geofence.geometry), point_geography)  # To the center if circular
+        distance = case(
+            (circular, func.greatest(geometry_distance - Geofence.radius_meters, 0.0)),
+            else_=geometry_distance
+        )
+        in_band = NotificationService._band_overlaps(altitude, altitude)
+        # Tiled polygons are measured to their nearest tile (the one holding the point, if any)
+        # rather than to the whole boundary: the tile boundary, cut edges included, is never
+        # further away, and its degree distance scaled east-west is a lower bound in meters
+        tile_boundary_degrees = db.query(
+            func.ST_Distance(func.ST_Boundary(GeofenceTile.geometry), point_wkb)
+        ).filter(
+            GeofenceTile.geofence_id == Geofence.id
+        ).order_by(GeofenceTile.geometry.op("<->")(point_wkb)).limit(1).scalar_subquery()
+        east_west_meters_per_degree = METERS_PER_DEGREE * math.cos(math.radians(latitude))
+        boundary_distance = case(
+            (circular, func.abs(geometry_distance - Geofence.radius_meters)),
+            (and_(in_band, Geofence.tiled), tile_boundary_degrees * east_west_meters_per_degree),
+            (in_band, func.ST_Distance(func.geography(func.ST_Boundary(Geofence.geometry)), point_geography))
+        )
+        # Large polygons are tested through whichever of their tiles' bounding boxes hold the point
+        in_tile = db.query(GeofenceTile.id).filter(
+            GeofenceTile.geofence_id == Geofence.id,
+            GeofenceTile.geometry.op("&&")(point_wkb),
+            func.ST_Intersects(GeofenceTile.geometry, point_wkb)
+        ).exists()
+        contains = case(
+            (circular, geometry_distance <= Geofence.radius_meters),
+            (Geofence.tiled, in_tile),
+            else_=func.ST_Intersects(Geofence.geometry, point_wkb)
+        )
+        window = func.ST_Expand(point_wkb, NotificationService._circle_window_degrees(latitude))
+        candidates = or_(Geofence.geometry.op("&&")(point_wkb), and_(circular, Geofence.geometry.op("&&")(window)))
+        if top is not None:
+            rows = db.query(Geofence.id, Geofence.name, distance, Geofence.priority).filter(
+                candidates,
+                Geofence.status == "active",
+                in_band,
+                contains
+            ).order_by(Geofence.priority.desc(), Geofence.id).limit(top).all()
+            return [(row[0], row[1], float(row[2]), row[3]) for row in rows], 0.0, None
+        
+        rows = db.query(
+            Geofence.id,
+            Geofence.name,
+            case((in_band, distance)),
+            boundary_distance,
+            case((in_band, contains), else_=False),
+            Geofence.altitude_min_meters,
+            Geofence.altitude_max_meters,
+            Geofence.priority
+        ).filter(
+            candidates,
+            Geofence.status == "active"
+        ).all()
+        
+        # Nearest polygon that does not contain the point (GiST KNN, ranked in degrees). Its degree
+        # distance scaled by the shorter, east-west, meters-per-degree is a lower bound in meters,
+        # as in the in-process index; a geodesic distance on a degree-ranked row could overshoot.
+        outside_degrees = db.query(func.ST_Distance(Geofence.geometry, point_wkb)).filter(
+            Geofence.status == "active",
+            ~circular,
+            ~func.ST_Intersects(Geofence.geometry, point_wkb)
+        ).order_by(Geofence.geometry.op("<->")(point_wkb)).limit(1).scalar()
+        
+        # Circles beyond the search window are further away than the largest radius
+        radii = [row[3] for row in rows] + [settings.MAX_CIRCLE_RADIUS_METERS]
+        if outside_degrees is not None:
+            radii.append(float(outside_degrees) * east_west_meters_per_degree)
+        safe_radius = min((float(r) for r in radii if r is not None), default=math.inf)
+        altitude_range = None
+        if altitude is not None:
+            edges = np.array(
+                [-math.inf if row[5] is None else row[5] for row in rows]
+                + [math.inf if row[6] is None else row[6] for row in rows],
+                dtype=float
+            )
+            altitude_range = altitude_stable_range(edges, altitude)
+        return [(row[0], row[1], float(row[2]), row[7]) for row in rows if row[4]], safe_radius, altitude_range
+    
+    @staticmethod
+    def _evaluate_inprocess(
+        index: GeofenceIndex,
+        longitude: float,
+        latitude: float,
+        altitude: Optional[float] = None,
+        top: Optional[int] = None
+    ) -> Tuple[List[Tuple[UUID, str, float, int]], float, Optional[Tuple[float, float]]]:
+        """
+        Intersection against this worker's geofence index; no geometry is read from the database.
+        Containing polygons are at distance 0 and are not measured.
+        """
+        matches = [
+            (
+                geofence.id,
+                geofence.name,
+                0.0 if geofence.radius_meters is None else index.distance(geofence, longitude, latitude),
+                geofence.priority
+            )
+            for geofence in index.containing(longitude, latitude, altitude, top)
+        ]
+        altitude_range = None if altitude is None else index.altitude_stable_range(longitude, latitude, altitude)
+        return matches, index.safe_radius(longitude, latitude), altitude_range
+    
     @staticmethod
     def list_notifications(
         db: Session,
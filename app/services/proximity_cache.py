@@ -0,0 +1,135 @@
+"""
+Proximity Cache
+Single Responsibility: Reuse an asset's last proximity result while it stays within its safe radius
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
+
+from app.core.config import get_settings
+from app.core.metrics import record_cache_lookup
+from app.services.geofence_index import great_circle_meters
+
+settings = get_settings()
+
+
+class SafeRadiusEntry:
+    """Where an asset was last evaluated, what matched, and how far it may move before containment can change"""
+
+    __slots__ = (
+        "longitude", "latitude", "radius_meters", "matches", "generation", "altitude", "altitude_range", "top",
+        "evaluated_at"
+    )
+
+    def __init__(
+        self,
+        longitude: float,
+        latitude: float,
+        radius_meters: float,
+        matches: List[Any],
+        generation: int,
+        altitude: Optional[float] = None,
+        altitude_range: Optional[Tuple[float, float]] = None,
+        top: Optional[int] = None
+    ):
+        self.longitude = longitude
+        self.latitude = latitude
+        self.radius_meters = radius_meters
+        self.matches = matches
+        self.generation = generation
+        self.altitude = altitude
+        self.altitude_range = altitude_range  # Open interval in which no altitude band starts or ends
+        self.top = top  # Matches hold only the `top` highest-priority fences; None when complete
+        self.evaluated_at = time.monotonic()
+
+    def answers(self, top: Optional[int]) -> bool:
+        """Whether the matches suffice for a request for the `top` best (None: all of them)"""
+        return self.top is None or (top is not None and top <= self.top)
+
+    def admits_altitude(self, altitude: Optional[float]) -> bool:
+        if altitude is None or self.altitude is None:
+            return altitude is None and self.altitude is None
+        low, high = self.altitude_range
+        return altitude == self.altitude or low < altitude < high
+
+
+class SafeRadiusCache:
+    """
+    Per-process LRU of SafeRadiusEntry by asset. A ping closer to the evaluated point than the
+    distance to the nearest fence boundary, at an altitude inside the entry's altitude range, is
+    answered from the entry. Entries are discarded when geofences change (the generation they
+    were stored under: the index generation, or geofence_version under PostGIS, so changes made
+    by other workers count) and after SAFE_RADIUS_MAX_AGE_SECONDS.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[UUID, SafeRadiusEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(
+        self,
+        asset_id: UUID,
+        longitude: float,
+        latitude: float,
+        generation: int,
+        altitude: Optional[float] = None,
+        previous: Optional[Tuple[float, float]] = None,
+        top: Optional[int] = None
+    ) -> Optional[List[Any]]:
+        """
+        Cached matches, or None when the point must be evaluated. With `previous` (the prior
+        ping) both ends must lie inside the radius, so the path between them crossed no boundary.
+        A request for the `top` matches can be answered by an entry holding at least that many.
+        """
+        if self.max_entries <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(asset_id)
+            if entry is not None:
+                self._entries.move_to_end(asset_id)
+
+        hit = (
+            entry is not None
+            and entry.generation == generation
+            and time.monotonic() - entry.evaluated_at < settings.SAFE_RADIUS_MAX_AGE_SECONDS
+            and entry.answers(top)
+            and entry.admits_altitude(altitude)
+            and great_circle_meters(entry.longitude, entry.latitude, longitude, latitude) < entry.radius_meters
+            and (previous is None or great_circle_meters(
+                entry.longitude, entry.latitude, previous[0], previous[1]
+            ) < entry.radius_meters)
+        )
+        record_cache_lookup("safe_radius", hit)
+        return entry.matches if hit else None
+
+    def store(
+        self,
+        asset_id: UUID,
+        longitude: float,
+        latitude: float,
+        radius_meters: float,
+        matches: List[Any],
+        generation: int,
+        altitude: Optional[float] = None,
+        altitude_range: Optional[Tuple[float, float]] = None,
+        top: Optional[int] = None
+    ) -> None:
+        if self.max_entries <= 0 or not radius_meters > 0 or math.isnan(radius_meters):
+            return
+        entry = SafeRadiusEntry(longitude, latitude, radius_meters, matches, generation, altitude, altitude_range, top)
+        with self._lock:
+            self._entries[asset_id] = entry
+            self._entries.move_to_end(asset_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+safe_radius_cache = SafeRadiusCache(settings.SAFE_RADIUS_CACHE_SIZE)
@@ -0,0 +1,112 @@
+"""
+Recommendation Cache
+Single Responsibility: Reuse recent AI recommendations for identical requests
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import exists
+from typing import Any, Dict, Optional
+from uuid import UUID
+from datetime import datetime, timedelta, timezone
+import hashlib
+import json
+from app.models.ai_service import AIRecommendation
+from app.models.asset import Asset, AssetPosition
+from app.models.geofence import Geofence
+from app.models.geofence_stats import GeofenceStats
+from app.core.config import get_settings
+from app.core.metrics import record_cache_lookup
+
+settings = get_settings()
+
+# Entities whose updated_at invalidates cached recommendations about them
+_ENTITY_MODELS = {
+    "geofence": Geofence,
+    "asset": Asset,
+}
+
+# Rows whose later change also stales an entity's recommendations, though the entity's own
+# updated_at does not move: (column referencing the entity, time of the change)
+_DEPENDENT_CHANGES = {
+    "geofence": [(GeofenceStats.geofence_id, GeofenceStats.updated_at)],
+    "asset": [(AssetPosition.asset_id, AssetPosition.recorded_at)],
+}
+
+
+class RecommendationCache:
+    """
+    Cache backed by the ai_recommendations table.
+    A stored recommendation is reused when its context hash matches, it is younger than
+    AI_RECOMMENDATION_CACHE_TTL_SECONDS and neither the referenced geofence/asset nor what
+    its prompt draws on (geofence stats, the asset's position) has changed since it was generated.
+    """
+    
+    @staticmethod
+    def context_hash(
+        entity_type: str,
+        entity_id: str,
+        recommendation_type: str,
+        context: Dict[str, Any]
+    ) -> str:
+        """Stable hash of the request; key order and whitespace do not matter"""
+        canonical = json.dumps(
+            {
+                "entity_type": entity_type,
+                "entity_id": str(entity_id),
+                "recommendation_type": recommendation_type,
+                "context": context or {}
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+    
+    @staticmethod
+    def enabled() -> bool:
+        return settings.AI_RECOMMENDATION_CACHE_TTL_SECONDS > 0
+    
+    @staticmethod
+    def lookup(db: Session, entity_type: str, entity_id: str, context_hash: str) -> Optional[AIRecommendation]:
+        """Return a fresh cached recommendation, or None"""
+        if not RecommendationCache.enabled():
+            return None
+        
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.AI_RECOMMENDATION_CACHE_TTL_SECONDS)
+        query = db.query(AIRecommendation).filter(
+            AIRecommendation.context_hash == context_hash,
+            AIRecommendation.created_at >= cutoff
+        )
+        
+        model = _ENTITY_MODELS.get(entity_type)
+        if model is not None:
+            try:
+                entity_uuid = UUID(str(entity_id))
+            except ValueError:
+                entity_uuid = None
+            if entity_uuid is not None:
+                # Invalidate on change: the entity must not have been updated after generation
+                query = query.filter(exists().where(
+                    model.id == entity_uuid,
+                    model.updated_at <= AIRecommendation.created_at
+                ))
+                for entity_column, changed_at in _DEPENDENT_CHANGES.get(entity_type, ()):
+                    query = query.filter(~exists().where(
+                        entity_column == entity_uuid,
+                        changed_at > AIRecommendation.created_at
+                    ))
+        
+        recommendation = query.order_by(AIRecommendation.created_at.desc()).first()
+        record_cache_lookup("ai_recommendation", recommendation is not None)
+        return recommendation
+    
+    @staticmethod
+    def invalidate(db: Session, entity_type: str, entity_id: str) -> None:
+        """
+        Make an entity's stored recommendations ineligible for reuse, for changes that do not
+        bump the entity's updated_at (e.g. its zones). Runs in the caller's transaction.
+        """
+        db.query(AIRecommendation).filter(
+            AIRecommendation.entity_type == entity_type,
+            AIRecommendation.entity_id == str(entity_id),
+            AIRecommendation.context_hash.isnot(None)
+        ).update({AIRecommendation.context_hash: None}, synchronize_session=False)
@@ -0,0 +1,252 @@
+"""
+Recommendation Jobs
+Single Responsibility: Queue AI recommendation generation off the request path
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_
+from typing import Dict, List, Optional
+from uuid import UUID
+from datetime import datetime, timedelta, timezone
+import asyncio
+import logging
+from anyio import from_thread
+from starlette.concurrency import run_in_threadpool
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.models.ai_service import AIRecommendation, AIRecommendationJob
+from app.services.ai_service import AIService
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class RecommendationJobService:
+    """Create, run and inspect recommendation jobs"""
+
+    @staticmethod
+    def create_job(
+        db: Session,
+        entity_type: str,
+        entity_ids: List[str],
+        recommendation_type: str,
+        user_id: UUID
+    ) -> AIRecommendationJob:
+        """Store a queued job; the caller dispatches it"""
+        job = AIRecommendationJob(
+            status="queued",
+            entity_type=entity_type,
+            entity_ids=list(dict.fromkeys(str(e) for e in entity_ids)),
+            recommendation_type=recommendation_type,
+            user_id=user_id
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    def get_job(db: Session, job_id: UUID) -> Optional[AIRecommendationJob]:
+        """Get job by ID"""
+        return db.query(AIRecommendationJob).filter(AIRecommendationJob.id == job_id).first()
+
+    @staticmethod
+    def get_job_recommendations(db: Session, job: AIRecommendationJob) -> List[AIRecommendation]:
+        """Recommendations produced by a completed job, in entity order"""
+        if not job.recommendation_ids:
+            return []
+        ids = [UUID(job.recommendation_ids[e]) for e in job.entity_ids if e in job.recommendation_ids]
+        by_id = {
+            r.id: r for r in db.query(AIRecommendation).filter(AIRecommendation.id.in_(ids)).all()
+        }
+        return [by_id[i] for i in ids if i in by_id]
+
+    @staticmethod
+    def _claimable(now: datetime):
+        """Filter expression: queued, or running past its lease (the worker running it is presumed gone)"""
+        return or_(
+            AIRecommendationJob.status == "queued",
+            and_(
+                AIRecommendationJob.status == "running",
+                AIRecommendationJob.started_at < now - timedelta(seconds=settings.AI_JOB_LEASE_SECONDS)
+            )
+        )
+
+    @staticmethod
+    def list_unfinished_job_ids(db: Session) -> List[UUID]:
+        """Jobs that are queued or whose run was abandoned"""
+        rows = db.query(AIRecommendationJob.id).filter(
+            RecommendationJobService._claimable(datetime.now(timezone.utc))
+        ).order_by(AIRecommendationJob.created_at).all()
+        return [row.id for row in rows]
+
+    @staticmethod
+    def claim_jobs(db: Session, job_ids: List[UUID]) -> List[AIRecommendationJob]:
+        """
+        Mark claimable jobs as running and return them. Each claim is a conditional UPDATE, so
+        when the same job is dispatched twice only one worker gets it.
+        """
+        now = datetime.now(timezone.utc)
+        claimed = []
+        for job_id in job_ids:
+            rowcount = db.query(AIRecommendationJob).filter(
+                AIRecommendationJob.id == job_id,
+                RecommendationJobService._claimable(now)
+            ).update({
+                AIRecommendationJob.status: "running",
+                AIRecommendationJob.started_at: now
+            }, synchronize_session=False)
+            if rowcount == 1:
+                claimed.append(job_id)
+        db.commit()
+        if not claimed:
+            return []
+        return db.query(AIRecommendationJob).filter(AIRecommendationJob.id.in_(claimed)).all()
+
+    @staticmethod
+    def run_jobs(job_ids: List[UUID]) -> None:
+        """
+        Execute jobs on a dedicated session. Jobs for the same entity and recommendation type
+        are generated together, AI_JOB_BATCH_SIZE entities per prompt.
+        """
+        db = SessionLocal()
+        try:
+            jobs = RecommendationJobService.claim_jobs(db, job_ids)
+            if not jobs:
+                return
+
+            groups: Dict[tuple, List[AIRecommendationJob]] = {}
+            for job in jobs:
+                groups.setdefault((job.entity_type, job.recommendation_type), []).append(job)
+
+            for (entity_type, recommendation_type), group in groups.items():
+                RecommendationJobService._run_group(db, entity_type, recommendation_type, group)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _run_group(
+        db: Session,
+        entity_type: str,
+        recommendation_type: str,
+        jobs: List[AIRecommendationJob]
+    ) -> None:
+        entity_ids = list(dict.fromkeys(e for job in jobs for e in job.entity_ids))
+        batch_size = max(1, settings.AI_JOB_BATCH_SIZE)
+        results: Dict[str, AIRecommendation] = {}
+        try:
+            for i in range(0, len(entity_ids), batch_size):
+                results.update(AIService.generate_recommendations_batch(
+                    db, entity_type, entity_ids[i:i + batch_size], recommendation_type, {}
+                ))
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Recommendation jobs failed for {entity_type}/{recommendation_type}: {e}")
+            for job in jobs:
+                job.status = "failed"
+                job.error = str(e)
+                job.completed_at = datetime.now(timezone.utc)
+            db.commit()
+            return
+
+        for job in jobs:
+            job.recommendation_ids = {e: str(results[e].id) for e in job.entity_ids if e in results}
+            job.status = "completed"
+            job.completed_at = datetime.now(timezone.utc)
+        db.commit()
+
+
+class InProcessJobQueue:
+    """
+    asyncio worker pool inside the API process for single-node deployments.
+    Each worker drains whatever is queued (up to AI_JOB_BATCH_SIZE jobs) and runs it in
+    the threadpool, so concurrent submissions share prompts.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._workers: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self, worker_count: int) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"recommendation-worker-{i}")
+            for i in range(max(1, worker_count))
+        ]
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def submit(self, job_id: UUID) -> None:
+        """
+        Queue a job, from the event loop or from a threadpool thread (sync routes): the queue
+        is only touched on the loop the workers run on
+        """
+        if not self.running:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                from_thread.run_sync(self.start, settings.AI_JOB_WORKERS)
+            else:
+                self.start(settings.AI_JOB_WORKERS)
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job_ids = [await self._queue.get()]
+            while len(job_ids) < settings.AI_JOB_BATCH_SIZE and not self._queue.empty():
+                job_ids.append(self._queue.get_nowait())
+            try:
+                await run_in_threadpool(RecommendationJobService.run_jobs, job_ids)
+            except Exception as e:
+                logger.error(f"Recommendation worker error: {e}")
+            finally:
+                for _ in job_ids:
+                    self._queue.task_done()
+
+
+job_queue = InProcessJobQueue()
+
+
+def dispatch_job(job_id: UUID) -> None:
+    """Hand a stored job to the configured backend"""
+    if settings.AI_JOB_BACKEND == "celery":
+        from app.worker import run_recommendation_jobs
+        run_recommendation_jobs.delay([str(job_id)])
+    else:
+        job_queue.submit(job_id)
+
+
+async def start_job_workers() -> None:
+    """Start in-process workers and requeue jobs that are queued or past their lease"""
+    if settings.AI_JOB_BACKEND == "celery":
+        return
+    job_queue.start(settings.AI_JOB_WORKERS)
+    if SessionLocal is None:
+        return
+
+    db = SessionLocal()
+    try:
+        unfinished = await run_in_threadpool(RecommendationJobService.list_unfinished_job_ids, db)
+    except Exception as e:
+        logger.warning(f"Could not requeue unfinished recommendation jobs: {e}")
+        unfinished = []
+    finally:
+        db.close()
+    for job_id in unfinished:
+        job_queue.submit(job_id)
+
+
+async def stop_job_workers() -> None:
+    await job_queue.stop()
@@ -8,6 +8,7 @@ from uuid import UUID
 import json
 from app.models.zone import Zone
 from app.schemas.zone import ZoneCreate, ZoneUpdate
+from app.services.recommendation_cache import RecommendationCache
 
 
 class ZoneService:
@@ -26,6 +27,7 @@ class ZoneService:
         )
         
         db.add(zone)
+        RecommendationCache.invalidate(db, "geofence", zone.geofence_id)
         db.commit()
         db.refresh(zone)
         return zone
@@ -75,6 +77,7 @@ class ZoneService:
         if zone_data.rules is not None:
             zone.rules = json.dumps(zone_data.rules)
         
+        RecommendationCache.invalidate(db, "geofence", zone.geofence_id)
         db.commit()
         db.refresh(zone)
         return zone
@@ -87,6 +90,7 @@ class ZoneService:
             return False
         
         db.delete(zone)
+        RecommendationCache.invalidate(db, "geofence", zone.geofence_id)
         db.commit()
         return True
 
@@ -0,0 +1,30 @@
+"""
+Celery worker
+Background task entry point for AI_JOB_BACKEND=celery: celery -A app.worker worker
+"""
+from typing import List
+from uuid import UUID
+from celery import Celery
+from app.core.config import get_settings
+from app.models import import_all_models
+from app.services.recommendation_jobs import RecommendationJobService
+
+settings = get_settings()
+import_all_models()
+
+celery_app = Celery(
+    "geofence_platform",
+    broker=settings.CELERY_BROKER_URL or settings.REDIS_URL
+)
+celery_app.conf.update(
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    task_serializer="json",
+    accept_content=["json"]
+)
+
+
+@celery_app.task(name="ai.run_recommendation_jobs")
+def run_recommendation_jobs(job_ids: List[str]) -> None:
+    """Generate recommendations for queued jobs"""
+    RecommendationJobService.run_jobs([UUID(job_id) for job_id in job_ids])
@@ -0,0 +1,124 @@
+"""
+Import-time budget check
+Imports the application in fresh interpreters with `python -X importtime`, reports the
+median wall time and the slowest modules, and fails when the budget is exceeded or an
+optional heavy dependency is imported eagerly.
+
+Usage:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --budget-ms 1500 --runs 7 --output import_time.json
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+DEFAULT_MODULE = "app.main"
+DEFAULT_BUDGET_MS = 2000.0
+
+# Dependencies that must only load when their feature is used
+DEFAULT_FORBIDDEN = ("openai", "langchain", "tiktoken", "celery")
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure application import time against a budget")
+    parser.add_argument("--module", default=DEFAULT_MODULE, help="Module to import")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreter runs (median is reported)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="Maximum median import time in milliseconds")
+    parser.add_argument("--forbid", default=",".join(DEFAULT_FORBIDDEN),
+                        help="Comma-separated top-level packages that must not be imported")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to report")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    return parser.parse_args(argv)
+
+
+def measure_once(module: str) -> Dict[str, Dict[str, int]]:
+    """Import `module` in a new interpreter; returns module -> {self_us, cumulative_us, depth}"""
+    env = dict(os.environ)
+    env.setdefault("USE_SQLITE", "true")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = {
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": len(indent) // 2
+            }
+    return modules
+
+
+def run(args: argparse.Namespace) -> dict:
+    runs = [measure_once(args.module) for _ in range(args.runs)]
+    totals_ms = [sum(m["self_us"] for m in modules.values()) / 1000 for modules in runs]
+    median_index = totals_ms.index(sorted(totals_ms)[len(totals_ms) // 2])
+    median_run = runs[median_index]
+
+    app_modules = {name: m for name, m in median_run.items() if name.split(".")[0] == args.module.split(".")[0]}
+    slowest = sorted(median_run.items(), key=lambda item: -item[1]["self_us"])[:args.top]
+    forbidden = [p.strip() for p in args.forbid.split(",") if p.strip()]
+    loaded_forbidden = sorted({name.split(".")[0] for name in median_run} & set(forbidden))
+
+    median_ms = statistics.median(totals_ms)
+    return {
+        "module": args.module,
+        "runs": args.runs,
+        "python": sys.version.split()[0],
+        "median_ms": round(median_ms, 1),
+        "min_ms": round(min(totals_ms), 1),
+        "max_ms": round(max(totals_ms), 1),
+        "budget_ms": args.budget_ms,
+        "module_count": len(median_run),
+        "app_self_ms": round(sum(m["self_us"] for m in app_modules.values()) / 1000, 1),
+        "slowest_modules": [
+            {"module": name, "self_ms": round(m["self_us"] / 1000, 1), "cumulative_ms": round(m["cumulative_us"] / 1000, 1)}
+            for name, m in slowest
+        ],
+        "forbidden_imported": loaded_forbidden,
+        "passed": median_ms <= args.budget_ms and not loaded_forbidden
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    report = run(args)
+
+    print(f"{report['module']}: median {report['median_ms']}ms "
+          f"(min {report['min_ms']}ms, max {report['max_ms']}ms, {report['runs']} runs, "
+          f"{report['module_count']} modules, {report['app_self_ms']}ms in application code)")
+    for entry in report["slowest_modules"]:
+        print(f"  {entry['self_ms']:>8.1f}ms self {entry['cumulative_ms']:>8.1f}ms cumulative  {entry['module']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+
+    if report["forbidden_imported"]:
+        print(f"FAIL: optional dependencies imported eagerly: {', '.join(report['forbidden_imported'])}")
+    if report["median_ms"] > args.budget_ms:
+        print(f"FAIL: median import time {report['median_ms']}ms exceeds budget {args.budget_ms}ms")
+    if report["passed"]:
+        print(f"OK: within {args.budget_ms}ms budget")
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
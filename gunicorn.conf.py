@@ -0,0 +1,82 @@
+"""
+Gunicorn production configuration
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Reads plain environment variables (not app settings, which must not be cached in the
+master before workers fork):
+    WEB_CONCURRENCY            worker processes (default: CPU count)
+    PORT / BIND                listen address (default 0.0.0.0:8000)
+    GRACEFUL_TIMEOUT           seconds a stopping worker gets to finish requests (default 30)
+    DB_MAX_CONNECTIONS         PostgreSQL max_connections; probed once at startup if unset
+    PROMETHEUS_MULTIPROC_DIR   shared metrics directory (default: a temp dir when metrics are on)
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+workers = int(os.environ.get("WEB_CONCURRENCY") or multiprocessing.cpu_count())
+os.environ["WEB_CONCURRENCY"] = str(workers)  # Used by the app to size its connection pool
+
+bind = os.environ.get("BIND") or f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = "app.core.server.UvloopWorker"
+
+# Workers import the app after fork so each gets its own engine and event loop
+preload_app = False
+
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.environ.get("WORKER_TIMEOUT", "60"))
+keepalive = int(os.environ.get("KEEPALIVE", "5"))
+
+# Recycle workers periodically to bound memory growth; jitter avoids simultaneous restarts
+max_requests = int(os.environ.get("MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.environ.get("MAX_REQUESTS_JITTER", "1000"))
+
+accesslog = os.environ.get("ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.environ.get("LOG_LEVEL", "info").lower()
+
+_metrics_enabled = os.environ.get("METRICS_ENABLED", "true").lower() not in ("false", "0", "no")
+if _metrics_enabled and not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="geofence-metrics-")
+
+
+def _probe_max_connections():
+    """Read max_connections from PostgreSQL once, in the master, for pool sizing"""
+    url = os.environ.get("DATABASE_URL", "")
+    if not url.startswith("postgresql") or os.environ.get("USE_SQLITE", "").lower() == "true":
+        return None
+    try:
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.pool import NullPool
+        probe = create_engine(url, poolclass=NullPool)
+        try:
+            with probe.connect() as conn:
+                return int(conn.execute(text("SHOW max_connections")).scalar())
+        finally:
+            probe.dispose()
+    except Exception as e:
+        print(f"WARNING: Could not read max_connections, using DB_POOL_SIZE: {e}")
+        return None
+
+
+def on_starting(server):
+    multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        # Stale files from a previous run would be summed into the new counters
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir, exist_ok=True)
+
+    if not os.environ.get("DB_MAX_CONNECTIONS"):
+        max_connections = _probe_max_connections()
+        if max_connections:
+            os.environ["DB_MAX_CONNECTIONS"] = str(max_connections)
+    server.log.info(
+        f"Starting {workers} workers; DB_MAX_CONNECTIONS={os.environ.get('DB_MAX_CONNECTIONS', 'unset')}"
+    )
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,66 @@
+"""
+Alembic migration environment
+Migrates the database configured for the application (DATABASE_URL, or SQLite with USE_SQLITE=true)
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from geoalchemy2 import alembic_helpers
+from sqlalchemy import create_engine, pool
+
+from app.core.database import Base, database_url
+from app.models import import_all_models
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+import_all_models()
+target_metadata = Base.metadata
+
+# Tables owned by the PostGIS extensions, never managed by migrations
+POSTGIS_TABLES = {"spatial_ref_sys", "topology", "layer"}
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    if type_ == "table" and name in POSTGIS_TABLES:
+        return False
+    return True
+
+
+def _configure_args(dialect_name: str) -> dict:
+    return {
+        "target_metadata": target_metadata,
+        "include_object": include_object,
+        "render_item": alembic_helpers.render_item,
+        # SQLite cannot ALTER most things in place; batch mode recreates the table
+        "render_as_batch": dialect_name == "sqlite",
+        # SQLite reflects UUID columns as NUMERIC; only compare types where they are meaningful
+        "compare_type": dialect_name != "sqlite"
+    }
+
+
+def run_migrations_offline() -> None:
+    """Emit SQL to stdout (alembic upgrade head --sql)"""
+    context.configure(
+        url=database_url,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        **_configure_args(database_url.split(":", 1)[0].split("+", 1)[0])
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connectable = create_engine(database_url, poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        context.configure(connection=connection, **_configure_args(connection.dialect.name))
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,504 @@
+"""Baseline schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00
+
+The schema previously created by Base.metadata.create_all. Geometry columns are PostGIS
+geometries on PostgreSQL and WKT text on SQLite (see app.models.geometry_utils); GiST
+indexes are PostgreSQL-only. Databases created by create_all can be adopted with
+`alembic stamp 0001`.
+"""
+from alembic import op
+import sqlalchemy as sa
+from geoalchemy2 import Geometry
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+SRID = 4326
+
+# (index, table, column) GiST indexes declared in the models' __table_args__
+SPATIAL_INDEXES = [
+    ("idx_organization_location", "organizations", "headquarters_location"),
+    ("idx_asset_location", "assets", "current_location"),
+    ("idx_geofence_center", "geofences", "center_point"),
+    ("idx_geofence_geometry", "geofences", "geometry"),
+    ("idx_trajectory_location", "asset_trajectories", "location"),
+    ("idx_notification_location", "notifications", "location"),
+]
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def geometry(geometry_type: str):
+    """PostGIS geometry on PostgreSQL, WKT text elsewhere"""
+    if _is_postgres():
+        return Geometry(geometry_type, srid=SRID, spatial_index=False)
+    return sa.Text()
+
+
+def upgrade() -> None:
+    if _is_postgres():
+        op.execute("CREATE EXTENSION IF NOT EXISTS postgis")
+
+    op.create_table('ai_recommendations',
+    sa.Column('recommendation_type', sa.String(length=50), nullable=False),
+    sa.Column('entity_type', sa.String(length=50), nullable=True),
+    sa.Column('entity_id', sa.String(length=36), nullable=True),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('confidence_score', sa.String(length=20), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('recommendation_metadata', sa.JSON(), nullable=True),
+    sa.Column('context_hash', sa.String(length=64), nullable=True),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_ai_recommendation_cache', 'ai_recommendations', ['context_hash', 'created_at'], unique=False)
+    op.create_index(op.f('ix_ai_recommendations_id'), 'ai_recommendations', ['id'], unique=False)
+    op.create_table('organizations',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('code', sa.String(length=20), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('headquarters_location', geometry('POINT'), nullable=True),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_organizations_code'), 'organizations', ['code'], unique=True)
+    op.create_index(op.f('ix_organizations_id'), 'organizations', ['id'], unique=False)
+    op.create_index(op.f('ix_organizations_name'), 'organizations', ['name'], unique=True)
+    op.create_table('permissions',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('resource', sa.String(length=50), nullable=False),
+    sa.Column('action', sa.String(length=50), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_permissions_id'), 'permissions', ['id'], unique=False)
+    op.create_index(op.f('ix_permissions_name'), 'permissions', ['name'], unique=True)
+    op.create_index(op.f('ix_permissions_resource'), 'permissions', ['resource'], unique=False)
+    op.create_table('policies',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('resource_type', sa.String(length=50), nullable=False),
+    sa.Column('conditions', sa.Text(), nullable=True),
+    sa.Column('effect', sa.String(length=10), nullable=False),
+    sa.Column('priority', sa.String(length=20), nullable=True),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_index(op.f('ix_policies_id'), 'policies', ['id'], unique=False)
+    op.create_table('roles',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('is_system', sa.String(length=20), nullable=True),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_roles_id'), 'roles', ['id'], unique=False)
+    op.create_index(op.f('ix_roles_name'), 'roles', ['name'], unique=True)
+    op.create_table('users',
+    sa.Column('username', sa.String(length=50), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('password_hash', sa.String(length=255), nullable=False),
+    sa.Column('full_name', sa.String(length=100), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('last_login', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_index(op.f('ix_users_is_active'), 'users', ['is_active'], unique=False)
+    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+    op.create_table('ai_conversations',
+    sa.Column('title', sa.String(length=200), nullable=True),
+    sa.Column('context_type', sa.String(length=50), nullable=True),
+    sa.Column('context_id', sa.String(length=36), nullable=True),
+    sa.Column('summary', sa.Text(), nullable=True),
+    sa.Column('summarized_message_count', sa.Integer(), nullable=False),
+    sa.Column('last_sequence', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_ai_conversations_id'), 'ai_conversations', ['id'], unique=False)
+    op.create_index(op.f('ix_ai_conversations_user_id'), 'ai_conversations', ['user_id'], unique=False)
+    op.create_table('ai_recommendation_jobs',
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('entity_type', sa.String(length=50), nullable=False),
+    sa.Column('entity_ids', sa.JSON(), nullable=False),
+    sa.Column('recommendation_type', sa.String(length=50), nullable=False),
+    sa.Column('recommendation_ids', sa.JSON(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_ai_recommendation_jobs_id'), 'ai_recommendation_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_ai_recommendation_jobs_status'), 'ai_recommendation_jobs', ['status'], unique=False)
+    op.create_index(op.f('ix_ai_recommendation_jobs_user_id'), 'ai_recommendation_jobs', ['user_id'], unique=False)
+    op.create_table('api_keys',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('key_prefix', sa.String(length=8), nullable=False),
+    sa.Column('key_hash', sa.String(length=64), nullable=False),
+    sa.Column('organization_id', sa.UUID(), nullable=False),
+    sa.Column('created_by_id', sa.UUID(), nullable=True),
+    sa.Column('scopes', sa.JSON(), nullable=False),
+    sa.Column('rate_limit_per_minute', sa.String(length=20), nullable=True),
+    sa.Column('rate_limit_per_day', sa.String(length=20), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_used_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('usage_count', sa.String(length=20), nullable=True),
+    sa.Column('allowed_ips', sa.JSON(), nullable=True),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.ForeignKeyConstraint(['created_by_id'], ['users.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('key_hash')
+    )
+    op.create_index(op.f('ix_api_keys_created_by_id'), 'api_keys', ['created_by_id'], unique=False)
+    op.create_index(op.f('ix_api_keys_id'), 'api_keys', ['id'], unique=False)
+    op.create_index(op.f('ix_api_keys_is_active'), 'api_keys', ['is_active'], unique=False)
+    op.create_index(op.f('ix_api_keys_key_prefix'), 'api_keys', ['key_prefix'], unique=False)
+    op.create_index(op.f('ix_api_keys_name'), 'api_keys', ['name'], unique=False)
+    op.create_index(op.f('ix_api_keys_organization_id'), 'api_keys', ['organization_id'], unique=False)
+    op.create_table('assets',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('asset_type', sa.String(length=50), nullable=False),
+    sa.Column('identifier', sa.String(length=100), nullable=False),
+    sa.Column('current_location', geometry('POINT'), nullable=True),
+    sa.Column('altitude_meters', sa.Float(), nullable=True),
+    sa.Column('heading_degrees', sa.Float(), nullable=True),
+    sa.Column('speed_mps', sa.Float(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('last_seen', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('owner_id', sa.UUID(), nullable=True),
+    sa.Column('organization_id', sa.UUID(), nullable=True),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_assets_id'), 'assets', ['id'], unique=False)
+    op.create_index(op.f('ix_assets_identifier'), 'assets', ['identifier'], unique=True)
+    op.create_index(op.f('ix_assets_last_seen'), 'assets', ['last_seen'], unique=False)
+    op.create_index(op.f('ix_assets_name'), 'assets', ['name'], unique=False)
+    op.create_index(op.f('ix_assets_organization_id'), 'assets', ['organization_id'], unique=False)
+    op.create_index(op.f('ix_assets_owner_id'), 'assets', ['owner_id'], unique=False)
+    op.create_index(op.f('ix_assets_status'), 'assets', ['status'], unique=False)
+    op.create_table('geofences',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('geometry', geometry('GEOMETRY'), nullable=False),
+    sa.Column('center_point', geometry('POINT'), nullable=False),
+    sa.Column('altitude_min_meters', sa.Float(), nullable=True),
+    sa.Column('altitude_max_meters', sa.Float(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('priority', sa.String(length=20), nullable=True),
+    sa.Column('organization_id', sa.UUID(), nullable=True),
+    sa.Column('created_by_id', sa.UUID(), nullable=True),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.ForeignKeyConstraint(['created_by_id'], ['users.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_geofences_id'), 'geofences', ['id'], unique=False)
+    op.create_index(op.f('ix_geofences_name'), 'geofences', ['name'], unique=False)
+    op.create_index(op.f('ix_geofences_organization_id'), 'geofences', ['organization_id'], unique=False)
+    op.create_index(op.f('ix_geofences_status'), 'geofences', ['status'], unique=False)
+    op.create_table('role_permission',
+    sa.Column('role_id', sa.UUID(), nullable=False),
+    sa.Column('permission_id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['permission_id'], ['permissions.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['role_id'], ['roles.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('role_id', 'permission_id')
+    )
+    op.create_table('role_policies',
+    sa.Column('role_id', sa.UUID(), nullable=False),
+    sa.Column('policy_id', sa.UUID(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.ForeignKeyConstraint(['policy_id'], ['policies.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['role_id'], ['roles.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('role_id', 'policy_id', name='uq_role_policy')
+    )
+    op.create_index(op.f('ix_role_policies_id'), 'role_policies', ['id'], unique=False)
+    op.create_index(op.f('ix_role_policies_policy_id'), 'role_policies', ['policy_id'], unique=False)
+    op.create_index(op.f('ix_role_policies_role_id'), 'role_policies', ['role_id'], unique=False)
+    op.create_table('user_roles',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('role_id', sa.UUID(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.ForeignKeyConstraint(['role_id'], ['roles.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'role_id', name='uq_user_role')
+    )
+    op.create_index(op.f('ix_user_roles_id'), 'user_roles', ['id'], unique=False)
+    op.create_index(op.f('ix_user_roles_role_id'), 'user_roles', ['role_id'], unique=False)
+    op.create_index(op.f('ix_user_roles_user_id'), 'user_roles', ['user_id'], unique=False)
+    op.create_table('ai_messages',
+    sa.Column('conversation_id', sa.UUID(), nullable=False),
+    sa.Column('sequence', sa.Integer(), nullable=False),
+    sa.Column('role', sa.String(length=20), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('message_metadata', sa.JSON(), nullable=True),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.ForeignKeyConstraint(['conversation_id'], ['ai_conversations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_ai_message_sequence', 'ai_messages', ['conversation_id', 'sequence'], unique=True)
+    op.create_index(op.f('ix_ai_messages_conversation_id'), 'ai_messages', ['conversation_id'], unique=False)
+    op.create_index(op.f('ix_ai_messages_id'), 'ai_messages', ['id'], unique=False)
+    op.create_table('asset_trajectories',
+    sa.Column('asset_id', sa.UUID(), nullable=False),
+    sa.Column('location', geometry('POINT'), nullable=False),
+    sa.Column('altitude_meters', sa.Float(), nullable=True),
+    sa.Column('heading_degrees', sa.Float(), nullable=True),
+    sa.Column('speed_mps', sa.Float(), nullable=True),
+    sa.Column('recorded_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.ForeignKeyConstraint(['asset_id'], ['assets.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_trajectory_time', 'asset_trajectories', ['recorded_at'], unique=False)
+    op.create_index(op.f('ix_asset_trajectories_asset_id'), 'asset_trajectories', ['asset_id'], unique=False)
+    op.create_index(op.f('ix_asset_trajectories_id'), 'asset_trajectories', ['id'], unique=False)
+    op.create_index(op.f('ix_asset_trajectories_recorded_at'), 'asset_trajectories', ['recorded_at'], unique=False)
+    op.create_table('geofence_access',
+    sa.Column('geofence_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('access_level', sa.String(length=20), nullable=False),
+    sa.Column('granted_by_id', sa.UUID(), nullable=True),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.ForeignKeyConstraint(['geofence_id'], ['geofences.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['granted_by_id'], ['users.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('geofence_id', 'user_id', name='uq_geofence_user_access')
+    )
+    op.create_index(op.f('ix_geofence_access_access_level'), 'geofence_access', ['access_level'], unique=False)
+    op.create_index(op.f('ix_geofence_access_geofence_id'), 'geofence_access', ['geofence_id'], unique=False)
+    op.create_index(op.f('ix_geofence_access_id'), 'geofence_access', ['id'], unique=False)
+    op.create_index(op.f('ix_geofence_access_user_id'), 'geofence_access', ['user_id'], unique=False)
+    op.create_table('geofence_stats',
+    sa.Column('geofence_id', sa.UUID(), nullable=False),
+    sa.Column('event_count', sa.Integer(), nullable=False),
+    sa.Column('breach_count', sa.Integer(), nullable=False),
+    sa.Column('distance_sum_meters', sa.Float(), nullable=False),
+    sa.Column('distance_samples', sa.Integer(), nullable=False),
+    sa.Column('min_distance_meters', sa.Float(), nullable=True),
+    sa.Column('first_event_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_event_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_breach_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.ForeignKeyConstraint(['geofence_id'], ['geofences.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_geofence_stats_geofence_id'), 'geofence_stats', ['geofence_id'], unique=True)
+    op.create_index(op.f('ix_geofence_stats_id'), 'geofence_stats', ['id'], unique=False)
+    op.create_table('geofence_stat_counters',
+    sa.Column('geofence_id', sa.UUID(), nullable=False),
+    sa.Column('dimension', sa.String(length=20), nullable=False),
+    sa.Column('key', sa.String(length=50), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('last_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['geofence_id'], ['geofences.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('geofence_id', 'dimension', 'key')
+    )
+    op.create_index('idx_geofence_stat_counters_recent', 'geofence_stat_counters', ['geofence_id', 'dimension', 'last_at'], unique=False)
+    op.create_table('zones',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('zone_type', sa.String(length=50), nullable=False),
+    sa.Column('priority', sa.String(length=20), nullable=True),
+    sa.Column('geofence_id', sa.UUID(), nullable=False),
+    sa.Column('rules', sa.Text(), nullable=True),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.ForeignKeyConstraint(['geofence_id'], ['geofences.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_zones_geofence_id'), 'zones', ['geofence_id'], unique=False)
+    op.create_index(op.f('ix_zones_id'), 'zones', ['id'], unique=False)
+    op.create_index(op.f('ix_zones_name'), 'zones', ['name'], unique=False)
+    op.create_table('notifications',
+    sa.Column('notification_type', sa.String(length=50), nullable=False),
+    sa.Column('severity', sa.String(length=20), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('message', sa.Text(), nullable=True),
+    sa.Column('location', geometry('POINT'), nullable=True),
+    sa.Column('distance_meters', sa.Float(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('is_read', sa.Boolean(), nullable=True),
+    sa.Column('acknowledged_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('resolved_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('geofence_id', sa.UUID(), nullable=True),
+    sa.Column('zone_id', sa.UUID(), nullable=True),
+    sa.Column('asset_id', sa.UUID(), nullable=True),
+    sa.Column('user_id', sa.UUID(), nullable=True),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.ForeignKeyConstraint(['asset_id'], ['assets.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['geofence_id'], ['geofences.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['zone_id'], ['zones.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_notifications_asset_id'), 'notifications', ['asset_id'], unique=False)
+    op.create_index(op.f('ix_notifications_geofence_id'), 'notifications', ['geofence_id'], unique=False)
+    op.create_index(op.f('ix_notifications_id'), 'notifications', ['id'], unique=False)
+    op.create_index(op.f('ix_notifications_is_read'), 'notifications', ['is_read'], unique=False)
+    op.create_index(op.f('ix_notifications_notification_type'), 'notifications', ['notification_type'], unique=False)
+    op.create_index(op.f('ix_notifications_severity'), 'notifications', ['severity'], unique=False)
+    op.create_index(op.f('ix_notifications_status'), 'notifications', ['status'], unique=False)
+    op.create_index(op.f('ix_notifications_user_id'), 'notifications', ['user_id'], unique=False)
+    op.create_index(op.f('ix_notifications_zone_id'), 'notifications', ['zone_id'], unique=False)
+
+    if _is_postgres():
+        for name, table, column in SPATIAL_INDEXES:
+            op.create_index(name, table, [column], unique=False, postgresql_using="gist")
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_notifications_zone_id'), table_name='notifications')
+    op.drop_index(op.f('ix_notifications_user_id'), table_name='notifications')
+    op.drop_index(op.f('ix_notifications_status'), table_name='notifications')
+    op.drop_index(op.f('ix_notifications_severity'), table_name='notifications')
+    op.drop_index(op.f('ix_notifications_notification_type'), table_name='notifications')
+    op.drop_index(op.f('ix_notifications_is_read'), table_name='notifications')
+    op.drop_index(op.f('ix_notifications_id'), table_name='notifications')
+    op.drop_index(op.f('ix_notifications_geofence_id'), table_name='notifications')
+    op.drop_index(op.f('ix_notifications_asset_id'), table_name='notifications')
+    op.drop_table('notifications')
+    op.drop_index(op.f('ix_zones_name'), table_name='zones')
+    op.drop_index(op.f('ix_zones_id'), table_name='zones')
+    op.drop_index(op.f('ix_zones_geofence_id'), table_name='zones')
+    op.drop_table('zones')
+    op.drop_index('idx_geofence_stat_counters_recent', table_name='geofence_stat_counters')
+    op.drop_table('geofence_stat_counters')
+    op.drop_index(op.f('ix_geofence_stats_id'), table_name='geofence_stats')
+    op.drop_index(op.f('ix_geofence_stats_geofence_id'), table_name='geofence_stats')
+    op.drop_table('geofence_stats')
+    op.drop_index(op.f('ix_geofence_access_user_id'), table_name='geofence_access')
+    op.drop_index(op.f('ix_geofence_access_id'), table_name='geofence_access')
+    op.drop_index(op.f('ix_geofence_access_geofence_id'), table_name='geofence_access')
+    op.drop_index(op.f('ix_geofence_access_access_level'), table_name='geofence_access')
+    op.drop_table('geofence_access')
+    op.drop_index(op.f('ix_asset_trajectories_recorded_at'), table_name='asset_trajectories')
+    op.drop_index(op.f('ix_asset_trajectories_id'), table_name='asset_trajectories')
+    op.drop_index(op.f('ix_asset_trajectories_asset_id'), table_name='asset_trajectories')
+    op.drop_index('idx_trajectory_time', table_name='asset_trajectories')
+    op.drop_table('asset_trajectories')
+    op.drop_index(op.f('ix_ai_messages_id'), table_name='ai_messages')
+    op.drop_index(op.f('ix_ai_messages_conversation_id'), table_name='ai_messages')
+    op.drop_index('idx_ai_message_sequence', table_name='ai_messages')
+    op.drop_table('ai_messages')
+    op.drop_index(op.f('ix_user_roles_user_id'), table_name='user_roles')
+    op.drop_index(op.f('ix_user_roles_role_id'), table_name='user_roles')
+    op.drop_index(op.f('ix_user_roles_id'), table_name='user_roles')
+    op.drop_table('user_roles')
+    op.drop_index(op.f('ix_role_policies_role_id'), table_name='role_policies')
+    op.drop_index(op.f('ix_role_policies_policy_id'), table_name='role_policies')
+    op.drop_index(op.f('ix_role_policies_id'), table_name='role_policies')
+    op.drop_table('role_policies')
+    op.drop_table('role_permission')
+    op.drop_index(op.f('ix_geofences_status'), table_name='geofences')
+    op.drop_index(op.f('ix_geofences_organization_id'), table_name='geofences')
+    op.drop_index(op.f('ix_geofences_name'), table_name='geofences')
+    op.drop_index(op.f('ix_geofences_id'), table_name='geofences')
+    op.drop_table('geofences')
+    op.drop_index(op.f('ix_assets_status'), table_name='assets')
+    op.drop_index(op.f('ix_assets_owner_id'), table_name='assets')
+    op.drop_index(op.f('ix_assets_organization_id'), table_name='assets')
+    op.drop_index(op.f('ix_assets_name'), table_name='assets')
+    op.drop_index(op.f('ix_assets_last_seen'), table_name='assets')
+    op.drop_index(op.f('ix_assets_identifier'), table_name='assets')
+    op.drop_index(op.f('ix_assets_id'), table_name='assets')
+    op.drop_table('assets')
+    op.drop_index(op.f('ix_api_keys_organization_id'), table_name='api_keys')
+    op.drop_index(op.f('ix_api_keys_name'), table_name='api_keys')
+    op.drop_index(op.f('ix_api_keys_key_prefix'), table_name='api_keys')
+    op.drop_index(op.f('ix_api_keys_is_active'), table_name='api_keys')
+    op.drop_index(op.f('ix_api_keys_id'), table_name='api_keys')
+    op.drop_index(op.f('ix_api_keys_created_by_id'), table_name='api_keys')
+    op.drop_table('api_keys')
+    op.drop_index(op.f('ix_ai_recommendation_jobs_user_id'), table_name='ai_recommendation_jobs')
+    op.drop_index(op.f('ix_ai_recommendation_jobs_status'), table_name='ai_recommendation_jobs')
+    op.drop_index(op.f('ix_ai_recommendation_jobs_id'), table_name='ai_recommendation_jobs')
+    op.drop_table('ai_recommendation_jobs')
+    op.drop_index(op.f('ix_ai_conversations_user_id'), table_name='ai_conversations')
+    op.drop_index(op.f('ix_ai_conversations_id'), table_name='ai_conversations')
+    op.drop_table('ai_conversations')
+    op.drop_index(op.f('ix_users_username'), table_name='users')
+    op.drop_index(op.f('ix_users_is_active'), table_name='users')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    op.drop_index(op.f('ix_roles_name'), table_name='roles')
+    op.drop_index(op.f('ix_roles_id'), table_name='roles')
+    op.drop_table('roles')
+    op.drop_index(op.f('ix_policies_id'), table_name='policies')
+    op.drop_table('policies')
+    op.drop_index(op.f('ix_permissions_resource'), table_name='permissions')
+    op.drop_index(op.f('ix_permissions_name'), table_name='permissions')
+    op.drop_index(op.f('ix_permissions_id'), table_name='permissions')
+    op.drop_table('permissions')
+    op.drop_index(op.f('ix_organizations_name'), table_name='organizations')
+    op.drop_index(op.f('ix_organizations_id'), table_name='organizations')
+    op.drop_index(op.f('ix_organizations_code'), table_name='organizations')
+    op.drop_table('organizations')
+    op.drop_index(op.f('ix_ai_recommendations_id'), table_name='ai_recommendations')
+    op.drop_index('idx_ai_recommendation_cache', table_name='ai_recommendations')
+    op.drop_table('ai_recommendations')
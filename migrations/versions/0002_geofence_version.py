@@ -0,0 +1,32 @@
+"""Geofence version counter
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00
+
+Worker index caches compared count(*) and max(updated_at) of geofences to detect changes made
+by other workers, which misses a delete paired with an insert and updates landing within the
+same timestamp. geofence_version holds one row whose counter is bumped in the same transaction
+as every geofence write.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('geofence_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO geofence_version (id, version) VALUES (1, 0)")
+
+
+def downgrade() -> None:
+    op.drop_table('geofence_version')
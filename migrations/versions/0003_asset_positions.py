@@ -0,0 +1,83 @@
+"""Move live telemetry from assets to asset_positions
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00
+
+Location pings used to rewrite the whole assets row (and its indexes). The latest
+position now lives in a narrow asset_positions table keyed by asset_id; existing
+values are copied over before the columns are dropped from assets.
+"""
+from alembic import op
+import sqlalchemy as sa
+from geoalchemy2 import Geometry
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+SRID = 4326
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def geometry(geometry_type: str):
+    """PostGIS geometry on PostgreSQL, WKT text elsewhere"""
+    if _is_postgres():
+        return Geometry(geometry_type, srid=SRID, spatial_index=False)
+    return sa.Text()
+
+
+def upgrade() -> None:
+    op.create_table('asset_positions',
+    sa.Column('asset_id', sa.UUID(), nullable=False),
+    sa.Column('location', geometry('POINT'), nullable=True),
+    sa.Column('altitude_meters', sa.Float(), nullable=True),
+    sa.Column('heading_degrees', sa.Float(), nullable=True),
+    sa.Column('speed_mps', sa.Float(), nullable=True),
+    sa.Column('recorded_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['asset_id'], ['assets.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('asset_id'),
+    postgresql_with={"fillfactor": 70}
+    )
+    op.execute(
+        "INSERT INTO asset_positions (asset_id, location, altitude_meters, heading_degrees, speed_mps, recorded_at) "
+        "SELECT id, current_location, altitude_meters, heading_degrees, speed_mps, COALESCE(last_seen, updated_at) "
+        "FROM assets"
+    )
+
+    if _is_postgres():
+        op.drop_index('idx_asset_location', table_name='assets')
+    op.drop_index(op.f('ix_assets_last_seen'), table_name='assets')
+    with op.batch_alter_table('assets') as batch_op:
+        batch_op.drop_column('current_location')
+        batch_op.drop_column('altitude_meters')
+        batch_op.drop_column('heading_degrees')
+        batch_op.drop_column('speed_mps')
+        batch_op.drop_column('last_seen')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('assets') as batch_op:
+        batch_op.add_column(sa.Column('current_location', geometry('POINT'), nullable=True))
+        batch_op.add_column(sa.Column('altitude_meters', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('heading_degrees', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('speed_mps', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('last_seen', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f('ix_assets_last_seen'), 'assets', ['last_seen'], unique=False)
+    if _is_postgres():
+        op.create_index('idx_asset_location', 'assets', ['current_location'], postgresql_using='gist')
+
+    op.execute(
+        "UPDATE assets SET "
+        "current_location = (SELECT location FROM asset_positions p WHERE p.asset_id = assets.id), "
+        "altitude_meters = (SELECT altitude_meters FROM asset_positions p WHERE p.asset_id = assets.id), "
+        "heading_degrees = (SELECT heading_degrees FROM asset_positions p WHERE p.asset_id = assets.id), "
+        "speed_mps = (SELECT speed_mps FROM asset_positions p WHERE p.asset_id = assets.id), "
+        "last_seen = (SELECT recorded_at FROM asset_positions p WHERE p.asset_id = assets.id)"
+    )
+    op.drop_table('asset_positions')
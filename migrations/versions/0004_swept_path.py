@@ -0,0 +1,30 @@
+"""Notification trigger times and per-asset trajectory index
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:00
+
+notifications.triggered_at records when an event happened, which for boundary
+crossings detected between pings is earlier than created_at. Proximity checks
+read each asset's latest trajectory points, served by (asset_id, recorded_at).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('notifications') as batch_op:
+        batch_op.add_column(sa.Column('triggered_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('idx_trajectory_asset_time', 'asset_trajectories', ['asset_id', 'recorded_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_trajectory_asset_time', table_name='asset_trajectories')
+    with op.batch_alter_table('notifications') as batch_op:
+        batch_op.drop_column('triggered_at')
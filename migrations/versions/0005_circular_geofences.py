@@ -0,0 +1,36 @@
+"""Native circular geofences
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 00:00:00
+
+Circles were stored as 64-256 vertex polygons. A circular geofence now stores its
+center in geometry plus radius_meters and is evaluated by distance, not polygon tests.
+Existing geofences are all polygons.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('geofences') as batch_op:
+        batch_op.add_column(sa.Column('geofence_type', sa.String(length=20), server_default='polygon', nullable=False))
+        batch_op.add_column(sa.Column('radius_meters', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    # Circles have no polygon to fall back to; approximate them before dropping the radius
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "UPDATE geofences SET geometry = ST_Buffer(geometry::geography, radius_meters, 32)::geometry "
+            "WHERE geofence_type = 'circular'"
+        )
+    with op.batch_alter_table('geofences') as batch_op:
+        batch_op.drop_column('radius_meters')
+        batch_op.drop_column('geofence_type')
@@ -0,0 +1,69 @@
+"""Geofence bounding-box columns
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 00:00:00
+
+min_lon/min_lat/max_lon/max_lat with B-tree indexes let spatial selection use an
+ordinary index on databases without PostGIS. Existing rows are backfilled from their
+geometry (circles: center point expanded by radius_meters).
+"""
+import math
+
+from alembic import op
+import sqlalchemy as sa
+from shapely import wkt
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+METERS_PER_DEGREE = math.pi * 6371008.8 / 180
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def _bounds(geometry_wkt: str, geofence_type: str, radius_meters):
+    shape = wkt.loads(geometry_wkt)
+    if geofence_type != "circular" or radius_meters is None:
+        return shape.bounds
+    half_lat = radius_meters / METERS_PER_DEGREE
+    half_lon = radius_meters / (METERS_PER_DEGREE * max(math.cos(math.radians(shape.y)), 0.01))
+    return shape.x - half_lon, shape.y - half_lat, shape.x + half_lon, shape.y + half_lat
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('geofences') as batch_op:
+        batch_op.add_column(sa.Column('min_lon', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('min_lat', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('max_lon', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('max_lat', sa.Float(), nullable=True))
+    op.create_index('idx_geofence_bbox_lat', 'geofences', ['min_lat', 'max_lat'], unique=False)
+    op.create_index('idx_geofence_bbox_lon', 'geofences', ['min_lon', 'max_lon'], unique=False)
+
+    bind = op.get_bind()
+    geometry_sql = "ST_AsText(geometry)" if _is_postgres() else "geometry"
+    rows = bind.execute(sa.text(f"SELECT id, {geometry_sql}, geofence_type, radius_meters FROM geofences")).fetchall()
+    update = sa.text(
+        "UPDATE geofences SET min_lon = :min_lon, min_lat = :min_lat, max_lon = :max_lon, max_lat = :max_lat "
+        "WHERE id = :id"
+    )
+    for geofence_id, geometry_wkt, geofence_type, radius_meters in rows:
+        min_lon, min_lat, max_lon, max_lat = _bounds(geometry_wkt, geofence_type, radius_meters)
+        bind.execute(update, {
+            "id": geofence_id, "min_lon": min_lon, "min_lat": min_lat, "max_lon": max_lon, "max_lat": max_lat
+        })
+
+
+def downgrade() -> None:
+    op.drop_index('idx_geofence_bbox_lon', table_name='geofences')
+    op.drop_index('idx_geofence_bbox_lat', table_name='geofences')
+    with op.batch_alter_table('geofences') as batch_op:
+        batch_op.drop_column('max_lat')
+        batch_op.drop_column('max_lon')
+        batch_op.drop_column('min_lat')
+        batch_op.drop_column('min_lon')
@@ -0,0 +1,33 @@
+"""Geohash cell coverage of geofences
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 00:00:00
+
+Read by GEOFENCE_ENGINE=cells. Rows are written by the application when geofences are
+created or reshaped; geofences without rows are covered in memory when the index loads.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('geofence_cells',
+    sa.Column('cell', sa.String(length=12), nullable=False),
+    sa.Column('geofence_id', sa.UUID(), nullable=False),
+    sa.Column('inside', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['geofence_id'], ['geofences.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('cell', 'geofence_id')
+    )
+    op.create_index('idx_geofence_cells_geofence', 'geofence_cells', ['geofence_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_geofence_cells_geofence', table_name='geofence_cells')
+    op.drop_table('geofence_cells')
@@ -0,0 +1,65 @@
+"""Tiles of large polygon geofences
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 00:00:00
+
+Polygons with more than GEOFENCE_TILE_MAX_VERTICES vertices are split into pieces stored
+in geofence_tiles (GiST-indexed on PostgreSQL) and flagged with geofences.tiled, so a
+containment test only touches the piece around the point. Existing geofences are tiled
+with ST_Subdivide on PostgreSQL; elsewhere the in-process index splits them when it loads.
+"""
+from alembic import op
+import sqlalchemy as sa
+from geoalchemy2 import Geometry
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+SRID = 4326
+MAX_VERTICES = 256
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def geometry(geometry_type: str):
+    """PostGIS geometry on PostgreSQL, WKT text elsewhere"""
+    if _is_postgres():
+        return Geometry(geometry_type, srid=SRID, spatial_index=False)
+    return sa.Text()
+
+
+def upgrade() -> None:
+    op.create_table('geofence_tiles',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('geofence_id', sa.UUID(), nullable=False),
+    sa.Column('geometry', geometry('POLYGON'), nullable=False),
+    sa.ForeignKeyConstraint(['geofence_id'], ['geofences.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_geofence_tiles_geofence', 'geofence_tiles', ['geofence_id'], unique=False)
+    with op.batch_alter_table('geofences') as batch_op:
+        batch_op.add_column(sa.Column('tiled', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+    if _is_postgres():
+        op.create_index('idx_geofence_tiles_geometry', 'geofence_tiles', ['geometry'], postgresql_using='gist')
+        op.execute(
+            "INSERT INTO geofence_tiles (geofence_id, geometry) "
+            f"SELECT id, ST_Subdivide(geometry, {MAX_VERTICES}) FROM geofences "
+            f"WHERE geofence_type = 'polygon' AND ST_NPoints(geometry) > {MAX_VERTICES}"
+        )
+        op.execute("UPDATE geofences SET tiled = true WHERE id IN (SELECT geofence_id FROM geofence_tiles)")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('geofences') as batch_op:
+        batch_op.drop_column('tiled')
+    if _is_postgres():
+        op.drop_index('idx_geofence_tiles_geometry', table_name='geofence_tiles')
+    op.drop_index('idx_geofence_tiles_geofence', table_name='geofence_tiles')
+    op.drop_table('geofence_tiles')
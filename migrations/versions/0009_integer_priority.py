@@ -0,0 +1,49 @@
+"""Integer geofence and zone priority
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 00:00:00
+
+priority was a String(20) column holding the integers the API sends, so it sorted
+lexically and could not drive priority-ordered evaluation. It becomes a NOT NULL
+integer (higher is more important); missing values become 1, the API default.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+TABLES = ('geofences', 'zones')
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.execute(f"UPDATE {table} SET priority = '1' WHERE priority IS NULL OR TRIM(priority) = ''")
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                'priority',
+                existing_type=sa.String(length=20),
+                type_=sa.Integer(),
+                nullable=False,
+                server_default='1',
+                postgresql_using='TRIM(priority)::integer'
+            )
+    op.create_index(op.f('ix_geofences_priority'), 'geofences', ['priority'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_geofences_priority'), table_name='geofences')
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                'priority',
+                existing_type=sa.Integer(),
+                type_=sa.String(length=20),
+                nullable=True,
+                server_default=None,
+                postgresql_using='priority::varchar'
+            )
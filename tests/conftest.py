@@ -0,0 +1,60 @@
+"""
+Shared test fixtures
+Tests run against a throwaway SQLite database and the offline LLM stub
+"""
+import os
+import tempfile
+
+# Settings are read on first import of app.core.config, so configure the environment first
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ["USE_SQLITE"] = "true"
+os.environ["AI_PROVIDER"] = "stub"
+
+import pytest  # noqa: E402
+from fastapi import Depends  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+from app.core.database import Base, SessionLocal, engine, get_db  # noqa: E402
+from app.core.dependencies import require_admin, require_delete, require_read, require_write  # noqa: E402
+from app.models import import_all_models  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """Session on freshly created tables, dropped afterwards"""
+    import_all_models()
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def user(db):
+    user = User(username="operator", email="operator@example.com", password_hash="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def client(db, user):
+    """API client acting as `user` with every permission; the lifespan hooks are not run"""
+    from app.main import app
+    user_id = user.id
+    # End the fixture session's transaction: a request may need the only SQLite connection
+    db.commit()
+
+    def current_user(request_db: Session = Depends(get_db)) -> User:
+        return request_db.get(User, user_id)
+
+    for dependency in (require_read, require_write, require_delete, require_admin):
+        app.dependency_overrides[dependency] = current_user
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
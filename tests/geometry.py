@@ -0,0 +1,126 @@
+"""
+Geometry test helpers
+Random geofences and points around test sites, and the plain shapely/haversine reference
+"""
+import math
+from uuid import uuid4
+
+import numpy as np
+import shapely
+from geoalchemy2.shape import from_shape
+from shapely.affinity import translate
+from shapely.geometry import LineString, Point as ShapelyPoint, Polygon, box
+from app.models import import_all_models
+from app.models.geofence import Geofence
+from app.services.geofence_index import METERS_PER_DEGREE, IndexedGeofence, great_circle_meters
+
+import_all_models()
+
+# (longitude, latitude) of each test area; fences near the antimeridian straddle it
+SITES = {
+    "equator": (10.0, 0.5),
+    "antimeridian": (179.99, -35.0),
+    "high_latitude": (25.0, 84.0),
+}
+
+
+def wrap_longitude(longitude):
+    return (np.asarray(longitude) + 180.0) % 360.0 - 180.0
+
+
+def offset(site, east_meters, north_meters):
+    """Coordinates the given distances (scalars or arrays) east and north of a site"""
+    longitude, latitude = SITES[site]
+    lons = longitude + np.asarray(east_meters) / (METERS_PER_DEGREE * math.cos(math.radians(latitude)))
+    lats = latitude + np.asarray(north_meters) / METERS_PER_DEGREE
+    return wrap_longitude(lons), lats
+
+
+def split_at_antimeridian(geometry):
+    """The geometry with any part beyond 180 degrees east moved to the western hemisphere"""
+    east = geometry.intersection(box(-180.0, -90.0, 180.0, 90.0))
+    beyond = geometry.intersection(box(180.0, -90.0, 540.0, 90.0))
+    if beyond.is_empty:
+        return east
+    return shapely.union(east, translate(beyond, xoff=-360.0))
+
+
+def star(rng, longitude, latitude, size_meters, vertices):
+    """Random star-shaped polygon of at most size_meters radius around the point"""
+    angles = np.sort(rng.uniform(0.0, 2 * math.pi, vertices))
+    radii = size_meters * rng.uniform(0.4, 1.0, vertices)
+    lons = longitude + radii * np.cos(angles) / (METERS_PER_DEGREE * math.cos(math.radians(latitude)))
+    lats = latitude + radii * np.sin(angles) / METERS_PER_DEGREE
+    return split_at_antimeridian(Polygon(np.column_stack((lons, lats))))
+
+
+def indexed(geometry, radius_meters=None, altitude=(None, None), priority=1, status="active"):
+    """Index snapshot of an unsaved geofence: a polygon, or a center point with a radius"""
+    circular = radius_meters is not None
+    center = geometry if circular else geometry.representative_point()
+    return IndexedGeofence(Geofence(
+        id=uuid4(),
+        name="fence",
+        geofence_type="circular" if circular else "polygon",
+        geometry=from_shape(geometry, srid=4326),
+        center_point=from_shape(center, srid=4326),
+        radius_meters=radius_meters,
+        altitude_min_meters=altitude[0],
+        altitude_max_meters=altitude[1],
+        priority=priority,
+        status=status
+    ))
+
+
+def random_fences(rng, site, count=12):
+    """
+    Small polygons, large (tiled) polygons and circles within 2 km of a site, with random
+    bands and priorities, plus one inactive polygon over the whole area
+    """
+    fences = []
+    for k in range(count):
+        lon, lat = offset(site, rng.uniform(-2000, 2000), rng.uniform(-2000, 2000))
+        low = None if rng.random() < 0.3 else float(rng.uniform(0, 100))
+        high = None if rng.random() < 0.3 else float(rng.uniform(150, 300))
+        priority = int(rng.integers(1, 6))
+        if k % 3 == 2:
+            geofence = indexed(ShapelyPoint(lon, lat), float(rng.uniform(500, 3000)), (low, high), priority)
+        else:
+            vertices = 1000 if k % 3 == 0 else 12
+            geofence = indexed(star(rng, float(lon), float(lat), rng.uniform(800, 3000), vertices), None, (low, high), priority)
+        fences.append(geofence)
+    fences.append(indexed(star(rng, *SITES[site], 5000, 12), status="inactive"))
+    return fences
+
+
+def random_points(rng, site, count):
+    """(longitudes, latitudes) of points within 6 km of a site"""
+    return offset(site, rng.uniform(-6000, 6000, count), rng.uniform(-6000, 6000, count))
+
+
+def random_segments(rng, site, count):
+    """Straight paths between random points, leaving out any that would wrap around the globe"""
+    lons, lats = random_points(rng, site, 2 * count)
+    return [
+        LineString([(lons[k], lats[k]), (lons[k + 1], lats[k + 1])])
+        for k in range(0, 2 * count, 2) if abs(lons[k] - lons[k + 1]) < 180
+    ]
+
+
+def contains(geofence, longitude, latitude, altitude=None):
+    """Reference containment: shapely for polygons, haversine for circles, then the band"""
+    if geofence.status != "active":
+        return False
+    if geofence.radius_meters is not None:
+        inside = great_circle_meters(geofence.center[0], geofence.center[1], longitude, latitude) <= geofence.radius_meters
+    else:
+        inside = geofence.geometry.contains(ShapelyPoint(longitude, latitude))
+    if altitude is None or math.isnan(altitude):
+        return inside
+    low, high = geofence.altitude_min_meters, geofence.altitude_max_meters
+    return inside and (low is None or low <= altitude) and (high is None or altitude <= high)
+
+
+def expected(fences, longitude, latitude, altitude=None):
+    """Positions of the fences containing the point, by the reference test"""
+    return [i for i, g in enumerate(fences) if contains(g, longitude, latitude, altitude)]
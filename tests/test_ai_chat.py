@@ -0,0 +1,85 @@
+"""
+AI chat tests
+Server-Sent Event framing of streamed replies, and unique message positions in a conversation
+"""
+import json
+import pytest
+from sqlalchemy.exc import IntegrityError
+from app.models.ai_service import AIConversation, AIMessage
+from app.schemas.ai_service import AIMessageCreate
+from app.services.ai_service import AIService
+
+
+def model_stream(monkeypatch, *tokens, error=None):
+    """Replace the model with one that yields `tokens`, then raises `error` if given"""
+    async def stream_ai_response(message_history):
+        for token in tokens:
+            yield token
+        if error:
+            raise error
+
+    monkeypatch.setattr(AIService, "stream_ai_response", staticmethod(stream_ai_response))
+
+
+def stream(client, content):
+    """(event, data) pairs of a streamed chat reply"""
+    response = client.post("/api/v1/ai/chat/stream", json={"content": content})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.endswith("\n\n")
+    events = []
+    for frame in response.text.split("\n\n")[:-1]:
+        event, data = frame.split("\n")
+        assert event.startswith("event: ") and data.startswith("data: ")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_stream_relays_tokens_and_ends_with_the_stored_reply(db, client, monkeypatch):
+    model_stream(monkeypatch, "Two", " trucks", " nearby")
+
+    events = stream(client, "where are my trucks")
+
+    assert [event for event, _ in events] == ["start", "token", "token", "token", "done"]
+    assert [data["content"] for event, data in events if event == "token"] == ["Two", " trucks", " nearby"]
+    start, done = events[0][1], events[-1][1]
+    assert start["user_message"]["content"] == "where are my trucks"
+    assert done["ai_message"]["content"] == "Two trucks nearby"
+    stored = db.query(AIMessage).filter(AIMessage.role == "assistant").one()
+    assert (str(stored.id), str(stored.conversation_id)) == (done["ai_message"]["id"], start["conversation_id"])
+
+
+def test_failed_stream_ends_with_an_error_and_stores_no_reply(db, client, monkeypatch):
+    model_stream(monkeypatch, "partial", error=RuntimeError("model went away"))
+
+    events = stream(client, "hello")
+
+    assert [event for event, _ in events] == ["start", "token", "error"]
+    assert "model went away" in events[-1][1]["message"]
+    assert db.query(AIMessage).filter(AIMessage.role == "assistant").count() == 0
+
+
+def test_streamed_reply_keeps_its_reserved_position(db, user):
+    user_message, reply_sequence, _ = AIService.prepare_stream(db, AIMessageCreate(content="first"), user.id)
+    conversation_id = str(user_message.conversation_id)
+
+    # Another turn completes while the first reply is still generating
+    AIService.send_message(db, AIMessageCreate(content="second", conversation_id=conversation_id), user.id)
+    AIService.save_assistant_message(db, user_message.conversation_id, reply_sequence, "first reply")
+
+    conversation = db.query(AIConversation).filter(AIConversation.id == user_message.conversation_id).one()
+    db.refresh(conversation)
+    assert [(m.sequence, m.role) for m in conversation.messages] == [
+        (1, "user"), (2, "assistant"), (3, "user"), (4, "assistant")
+    ]
+    assert [m.content for m in conversation.messages][:3] == ["first", "first reply", "second"]
+    assert conversation.last_sequence == 4
+
+
+def test_sequence_is_unique_within_a_conversation(db, user):
+    user_message, _ = AIService.send_message(db, AIMessageCreate(content="hello"), user.id)
+
+    db.add(AIMessage(conversation_id=user_message.conversation_id, sequence=1, role="user", content="again"))
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.rollback()
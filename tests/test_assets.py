@@ -0,0 +1,59 @@
+"""
+Asset tests
+Pings rewrite only the narrow asset_positions row; listings read it through the join
+"""
+import pytest
+from sqlalchemy import event
+from app.core.database import engine
+from app.models.asset import AssetTrajectory
+from app.schemas.asset import AssetCreate, AssetTrajectoryCreate
+from app.services.asset_service import AssetService
+
+
+@pytest.fixture
+def asset(db, user):
+    return AssetService.create_asset(db, AssetCreate(
+        name="Truck",
+        asset_type="vehicle",
+        identifier="T-1",
+        current_location={"latitude": 10.0, "longitude": 10.0}
+    ), user.id)
+
+
+def ping(db, asset, longitude, latitude):
+    return AssetService.update_asset_location(db, asset.id, AssetTrajectoryCreate(
+        asset_id=str(asset.id),
+        location={"latitude": latitude, "longitude": longitude},
+        altitude_meters=120.0
+    ))
+
+
+def test_ping_writes_only_the_position_row(db, asset):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[:3])
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        ping(db, asset, 10.5, 10.25)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    written = {tuple(words) for words in statements if words[0] in ("INSERT", "UPDATE", "DELETE")}
+    assert written == {("UPDATE", "asset_positions", "SET"), ("INSERT", "INTO", "asset_trajectories")}
+    assert db.query(AssetTrajectory).filter(AssetTrajectory.asset_id == asset.id).count() == 1
+
+
+def test_list_returns_the_latest_position(db, client, asset):
+    ping(db, asset, 10.5, 10.25)
+    ping(db, asset, 11.0, 10.75)
+    db.commit()
+
+    response = client.get("/api/v1/assets")
+
+    assert response.status_code == 200
+    [listed] = response.json()
+    assert (listed["current_location"]["longitude"], listed["current_location"]["latitude"]) == (11.0, 10.75)
+    assert listed["altitude_meters"] == 120.0
+    assert listed["last_seen"] is not None
@@ -0,0 +1,105 @@
+"""
+Database tests
+Pool sizing, the SQLite profile (PRAGMAs, read/write routing, the single write connection)
+and the read session dependency
+"""
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.core import database
+from app.models.user import User
+
+
+def test_read_db_reuses_request_session_without_replica(db, monkeypatch):
+    monkeypatch.setattr(database, "replica_guard", None)
+    dependency = database.get_read_db(db)
+
+    assert next(dependency) is db
+
+
+def test_pool_limits_split_the_connection_budget_across_processes(monkeypatch):
+    monkeypatch.setattr(database.settings, "DB_MAX_CONNECTIONS", 100)
+    monkeypatch.setattr(database.settings, "DB_RESERVED_CONNECTIONS", 5)
+    monkeypatch.setattr(database.settings, "WEB_CONCURRENCY", 4)
+    monkeypatch.setattr(database.settings, "APP_INSTANCES", 2)
+
+    pool_size, max_overflow = database.pool_limits()
+
+    assert (pool_size, max_overflow) == (7, 4)
+    assert (pool_size + max_overflow) * 4 * 2 <= 100 - 5
+
+
+def test_pool_limits_default_to_the_configured_pool(monkeypatch):
+    monkeypatch.setattr(database.settings, "DB_MAX_CONNECTIONS", None)
+
+    assert database.pool_limits() == (database.settings.DB_POOL_SIZE, database.settings.DB_MAX_OVERFLOW)
+
+
+@pytest.fixture
+def sqlite_url(tmp_path):
+    return "sqlite:///" + str(tmp_path / "profile.db")
+
+
+def pragma(engine, name):
+    with engine.connect() as conn:
+        return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+def test_wal_pragmas_applied_on_connect(sqlite_url, monkeypatch):
+    monkeypatch.setattr(database.settings, "SQLITE_WAL_ENABLED", True)
+    writer, reader = database.sqlite_engines(sqlite_url)
+    try:
+        for engine in (writer, reader):
+            assert pragma(engine, "journal_mode") == "wal"
+            assert pragma(engine, "synchronous") == 1  # NORMAL
+            assert pragma(engine, "busy_timeout") == database.settings.SQLITE_BUSY_TIMEOUT_MS
+            assert pragma(engine, "foreign_keys") == 1
+        assert pragma(writer, "query_only") == 0
+        assert pragma(reader, "query_only") == 1
+    finally:
+        writer.dispose()
+        reader.dispose()
+
+
+def test_routing_session_reads_from_readers_and_writes_to_the_writer(db):
+    executed = []
+
+    def recorder(name):
+        def record(conn, cursor, statement, parameters, context, executemany):
+            executed.append((name, statement.split()[0]))
+        return record
+
+    listeners = [(database.engine, recorder("writer")), (database.read_engine, recorder("reader"))]
+    for engine, listener in listeners:
+        event.listen(engine, "before_cursor_execute", listener)
+    try:
+        db.query(User).all()
+        db.add(User(username="dispatcher", email="dispatcher@example.com", password_hash="x"))
+        db.flush()
+        # The transaction has written, so it keeps reading on the writer to see its own rows
+        db.query(User).all()
+        db.commit()
+        db.query(User).all()
+    finally:
+        for engine, listener in listeners:
+            event.remove(engine, "before_cursor_execute", listener)
+
+    assert executed == [
+        ("reader", "SELECT"), ("writer", "INSERT"), ("writer", "SELECT"), ("reader", "SELECT")
+    ]
+
+
+@pytest.mark.parametrize("wal", [True, False])
+def test_one_session_at_a_time_holds_the_write_connection(sqlite_url, monkeypatch, wal):
+    monkeypatch.setattr(database.settings, "SQLITE_WAL_ENABLED", wal)
+    monkeypatch.setattr(database.settings, "SQLITE_WRITE_TIMEOUT_SECONDS", 0.1)
+    writer, reader = database.sqlite_engines(sqlite_url)
+    try:
+        assert (reader is not None) == wal
+        with writer.connect():
+            with pytest.raises(PoolTimeoutError):
+                writer.connect()
+    finally:
+        writer.dispose()
+        if reader is not None:
+            reader.dispose()
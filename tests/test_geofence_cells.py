@@ -0,0 +1,52 @@
+"""
+Geofence cell tests
+Geohash coverage lists every cell a geofence touches, marks inside only cells it fully covers,
+and the cells engine agrees with plain shapely and haversine on random points
+"""
+import numpy as np
+import pytest
+from shapely.geometry import Point as ShapelyPoint
+from app.services.geofence_cells import CellCoverage, geohash, polyfill
+from app.services.geofence_index import GeofenceIndex
+from tests.geometry import SITES, contains, expected, indexed, random_fences, random_points, star
+
+
+@pytest.fixture(params=sorted(SITES))
+def site(request):
+    return request.param
+
+
+@pytest.mark.parametrize("shape", ["polygon", "circle"])
+def test_polyfill_inside_and_edge_cells(site, shape):
+    rng = np.random.default_rng(11)
+    if shape == "circle":
+        geofence = indexed(ShapelyPoint(*SITES[site]), 2500.0)
+    else:
+        geofence = indexed(star(rng, *SITES[site], 2500, 300))
+
+    cells = dict(polyfill(geofence.geometry, geofence.radius_meters))
+    precision = len(next(iter(cells)))
+    lons, lats = random_points(rng, site, 3000)
+
+    for lon, lat in zip(lons, lats):
+        cell = geohash(lon, lat, precision)
+        if contains(geofence, lon, lat):
+            assert cell in cells
+        if cells.get(cell):
+            assert contains(geofence, lon, lat)
+    assert any(cells.values()) and not all(cells.values())
+
+
+def test_cells_engine_matches_reference(db, site):
+    rng = np.random.default_rng(12)
+    fences = random_fences(rng, site)
+    index = GeofenceIndex(fences)
+    index.cells = CellCoverage.load(db, index.geofences, np.flatnonzero(index._active))
+    lons, lats = random_points(rng, site, 400)
+
+    for lon, lat in zip(lons, lats):
+        altitude = None if rng.random() < 0.5 else float(rng.uniform(0, 300))
+        reference = expected(fences, lon, lat, altitude)
+        assert [fences.index(g) for g in index.containing(lon, lat, altitude)] == reference
+        ranked = sorted(reference, key=lambda i: (-fences[i].priority, i))
+        assert [fences.index(g) for g in index.containing(lon, lat, altitude, 2)] == ranked[:2]
@@ -0,0 +1,182 @@
+"""
+Geofence index tests
+The in-process engine agrees with plain shapely and haversine on random points, including
+fences across the antimeridian and at high latitude
+"""
+import numpy as np
+import pytest
+import shapely
+from app.services.geofence_index import (
+    AltitudeBands, GeofenceIndex, boundary_crossings, circle_crossings, haversine_meters, subdivide
+)
+from tests.geometry import (
+    SITES, expected, indexed, random_fences, random_points, random_segments, star
+)
+
+
+@pytest.fixture(params=sorted(SITES))
+def site(request):
+    return request.param
+
+
+def positions(index, matches):
+    return [index.geofences.index(g) for g in matches]
+
+
+def test_containing_matches_reference(site):
+    rng = np.random.default_rng(1)
+    fences = random_fences(rng, site)
+    index = GeofenceIndex(fences)
+    lons, lats = random_points(rng, site, 400)
+    altitudes = rng.choice([np.nan, 50.0, 120.0, 200.0, 400.0], 400)
+
+    for lon, lat, altitude in zip(lons, lats, altitudes):
+        altitude = None if np.isnan(altitude) else float(altitude)
+        assert positions(index, index.containing(lon, lat, altitude)) == expected(fences, lon, lat, altitude)
+
+
+def sampled_crossings(segment, inside_at, samples=4001):
+    """(event, fraction) wherever containment flips between dense samples along the segment"""
+    fractions = np.linspace(0.0, 1.0, samples)
+    (x0, y0), (x1, y1) = segment.coords
+    inside = inside_at(x0 + (x1 - x0) * fractions, y0 + (y1 - y0) * fractions)
+    flips = np.flatnonzero(inside[1:] != inside[:-1])
+    return [("enter" if inside[k + 1] else "exit", (fractions[k] + fractions[k + 1]) / 2) for k in flips]
+
+
+def assert_same_crossings(events, reference, tolerance):
+    assert [event for event, _ in events] == [event for event, _ in reference]
+    for (_, fraction), (_, sampled) in zip(events, reference):
+        assert fraction == pytest.approx(sampled, abs=tolerance)
+
+
+def test_circle_crossings_match_sampling(site):
+    rng = np.random.default_rng(6)
+    center, radius = SITES[site], 2500.0
+
+    for segment in random_segments(rng, site, 60):
+        reference = sampled_crossings(
+            segment, lambda lons, lats: haversine_meters(center[0], center[1], lons, lats) <= radius
+        )
+        assert_same_crossings(circle_crossings(center, radius, segment), reference, 2e-3)
+
+
+def test_boundary_crossings_match_sampling(site):
+    rng = np.random.default_rng(5)
+    polygon = star(rng, *SITES[site], 2000, 40)
+
+    for segment in random_segments(rng, site, 60):
+        reference = sampled_crossings(segment, lambda lons, lats: shapely.contains_xy(polygon, lons, lats))
+        assert_same_crossings(boundary_crossings(polygon, segment), reference, 1e-3)
+
+
+def test_crossed_by_finds_every_crossed_fence(site):
+    rng = np.random.default_rng(7)
+    fences = random_fences(rng, site)
+    index = GeofenceIndex(fences)
+    active = [g for g in fences if g.status == "active"]
+
+    for segment in random_segments(rng, site, 50):
+        found = {g.id for g in index.crossed_by(segment)}
+        for g in active:
+            if g.radius_meters is not None:
+                crossed = circle_crossings(g.center, g.radius_meters, segment)
+            else:
+                crossed = boundary_crossings(g.geometry, segment)
+            if crossed:
+                assert g.id in found
+
+
+def test_altitude_bands_match_reference():
+    rng = np.random.default_rng(8)
+    limits = [None, 0.0, 100.0, 250.0]
+    fences = [
+        indexed(star(rng, *SITES["equator"], 1000, 8), altitude=(low, high))
+        for low in limits for high in limits if low is None or high is None or low <= high
+    ]
+    bands = AltitudeBands(fences)
+    everything = np.arange(len(fences))
+
+    def admits(g, low, high):
+        return (g.altitude_min_meters is None or g.altitude_min_meters <= high) and (
+            g.altitude_max_meters is None or g.altitude_max_meters >= low
+        )
+
+    for low, high in [(None, None), (-50.0, -10.0), (0.0, 0.0), (50.0, 50.0), (90.0, 300.0), (260.0, 400.0)]:
+        reference = [i for i, g in enumerate(fences) if low is None or admits(g, low, high)]
+        assert bands.admits(everything, low, high).tolist() == reference
+        repeated = np.repeat(everything, 2)
+        assert np.flatnonzero(bands.admitting(repeated, low, high)).tolist() == [2 * i + k for i in reference for k in (0, 1)]
+
+    altitudes = rng.choice([np.nan, -10.0, 0.0, 100.0, 180.0, 300.0], len(fences))
+    assert bands.admitting_each(everything, altitudes).tolist() == [
+        bool(np.isnan(a)) or admits(g, a, a) for g, a in zip(fences, altitudes)
+    ]
+
+
+def test_altitude_stable_range_keeps_the_result(site):
+    rng = np.random.default_rng(9)
+    fences = random_fences(rng, site)
+    index = GeofenceIndex(fences)
+    lons, lats = random_points(rng, site, 150)
+
+    for lon, lat in zip(lons, lats):
+        altitude = float(rng.uniform(-50, 350))
+        low, high = index.altitude_stable_range(lon, lat, altitude)
+        assert low <= altitude <= high
+        result = expected(fences, lon, lat, altitude)
+        for moved in np.linspace(max(low, -1000.0), min(high, 1000.0), 7)[1:-1]:
+            assert expected(fences, lon, lat, moved) == result
+
+
+def test_subdivide_covers_the_polygon_exactly(site):
+    rng = np.random.default_rng(4)
+    polygon = star(rng, *SITES[site], 3000, 1000)
+
+    pieces = subdivide(polygon, 64)
+
+    assert all(shapely.get_num_coordinates(p) <= 64 for p in pieces)
+    assert sum(p.area for p in pieces) == pytest.approx(polygon.area, rel=1e-9)
+    lons, lats = random_points(rng, site, 2000)
+    in_pieces = np.logical_or.reduce([shapely.contains_xy(p, lons, lats) for p in pieces])
+    assert (in_pieces == shapely.contains_xy(polygon, lons, lats)).all()
+
+
+def test_tiled_polygon_matches_reference(site):
+    rng = np.random.default_rng(10)
+    polygon = star(rng, *SITES[site], 3000, 5000)
+    geofence = indexed(polygon)
+    index = GeofenceIndex([geofence])
+    lons, lats = random_points(rng, site, 1000)
+
+    assert len(geofence.tiles) > 1
+    inside = shapely.contains_xy(polygon, lons, lats)
+    assert [bool(index.containing(lon, lat)) for lon, lat in zip(lons, lats)] == inside.tolist()
+
+
+def test_containing_many_matches_reference(site):
+    rng = np.random.default_rng(2)
+    fences = random_fences(rng, site)
+    index = GeofenceIndex(fences)
+    lons, lats = random_points(rng, site, 400)
+    altitudes = rng.choice([np.nan, 50.0, 120.0, 200.0, 400.0], 400)
+
+    point_indices, matched = index.containing_many(lons, lats, altitudes)
+
+    assert list(zip(point_indices.tolist(), matched.tolist())) == [
+        (k, i) for k, (lon, lat, altitude) in enumerate(zip(lons, lats, altitudes))
+        for i in expected(fences, lon, lat, altitude)
+    ]
+
+
+def test_top_containing_is_the_best_ranked_prefix(site):
+    rng = np.random.default_rng(3)
+    fences = random_fences(rng, site)
+    index = GeofenceIndex(fences)
+    lons, lats = random_points(rng, site, 300)
+
+    for lon, lat in zip(lons, lats):
+        altitude = None if rng.random() < 0.5 else float(rng.uniform(0, 300))
+        ranked = sorted(expected(fences, lon, lat, altitude), key=lambda i: (-fences[i].priority, i))
+        for top in (1, 2, 5):
+            assert positions(index, index.containing(lon, lat, altitude, top)) == ranked[:top]
@@ -0,0 +1,57 @@
+"""
+Geofence index cache tests
+A worker's cached index notices writes made through another worker
+"""
+import pytest
+from app.core.config import get_settings
+from app.schemas.geofence import GeofenceCreate, GeofenceUpdate
+from app.services.geofence_index import GeofenceIndexCache
+from app.services.geofence_service import GeofenceService
+
+settings = get_settings()
+
+
+@pytest.fixture
+def other_worker(monkeypatch):
+    """A second cache standing in for another worker process, rechecking on every call"""
+    monkeypatch.setattr(settings, "GEOFENCE_INDEX_REFRESH_SECONDS", 0)
+    return GeofenceIndexCache()
+
+
+def create(db, user, name, lon=0.0):
+    return GeofenceService.create_geofence(db, GeofenceCreate(
+        name=name,
+        geometry={"type": "Polygon", "coordinates": [[
+            [lon - 0.01, -0.01], [lon - 0.01, 0.01], [lon + 0.01, 0.01], [lon + 0.01, -0.01], [lon - 0.01, -0.01]
+        ]]},
+        center_point={"latitude": 0.0, "longitude": lon}
+    ), user.id)
+
+
+def test_replacing_a_geofence_is_noticed(db, user, other_worker):
+    first = create(db, user, "first")
+    assert [g.id for g in other_worker.get(db).geofences] == [first.id]
+
+    # Same count, and max(updated_at) may not move
+    GeofenceService.delete_geofence(db, first.id)
+    second = create(db, user, "second")
+
+    assert [g.id for g in other_worker.get(db).geofences] == [second.id]
+
+
+def test_update_is_noticed(db, user, other_worker):
+    geofence = create(db, user, "fence")
+    generation = other_worker.generation
+    assert other_worker.get(db).geofences[0].status == "active"
+
+    GeofenceService.update_geofence(db, geofence.id, GeofenceUpdate(status="inactive"))
+
+    assert other_worker.get(db).geofences[0].status == "inactive"
+    assert other_worker.generation == generation + 1
+
+
+def test_unchanged_index_is_reused(db, user, other_worker):
+    create(db, user, "fence")
+    index = other_worker.get(db)
+
+    assert other_worker.get(db) is index
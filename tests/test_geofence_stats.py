@@ -0,0 +1,91 @@
+"""
+Geofence stats tests
+Incremental upserts agree with a rebuild from the notifications table
+"""
+from uuid import uuid4
+import pytest
+from app.models.asset import Asset
+from app.models.geofence_stats import GeofenceStats
+from app.models.notification import Notification
+from app.schemas.geofence import GeofenceCreate
+from app.services.geofence_service import GeofenceService
+from app.services.geofence_stats_service import GeofenceStatsService
+
+
+@pytest.fixture
+def geofence(db, user):
+    return GeofenceService.create_geofence(db, GeofenceCreate(
+        name="Yard",
+        geometry={"type": "Polygon", "coordinates": [[[9.9, 9.9], [9.9, 10.1], [10.1, 10.1], [10.1, 9.9], [9.9, 9.9]]]},
+        center_point={"latitude": 10.0, "longitude": 10.0}
+    ), user.id)
+
+
+@pytest.fixture
+def assets(db):
+    assets = [Asset(name=f"Truck {i}", asset_type="vehicle", identifier=f"T-{i}") for i in range(3)]
+    db.add_all(assets)
+    db.commit()
+    return assets
+
+
+def notify(db, geofence, batch):
+    notifications = [
+        Notification(
+            notification_type=notification_type,
+            severity=severity,
+            title="event",
+            location="POINT(10 10)",
+            distance_meters=distance,
+            geofence_id=geofence.id,
+            asset_id=asset.id
+        )
+        for notification_type, severity, distance, asset in batch
+    ]
+    db.add_all(notifications)
+    GeofenceStatsService.record_notifications(db, notifications)
+    db.commit()
+
+
+def snapshot(db, geofence):
+    db.expire_all()
+    stats = GeofenceStatsService.get_stats_map(db, [geofence.id])[geofence.id]
+    recent = GeofenceStatsService.get_recent_asset_counts(db, [geofence.id]).get(geofence.id, 0)
+    summary = GeofenceStatsService.summarize(stats, recent)
+    for key in ("first_event_at", "last_event_at", "last_breach_at", "events_per_day", "busiest_hours_utc"):
+        summary.pop(key, None)
+    return summary
+
+
+def test_incremental_matches_rebuild(db, geofence, assets):
+    notify(db, geofence, [
+        ("proximity", "low", 120.0, assets[0]),
+        ("breach", "high", None, assets[1]),
+        ("proximity", "medium", 40.0, assets[0])
+    ])
+    notify(db, geofence, [
+        ("enter", "high", 5.0, assets[2]),
+        ("proximity", "low", 300.0, assets[1])
+    ])
+
+    incremental = snapshot(db, geofence)
+    assert incremental["event_count"] == 5
+    assert incremental["breach_count"] == 2
+    assert incremental["events_by_type"] == {"proximity": 3, "breach": 1, "enter": 1}
+    assert incremental["events_by_severity"] == {"low": 2, "high": 2, "medium": 1}
+    assert incremental["min_distance_meters"] == 5.0
+    assert incremental["recent_distinct_assets"] == 3
+
+    GeofenceStatsService.rebuild(db, geofence.id)
+    assert snapshot(db, geofence) == incremental
+    assert db.query(GeofenceStats).count() == 1
+
+
+def test_notifications_without_geofence_are_ignored(db, geofence):
+    notification = Notification(notification_type="alert", severity="low", title="event", location="POINT(0 0)")
+    db.add(notification)
+    GeofenceStatsService.record_notifications(db, [notification])
+    db.commit()
+
+    assert GeofenceStatsService.get_stats_map(db, [geofence.id]) == {}
+    assert GeofenceStatsService.summarize(None) == {"event_count": 0}
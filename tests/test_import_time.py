@@ -0,0 +1,12 @@
+"""
+Import-time budget test
+Runs benchmarks/import_time.py so a slow or eager import fails the suite
+"""
+from benchmarks import import_time
+
+
+def test_app_import_within_budget():
+    report = import_time.run(import_time.parse_args(["--runs", "3"]))
+
+    assert not report["forbidden_imported"], f"Optional dependencies imported eagerly: {report['forbidden_imported']}"
+    assert report["passed"], f"Median import {report['median_ms']}ms exceeds {report['budget_ms']}ms budget"
@@ -0,0 +1,44 @@
+"""
+Metrics tests
+The scrape endpoint and the request, database and proximity instrumentation behind it
+"""
+from prometheus_client import REGISTRY
+from app.models.asset import Asset
+from app.services.notification_service import NotificationService
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_request_is_recorded_under_its_route_template(client):
+    labels = {"method": "GET", "route": "/api/v1/assets", "status": "200"}
+    requests_before = sample("http_request_duration_seconds_count", **labels)
+    queries_before = sample("db_queries_per_request_sum", route="/api/v1/assets")
+
+    assert client.get("/api/v1/assets").status_code == 200
+
+    assert sample("http_request_duration_seconds_count", **labels) == requests_before + 1
+    assert sample("db_queries_per_request_sum", route="/api/v1/assets") > queries_before
+
+
+def test_proximity_check_is_timed(db):
+    asset = Asset(name="Truck", asset_type="vehicle", identifier="T-1")
+    db.add(asset)
+    db.commit()
+    before = sample("geofence_proximity_check_seconds_count")
+
+    NotificationService.check_proximity(db, asset.id, 10.0, 10.0)
+
+    assert sample("geofence_proximity_check_seconds_count") == before + 1
+
+
+def test_metrics_endpoint_renders_prometheus_text(client):
+    client.get("/api/v1/assets")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/assets",status="200"}' in response.text
+    assert "db_pool_checkout_wait_seconds_bucket" in response.text
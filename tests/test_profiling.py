@@ -0,0 +1,68 @@
+"""
+Query profiler tests
+Server-Timing headers and slow-request reports with repeated statement shapes
+"""
+import json
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from app.core import profiling
+from app.core.profiling import QueryProfilerMiddleware, attach_profiler, statement_shape
+
+
+@pytest.fixture
+def profiled_client(tmp_path, monkeypatch):
+    """App whose one route looks rows up one at a time on a profiled engine"""
+    report_file = tmp_path / "profile.jsonl"
+    monkeypatch.setattr(profiling.settings, "PROFILING_REPORT_FILE", str(report_file))
+    monkeypatch.setattr(profiling.settings, "PROFILING_SERVER_TIMING", True)
+    engine = create_engine("sqlite://")
+    attach_profiler(engine)
+
+    app = FastAPI()
+    app.add_middleware(QueryProfilerMiddleware)
+
+    @app.get("/rows")
+    def rows():
+        with engine.connect() as conn:
+            return [conn.execute(text("SELECT :id"), {"id": i}).scalar() for i in range(4)]
+
+    yield TestClient(app), report_file
+    engine.dispose()
+
+
+def test_statement_shape_ignores_literals_and_in_list_length():
+    assert statement_shape("SELECT *\n  FROM t WHERE id IN (?, ?, ?) AND name = 'x' AND n > 5") == (
+        "SELECT * FROM t WHERE id IN (...) AND name = ? AND n > ?"
+    )
+
+
+def test_server_timing_counts_the_request_queries(profiled_client):
+    client, _ = profiled_client
+
+    response = client.get("/rows")
+
+    assert response.json() == [0, 1, 2, 3]
+    assert 'desc="4 queries"' in response.headers["server-timing"]
+
+
+def test_repeated_statement_writes_a_report(profiled_client, monkeypatch):
+    client, report_file = profiled_client
+    monkeypatch.setattr(profiling.settings, "PROFILING_DUPLICATE_THRESHOLD", 3)
+
+    client.get("/rows")
+
+    [report] = [json.loads(line) for line in report_file.read_text().splitlines()]
+    assert (report["method"], report["path"], report["query_count"]) == ("GET", "/rows", 4)
+    [duplicate] = report["duplicate_shapes"]
+    assert (duplicate["shape"], duplicate["count"]) == ("SELECT ?", 4)
+
+
+def test_fast_request_writes_no_report(profiled_client, monkeypatch):
+    client, report_file = profiled_client
+    monkeypatch.setattr(profiling.settings, "PROFILING_DUPLICATE_THRESHOLD", 5)
+
+    client.get("/rows")
+
+    assert not report_file.exists()
@@ -0,0 +1,53 @@
+"""
+Proximity cache tests
+A cached proximity result is dropped once another worker changes geofences
+"""
+import pytest
+from app.core.capabilities import get_capabilities
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.models.asset import Asset
+from app.services.geofence_index import bump_geofence_version
+from app.services.notification_service import NotificationService
+from app.services.proximity_cache import safe_radius_cache
+
+settings = get_settings()
+
+
+@pytest.fixture
+def postgis(monkeypatch):
+    """PostGIS engine with the spatial query (which SQLite cannot run) replaced by a recording stub"""
+    evaluations = []
+
+    def evaluate(db, point_wkb, longitude, latitude, altitude=None, top=None):
+        evaluations.append((longitude, latitude))
+        return [], 1000.0, None
+
+    monkeypatch.setattr(get_capabilities(), "spatial_engine", "postgis")
+    monkeypatch.setattr(NotificationService, "_evaluate_postgis", staticmethod(evaluate))
+    monkeypatch.setattr(settings, "GEOFENCE_INDEX_REFRESH_SECONDS", 0)
+    safe_radius_cache.clear()
+    yield evaluations
+    safe_radius_cache.clear()
+
+
+def test_version_bump_from_another_session_drops_cached_result(db, postgis):
+    asset = Asset(name="Truck", asset_type="vehicle", identifier="T-1")
+    db.add(asset)
+    db.commit()
+
+    NotificationService.check_proximity(db, asset.id, 10.0, 10.0)
+    NotificationService.check_proximity(db, asset.id, 10.0, 10.0)
+    db.commit()
+    assert len(postgis) == 1
+
+    # Another worker creates or moves a fence
+    other = SessionLocal()
+    try:
+        bump_geofence_version(other)
+        other.commit()
+    finally:
+        other.close()
+
+    NotificationService.check_proximity(db, asset.id, 10.0, 10.0)
+    assert len(postgis) == 2
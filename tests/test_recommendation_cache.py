@@ -0,0 +1,141 @@
+"""
+Recommendation cache tests
+Reuse and invalidation of stored recommendations, counted through the stub LLM client
+"""
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.core.config import get_settings
+from app.models.ai_service import AIRecommendation
+from app.models.notification import Notification
+from app.schemas.asset import AssetCreate, AssetTrajectoryCreate
+from app.schemas.geofence import GeofenceCreate, GeofenceUpdate
+from app.schemas.zone import ZoneCreate
+from app.services.ai_service import AIService
+from app.services.asset_service import AssetService
+from app.services.geofence_service import GeofenceService
+from app.services.geofence_stats_service import GeofenceStatsService
+from app.services.llm_client import get_llm_client
+from app.services.zone_service import ZoneService
+
+settings = get_settings()
+
+
+@pytest.fixture
+def geofence(db, user):
+    geofence = GeofenceService.create_geofence(db, GeofenceCreate(
+        name="Depot",
+        geometry={"type": "Polygon", "coordinates": [[[0, 0], [0, 1], [1, 1], [1, 0], [0, 0]]]},
+        center_point={"latitude": 0.5, "longitude": 0.5}
+    ), user.id)
+    # Older than any backdated recommendation, so only an explicit update invalidates
+    geofence.updated_at = datetime.now(timezone.utc) - timedelta(seconds=2 * settings.AI_RECOMMENDATION_CACHE_TTL_SECONDS)
+    db.commit()
+    return geofence
+
+
+def recommend(db, geofence, context):
+    return AIService.generate_recommendation(db, "geofence", str(geofence.id), "geofence_optimization", context)
+
+
+def backdate(db, recommendation, seconds):
+    """Move created_at into the past; SQLite timestamps only have second resolution"""
+    recommendation.created_at = datetime.now(timezone.utc) - timedelta(seconds=seconds)
+    db.commit()
+
+
+def test_hit_for_same_canonical_context(db, geofence):
+    client = get_llm_client()
+    first = recommend(db, geofence, {"speed": 12, "zones": ["a", "b"]})
+    calls = client.calls
+
+    second = recommend(db, geofence, {"zones": ["a", "b"], "speed": 12})
+
+    assert second.id == first.id
+    assert client.calls == calls
+    assert db.query(AIRecommendation).count() == 1
+
+
+def test_miss_for_different_context(db, geofence):
+    client = get_llm_client()
+    first = recommend(db, geofence, {"speed": 12})
+    calls = client.calls
+
+    second = recommend(db, geofence, {"speed": 13})
+
+    assert second.id != first.id
+    assert client.calls == calls + 1
+
+
+def test_miss_after_entity_update(db, geofence):
+    client = get_llm_client()
+    first = recommend(db, geofence, {"speed": 12})
+    backdate(db, first, 10)
+    assert recommend(db, geofence, {"speed": 12}).id == first.id
+    calls = client.calls
+
+    GeofenceService.update_geofence(db, geofence.id, GeofenceUpdate(name="Depot 2"))
+
+    assert recommend(db, geofence, {"speed": 12}).id != first.id
+    assert client.calls == calls + 1
+
+
+def test_miss_after_ttl(db, geofence):
+    client = get_llm_client()
+    first = recommend(db, geofence, {"speed": 12})
+    backdate(db, first, settings.AI_RECOMMENDATION_CACHE_TTL_SECONDS - 60)
+    assert recommend(db, geofence, {"speed": 12}).id == first.id
+    calls = client.calls
+
+    backdate(db, first, settings.AI_RECOMMENDATION_CACHE_TTL_SECONDS + 60)
+
+    assert recommend(db, geofence, {"speed": 12}).id != first.id
+    assert client.calls == calls + 1
+
+
+def test_zone_change_invalidates(db, geofence):
+    client = get_llm_client()
+    first = recommend(db, geofence, {"speed": 12})
+    calls = client.calls
+
+    ZoneService.create_zone(db, ZoneCreate(name="Gate", zone_type="restricted", geofence_id=str(geofence.id)))
+
+    assert recommend(db, geofence, {"speed": 12}).id != first.id
+    assert client.calls == calls + 1
+
+
+def test_miss_after_stats_change(db, geofence):
+    client = get_llm_client()
+    first = recommend(db, geofence, {"speed": 12})
+    backdate(db, first, 10)
+    assert recommend(db, geofence, {"speed": 12}).id == first.id
+    calls = client.calls
+
+    notification = Notification(
+        notification_type="breach", severity="high", title="event", location="POINT(0.5 0.5)", geofence_id=geofence.id
+    )
+    db.add(notification)
+    GeofenceStatsService.record_notifications(db, [notification])
+    db.commit()
+
+    assert recommend(db, geofence, {"speed": 12}).id != first.id
+    assert client.calls == calls + 1
+
+
+def test_miss_after_asset_ping(db, user):
+    client = get_llm_client()
+    asset = AssetService.create_asset(db, AssetCreate(
+        name="Truck", asset_type="vehicle", identifier="T-1", current_location={"latitude": 0.5, "longitude": 0.5}
+    ), user.id)
+    asset.updated_at = asset.position.recorded_at = datetime.now(timezone.utc) - timedelta(seconds=20)
+    db.commit()
+    first = AIService.generate_recommendation(db, "asset", str(asset.id), "route_optimization", {"speed": 12})
+    backdate(db, first, 10)
+    assert AIService.generate_recommendation(db, "asset", str(asset.id), "route_optimization", {"speed": 12}).id == first.id
+    calls = client.calls
+
+    AssetService.update_asset_location(db, asset.id, AssetTrajectoryCreate(
+        asset_id=str(asset.id), location={"latitude": 0.6, "longitude": 0.6}
+    ))
+
+    assert AIService.generate_recommendation(db, "asset", str(asset.id), "route_optimization", {"speed": 12}).id != first.id
+    assert client.calls == calls + 1
@@ -0,0 +1,65 @@
+"""
+Recommendation job tests
+Claiming is exclusive and only abandoned runs are picked up again
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from starlette.concurrency import run_in_threadpool
+from app.core.config import get_settings
+from app.models.ai_service import AIRecommendationJob
+from app.services.recommendation_jobs import InProcessJobQueue, RecommendationJobService
+
+settings = get_settings()
+
+
+def create_job(db, user):
+    return RecommendationJobService.create_job(db, "geofence", ["a"], "geofence_optimization", user.id)
+
+
+def test_job_is_claimed_once(db, user):
+    job = create_job(db, user)
+
+    assert [j.id for j in RecommendationJobService.claim_jobs(db, [job.id, job.id])] == [job.id]
+    assert RecommendationJobService.claim_jobs(db, [job.id]) == []
+    db.refresh(job)
+    assert job.status == "running"
+
+
+def test_running_job_is_requeued_only_after_lease(db, user):
+    job = create_job(db, user)
+    RecommendationJobService.claim_jobs(db, [job.id])
+    assert RecommendationJobService.list_unfinished_job_ids(db) == []
+
+    job.started_at = datetime.now(timezone.utc) - timedelta(seconds=settings.AI_JOB_LEASE_SECONDS + 60)
+    db.commit()
+
+    assert RecommendationJobService.list_unfinished_job_ids(db) == [job.id]
+    assert [j.id for j in RecommendationJobService.claim_jobs(db, [job.id])] == [job.id]
+    assert RecommendationJobService.list_unfinished_job_ids(db) == []
+
+
+def test_finished_jobs_are_not_claimed(db, user):
+    job = create_job(db, user)
+    job.status = "completed"
+    db.commit()
+
+    assert RecommendationJobService.claim_jobs(db, [job.id]) == []
+    assert db.query(AIRecommendationJob).filter(AIRecommendationJob.status == "running").count() == 0
+
+
+def test_job_submitted_from_a_sync_route_runs(monkeypatch):
+    ran = []
+    monkeypatch.setattr(RecommendationJobService, "run_jobs", staticmethod(ran.extend))
+
+    async def submit_from_threadpool():
+        queue = InProcessJobQueue()
+        await run_in_threadpool(queue.submit, "job")  # Workers not started yet: started on the loop
+        for _ in range(100):
+            if ran:
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+
+    asyncio.run(submit_from_threadpool())
+
+    assert ran == ["job"]
@@ -0,0 +1,42 @@
+"""
+Graceful shutdown tests
+A stopping worker waits for tracked writes, up to the drain timeout
+"""
+import asyncio
+import threading
+from app.core.shutdown import InFlightTracker
+
+
+def test_drain_waits_for_tracked_work_in_another_thread():
+    tracker = InFlightTracker("writes")
+    started, release = threading.Event(), threading.Event()
+
+    def write():
+        with tracker.track():
+            started.set()
+            release.wait()
+
+    worker = threading.Thread(target=write)
+    worker.start()
+    started.wait()
+    assert tracker.in_flight == 1
+
+    async def drain_while_finishing():
+        draining = asyncio.create_task(tracker.drain(5.0))
+        await asyncio.sleep(0.1)
+        assert not draining.done()
+        release.set()
+        return await draining
+
+    assert asyncio.run(drain_while_finishing()) is True
+    worker.join()
+    assert tracker.in_flight == 0
+
+
+def test_drain_gives_up_after_the_timeout():
+    tracker = InFlightTracker("writes")
+
+    with tracker.track():
+        assert asyncio.run(tracker.drain(0.1)) is False
+
+    assert asyncio.run(tracker.drain(0.1)) is True